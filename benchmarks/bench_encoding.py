@@ -0,0 +1,44 @@
+import timeit
+import argparse
+
+from pwnlib.binary.encoding import str2bytes, bytes2str
+
+
+# the map based implementations these replaced, kept as the baseline
+def str2bytes_map(data: str) -> bytes:
+    try:
+        return bytes(map(ord, data))
+    except ValueError:
+        return data.encode('utf-8')
+
+
+def bytes2str_map(data: bytes) -> str:
+    return ''.join(list(map(chr, data)))
+
+
+def report(name: str, size: int, seconds: float):
+    print("{:<28} {:10.1f} MB/s".format(name, size / seconds / 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="str2bytes/bytes2str throughput")
+    parser.add_argument("--size", type=int, default=1 << 20)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    raw = bytes(range(256)) * (opts.size // 256)
+    text = raw.decode('latin-1')
+    short = "1\n"
+
+    def best(stmt, number: int=1) -> float:
+        return min(timeit.repeat(stmt, number=number, repeat=opts.repeat)) / number
+
+    report("str2bytes (map)", len(text), best(lambda: str2bytes_map(text)))
+    report("str2bytes", len(text), best(lambda: str2bytes(text)))
+    report("bytes2str (map)", len(raw), best(lambda: bytes2str_map(raw)))
+    report("bytes2str", len(raw), best(lambda: bytes2str(raw)))
+
+    # per call overhead on a typical menu choice
+    n = 100000
+    print("{:<28} {:10.0f} calls/s".format("str2bytes short (map)", 1 / best(lambda: str2bytes_map(short), n)))
+    print("{:<28} {:10.0f} calls/s".format("str2bytes short", 1 / best(lambda: str2bytes(short), n)))
@@ -0,0 +1,28 @@
+import timeit
+import argparse
+
+from pwnlib.binary.packing import p64, u64, pack_many, unpack_many, flat
+
+
+def report(name: str, n: int, seconds: float):
+    print("{:<28} {:12.0f} values/s".format(name, n / seconds))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scalar vs bulk packing")
+    parser.add_argument("-n", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    values = list(range(0x400000, 0x400000 + opts.n))
+    packed = pack_many(values)
+
+    def best(stmt) -> float:
+        return min(timeit.repeat(stmt, number=1, repeat=opts.repeat))
+
+    report("p64 loop + join", opts.n, best(lambda: b"".join([p64(v) for v in values])))
+    report("pack_many", opts.n, best(lambda: pack_many(values)))
+    report("flat", opts.n, best(lambda: flat(values)))
+    report("u64 loop", opts.n, best(lambda: [u64(packed[i:i+8]) for i in range(0, len(packed), 8)]))
+    report("unpack_many", opts.n, best(lambda: unpack_many(packed)))
+    report("unpack_many (big endian)", opts.n, best(lambda: unpack_many(packed, byteorder='big')))
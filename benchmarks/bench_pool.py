@@ -0,0 +1,49 @@
+import time
+import argparse
+from typing import Callable
+
+from pwnlib.tubes import Process, ProcessPool
+
+
+def attempt(get_proc: Callable[[], Process], delay: float=0):
+    # time the exploit spends elsewhere (remote leaks, computing the next
+    # guess), the pool spawns the next targets meanwhile
+    if delay:
+        time.sleep(delay)
+
+    proc = get_proc()
+    proc.sendline(b"AAAA")
+    proc.recvline(timeout=5)
+    proc.close()
+
+
+def bench_spawn(args, n: int, delay: float) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        attempt(lambda: Process(args), delay)
+
+    return n / (time.perf_counter() - start)
+
+
+def bench_pool(args, n: int, size: int, delay: float) -> float:
+    with ProcessPool(args, size=size) as pool:
+        # let the pool fill before timing
+        time.sleep(0.5)
+
+        start = time.perf_counter()
+        for _ in range(n):
+            attempt(lambda: pool.acquire(timeout=5), delay)
+
+        return n / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process vs ProcessPool attempts per second")
+    parser.add_argument("-n", type=int, default=500)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("target", nargs="*", default=["cat"])
+    opts = parser.parse_args()
+
+    print("no pool: {:10.1f} attempts/s".format(bench_spawn(opts.target, opts.n, opts.delay)))
+    print("pool:    {:10.1f} attempts/s".format(bench_pool(opts.target, opts.n, opts.size, opts.delay)))
@@ -0,0 +1,272 @@
+import sys
+import json
+import time
+import timeit
+import platform
+import argparse
+import subprocess
+from typing import Callable, Dict, List, Tuple
+
+from pwnlib.tubes import Process
+from pwnlib.binary.packing import p64, u64, pack_many, unpack_many, flat
+from pwnlib.binary.encoding import str2bytes, bytes2str
+from pwnlib.binary.pattern import cyclic, cyclic_find
+
+# local helper targets, nothing touches the network
+ECHO = ["cat"]
+
+PROMPT = [sys.executable, "-u", "-c", """
+import sys
+out = sys.stdout.buffer
+out.write(b"> ")
+out.flush()
+for line in sys.stdin.buffer:
+    out.write(b"got " + line + b"> ")
+    out.flush()
+"""]
+
+LINES = [sys.executable, "-c", """
+import sys
+line = b"A" * 63 + b"\\n"
+sys.stdout.buffer.write(line * int(sys.argv[1]))
+""", "{n}"]
+
+BLOB = [sys.executable, "-c", """
+import sys
+out = sys.stdout.buffer
+chunk = b"B" * 65536
+for _ in range(int(sys.argv[1]) // 65536):
+    out.write(chunk)
+out.write(b"END")
+""", "{n}"]
+
+SINK = ["sh", "-c", "cat > /dev/null"]
+
+# name -> (function(scale) -> (value, unit))
+_cases = {}
+
+
+def case(name: str):
+    def register(func: Callable[[int], Tuple[float, str]]):
+        _cases[name] = func
+        return func
+    return register
+
+
+def spawn(argv: List[str], **fmt) -> Process:
+    return Process([a.format(**fmt) for a in argv])
+
+
+def best(stmt: Callable, number: int=1, repeat: int=3) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def import_time(stmt: str, n: int) -> float:
+    # fresh interpreters, best of n, minus the bare interpreter startup
+    def run(code: str) -> float:
+        times = []
+        for _ in range(n):
+            start = time.perf_counter()
+            subprocess.check_call([sys.executable, "-c", code])
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    return (run(stmt) - run("pass")) * 1e3
+
+
+@case("import.pwnlib")
+def import_pwnlib(scale: int) -> Tuple[float, str]:
+    return import_time("import pwnlib", 10 * scale), "ms/import"
+
+
+@case("import.process")
+def import_process(scale: int) -> Tuple[float, str]:
+    # what a typical script pays before its first line runs
+    return import_time("from pwnlib import Process, p64", 10 * scale), "ms/import"
+
+
+@case("tube.roundtrip")
+def roundtrip(scale: int) -> Tuple[float, str]:
+    n = 2000 * scale
+    p = spawn(ECHO)
+    try:
+        start = time.perf_counter()
+        for _ in range(n):
+            p.sendline(b"ping")
+            p.recvline()
+        return (time.perf_counter() - start) / n * 1e6, "us/roundtrip"
+    finally:
+        p.close()
+
+
+@case("tube.prompt")
+def prompt(scale: int) -> Tuple[float, str]:
+    n = 2000 * scale
+    p = spawn(PROMPT)
+    try:
+        start = time.perf_counter()
+        for _ in range(n):
+            p.sendlineafter(b"> ", b"1")
+        return n / (time.perf_counter() - start), "prompts/s"
+    finally:
+        p.close()
+
+
+@case("tube.recvline")
+def recvline(scale: int) -> Tuple[float, str]:
+    n = 100000 * scale
+    p = spawn(LINES, n=n)
+    try:
+        start = time.perf_counter()
+        for _ in range(n):
+            p.recvline(timeout=10)
+        return n / (time.perf_counter() - start), "lines/s"
+    finally:
+        p.close()
+
+
+@case("tube.recvuntil_large")
+def recvuntil_large(scale: int) -> Tuple[float, str]:
+    n = (16 << 20) * scale
+    p = spawn(BLOB, n=n)
+    try:
+        start = time.perf_counter()
+        p.recvuntil(b"END", size=65536, timeout=30)
+        return n / (time.perf_counter() - start) / 1e6, "MB/s"
+    finally:
+        p.close()
+
+
+@case("tube.sendline")
+def sendline(scale: int) -> Tuple[float, str]:
+    n = 20000 * scale
+    p = spawn(SINK)
+    try:
+        start = time.perf_counter()
+        for _ in range(n):
+            p.sendline(b"A" * 32)
+        return n / (time.perf_counter() - start), "lines/s"
+    finally:
+        p.close()
+
+
+@case("packing.p64")
+def packing_p64(scale: int) -> Tuple[float, str]:
+    return 1 / best(lambda: p64(0x4141414141414141), 100000 * scale), "ops/s"
+
+
+@case("packing.u64")
+def packing_u64(scale: int) -> Tuple[float, str]:
+    data = b"A" * 8
+    return 1 / best(lambda: u64(data), 100000 * scale), "ops/s"
+
+
+@case("packing.pack_many")
+def packing_pack_many(scale: int) -> Tuple[float, str]:
+    values = list(range(100000 * scale))
+    return len(values) / best(lambda: pack_many(values)), "values/s"
+
+
+@case("packing.unpack_many")
+def packing_unpack_many(scale: int) -> Tuple[float, str]:
+    data = pack_many(list(range(100000 * scale)))
+    return len(data) // 8 / best(lambda: unpack_many(data)), "values/s"
+
+
+@case("packing.flat")
+def packing_flat(scale: int) -> Tuple[float, str]:
+    chain = [0x401000, b"/bin/sh\x00", 0, 0x401234] * 64
+    return 1 / best(lambda: flat(chain), 1000 * scale), "chains/s"
+
+
+@case("encoding.str2bytes")
+def encoding_str2bytes(scale: int) -> Tuple[float, str]:
+    return 1 / best(lambda: str2bytes("1\n"), 100000 * scale), "ops/s"
+
+
+@case("encoding.str2bytes_large")
+def encoding_str2bytes_large(scale: int) -> Tuple[float, str]:
+    text = bytes(range(256)).decode("latin-1") * (4096 * scale)
+    return len(text) / best(lambda: str2bytes(text)) / 1e6, "MB/s"
+
+
+@case("encoding.bytes2str")
+def encoding_bytes2str(scale: int) -> Tuple[float, str]:
+    return 1 / best(lambda: bytes2str(b"1\n"), 100000 * scale), "ops/s"
+
+
+@case("pattern.cyclic")
+def pattern_cyclic(scale: int) -> Tuple[float, str]:
+    n = (16 << 20) * scale
+    return n / best(lambda: cyclic(n, subseq_len=8)) / 1e6, "MB/s"
+
+
+@case("pattern.cyclic_find")
+def pattern_cyclic_find(scale: int) -> Tuple[float, str]:
+    # a window deep into a 64-bit pattern, as read from a crashed rip
+    data = cyclic(100 << 20, subseq_len=8)[-8:]
+    return 1 / best(lambda: cyclic_find(data, subseq_len=8), 100 * scale), "lookups/s"
+
+
+def commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def lower_is_better(unit: str) -> bool:
+    return unit.startswith(("us/", "ms/"))
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict]):
+    for name, res in results.items():
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            continue
+
+        ratio = res["value"] / old["value"]
+        if lower_is_better(res["unit"]):
+            ratio = 1 / ratio if ratio else 0
+
+        # > 1.0 is an improvement whatever the unit
+        print("{:<28} {:6.2f}x".format(name, ratio))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pwnlib benchmark suite")
+    parser.add_argument("-k", "--filter", default="", help="only run cases containing this")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the work per case")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON of an earlier run to compare against")
+    parser.add_argument("--list", action="store_true")
+    opts = parser.parse_args()
+
+    if opts.list:
+        print("\n".join(_cases))
+        sys.exit(0)
+
+    results = {}
+    for name, func in _cases.items():
+        if opts.filter not in name:
+            continue
+
+        value, unit = func(opts.scale)
+        results[name] = {"value": value, "unit": unit}
+        print("{:<28} {:14.1f} {}".format(name, value, unit))
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump({
+                "commit": commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.time(),
+                "scale": opts.scale,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+
+    if opts.compare:
+        with open(opts.compare) as f:
+            compare(results, json.load(f)["results"])
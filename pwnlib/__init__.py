@@ -1,5 +1,13 @@
-from .arch import *
-from .tubes import *
-from .binary import *
+from ._lazy import lazy
+from . import arch, tubes, binary
 
-from logging import getLogger, StreamHandler
+# every public name of the subpackages, resolved on first access
+_names = {
+    "getLogger": "logging",
+    "StreamHandler": "logging",
+}
+for _module in (arch, tubes, binary):
+    _names.update(dict.fromkeys(_module.__all__, _module.__name__))
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
@@ -0,0 +1,21 @@
+import importlib
+
+
+def lazy(package: str, names: dict) -> tuple:
+    # returns the module level __getattr__ and __dir__ of `package`, each name
+    # is imported from its module (relative to `package`) on first access
+    # and then stored in the package so later lookups are plain globals.
+    # No typing import here, it would cost more than the rest of the package
+    def __getattr__(name: str):
+        module = names.get(name)
+        if module is None:
+            raise AttributeError("module {!r} has no attribute {!r}".format(package, name))
+
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> list:
+        return sorted(set(vars(importlib.import_module(package))) | set(names))
+
+    return __getattr__, __dir__
@@ -1,2 +1,24 @@
-from .assembler import *
-from .config import VS_PATH, BIN_UTILS_PATH
+from pwnlib._lazy import lazy
+
+_names = {
+    "x86": ".assembler",
+    "x64": ".assembler",
+    "detect_arch": ".assembler",
+    "whereis": ".assembler",
+    "get_env_bat_path": ".assembler",
+    "MasmBackend": ".assembler",
+    "get_backend": ".assembler",
+    "set_backend": ".assembler",
+    "get_cache": ".assembler",
+    "set_cache": ".assembler",
+    "assemble": ".assembler",
+    "assemble_many": ".assembler",
+    "VS_PATH": ".config",
+    "BIN_UTILS_PATH": ".config",
+    "Backend": ".backend",
+    "AssemblerCache": ".cache",
+    "GnuBackend": ".gnu",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
@@ -2,16 +2,22 @@ import os
 import sys
 import platform
 import tempfile
+import functools
 import subprocess
-from typing import Literal, Optional, Union
+from typing import Literal, Optional, Union, List
 
-from .config import VS_PATH, BIN_UTILS_PATH
+from .config import VS_PATH, VS_BUILD_VERSION, BIN_UTILS_PATH, \
+                    CACHE_PATH, ASM_CACHE_SIZE
+from .backend import Backend, split_table
+from .cache import AssemblerCache
 from pwnlib.binary.encoding import bytes2str, str2bytes
 
 
 x86 = ("intel", "intel32", "i386", "x86")
 x64 = ("intel64", "x64", "x86-64", "amd","amd64")
 
+# the host and the toolchain don't change during a run, probe them once
+@functools.lru_cache(maxsize=None)
 def detect_arch() -> Literal[32, 64, -1]:
     arch =  platform.machine()
     arch = arch.lower().replace(" ", "").replace("_", "-")
@@ -23,6 +29,7 @@ def detect_arch() -> Literal[32, 64, -1]:
     else:
         return -1
 
+@functools.lru_cache(maxsize=None)
 def whereis(file: Union[str, bytes],
             env: Optional[Union[str, bytes]]=None,
             recursive: Optional[bool]=False
@@ -47,6 +54,7 @@ def whereis(file: Union[str, bytes],
     except subprocess.CalledProcessError:
         return None
 
+@functools.lru_cache(maxsize=None)
 def get_env_bat_path(target_arch: str="x64") -> Optional[str]:
     vcvarsxx = "vcvars64.bat" if target_arch == "x64" else  "vcvars32.bat"
     vcvarsxx_path = os.path.join(VS_PATH,
@@ -62,95 +70,218 @@ def get_env_bat_path(target_arch: str="x64") -> Optional[str]:
     return vcvarsxx_path
 
 
+@functools.lru_cache(maxsize=None)
+def _objcopy_path() -> Optional[str]:
+    objcopy_path = os.path.join(BIN_UTILS_PATH, "objcopy.exe")
+    if not os.path.isfile(objcopy_path):
+        print("Bin utils path doesn't exist: {}".format(objcopy_path))
+        return None
 
-def assemble(asm_code: Union[bytes, str], target_arch: str="x64") -> Optional[bytes]:
-    assert isinstance(asm_code, (bytes, str)), \
-            "`asm_code` must be 'bytes' or 'str'"
+    return objcopy_path
+
+
+
+class MasmBackend(Backend):
+    name = "masm"
+
+    def identity(self, target_arch: str) -> str:
+        return "|".join((self.name, VS_PATH, VS_BUILD_VERSION, BIN_UTILS_PATH))
+
+
+    def assemble_many(self, snippets: List[bytes],
+                      target_arch: str="x64") -> Optional[List[bytes]]:
+        bits = detect_arch()
+        if bits == -1:
+            print("Error detecting the architecture")
+            return None
+
+
+        if target_arch == "x64":
+            arch = "x64"
+            ml = "ml64"
+        elif target_arch == "x86":
+            arch = "x86"
+            ml = "ml"
+        else:
+            print("Unknow target architecture {}".format(target_arch))
+            return None
+
+        fname = os.urandom(8).hex()
+        asm_file_path = os.path.join(tempfile.gettempdir(), fname+".asm")
+        obj_file_path = os.path.join(tempfile.gettempdir(), fname+".obj")
+        bin_file_path = os.path.join(tempfile.gettempdir(), fname+".bin")
+
+        def del_tmp_files():
+            try:
+                os.unlink(asm_file_path)
+                os.unlink(obj_file_path)
+                os.unlink(bin_file_path)
+            except:
+                pass
+
+        vcvarsxx_path = get_env_bat_path(target_arch)
+        if vcvarsxx_path is None:
+            return None
+
+        objcopy_path = _objcopy_path()
+        if objcopy_path is None:
+            return None
+
+        # every snippet is its own proc, the trailing table tells where
+        # each one starts and how long it is once extracted
+        code = b".code\npwnlib_base:\n"
+        for i, asm_code in enumerate(snippets):
+            code += "pwnlib_{0} proc\n".format(i).encode()
+            code += asm_code + b"\n"
+            code += "pwnlib_{0} endp\npwnlib_end_{0}:\n".format(i).encode()
+
+        for i in range(len(snippets)):
+            code += "DD pwnlib_{0} - pwnlib_base\n".format(i).encode()
+            code += "DD pwnlib_end_{0} - pwnlib_{0}\n".format(i).encode()
+
+        code += "DD {}\nend".format(len(snippets)).encode()
+
+        with open(asm_file_path,"wb") as f:
+            f.write(code)
+
+        cmd = [vcvarsxx_path, ">NUL","&&", ml, "/nologo","/Fo", obj_file_path, "/c" , asm_file_path, ">NUL"]
+        if subprocess.Popen(cmd, shell=True).wait() != 0:
+            print("Assembled failed")
+            del_tmp_files()
+            return None
+
+        if not os.path.isfile(obj_file_path):
+            print("Object not builded")
+            del_tmp_files()
+            return None
+
+        cmd  = [
+            objcopy_path,
+            '-O', 'binary',
+            '-j', '.text$mn',
+            obj_file_path, bin_file_path
+        ]
+        if subprocess.Popen(cmd).wait() != 0:
+            del_tmp_files()
+            print("Error extracting the shellcode")
+            return None
+
+        if not os.path.isfile(bin_file_path):
+            del_tmp_files()
+            print("Binary file doesn't exist")
+            return None
+
+        shellcode = None
+        with open(bin_file_path, "rb") as f:
+            shellcode = f.read()
+
+        del_tmp_files()
+
+        return split_table(shellcode, len(snippets))
+
+
+_backend = None
+_cache = AssemblerCache(os.path.join(CACHE_PATH, "asm"), ASM_CACHE_SIZE)
+
+def get_backend() -> Backend:
+    global _backend
+
+    if _backend is None:
+        if os.name == "nt":
+            _backend = MasmBackend()
+        else:
+            # binutils on linux/macOS build hosts, only imported when used
+            from .gnu import GnuBackend
+            _backend = GnuBackend()
+
+    return _backend
+
+
+def set_backend(backend: Backend):
+    global _backend
+
+    assert isinstance(backend, Backend), \
+            "`backend` is {}, must be 'Backend'".format(type(backend))
+
+    _backend = backend
+
+
+def get_cache() -> Optional[AssemblerCache]:
+    return _cache
+
+
+def set_cache(cache: Optional[AssemblerCache]):
+    global _cache
+
+    assert cache is None or isinstance(cache, AssemblerCache), \
+            "`cache` is {}, must be 'AssemblerCache' or None".format(type(cache))
+
+    _cache = cache
 
-    bits = detect_arch()
-    if bits == -1:
-        print("Error detecting the architecture")
-        return None
 
+def _lookup(snippets: List[bytes],
+            target_arch: str,
+            backend: Backend) -> List[Optional[bytes]]:
+    identity = backend.identity(target_arch)
+    keys = [AssemblerCache.key(code, target_arch, identity) for code in snippets]
 
-    if target_arch == "x64":
-        vcvarsxx = "vcvars64.bat"
-        arch = "x64"
-        ml = "ml64"
-    elif target_arch == "x86":
-        vcvarsxx = "vcvars32.bat"
-        arch = "x86"
-        ml = "ml"
+    cache = _cache
+    if cache is None:
+        results = [None] * len(snippets)
     else:
-        print("Unknow target architecture {}".format(target_arch))
-        return None
+        results = [cache.get(key) for key in keys]
 
-    fname = os.urandom(8).hex()
-    asm_file_path = os.path.join(tempfile.gettempdir(), fname+".asm")
-    obj_file_path = os.path.join(tempfile.gettempdir(), fname+".obj")
-    bin_file_path = os.path.join(tempfile.gettempdir(), fname+".bin")
+    missing = [i for i, shellcode in enumerate(results) if shellcode is None]
+    if not missing:
+        return results
 
-    def del_tmp_files():
-        try:
-            os.unlink(asm_file_path)
-            os.unlink(obj_file_path)
-            os.unlink(bin_file_path)
-        except:
-            pass
+    shellcodes = backend.assemble_many([snippets[i] for i in missing], target_arch)
+    if shellcodes is None and len(missing) > 1:
+        # one bad snippet (or two defining the same label) fails the whole
+        # batch, retry them one by one to keep the good ones
+        shellcodes = [backend.assemble(snippets[i], target_arch) for i in missing]
 
-    vcvarsxx_path = os.path.join(VS_PATH,
-                            "VC" ,
-                            "Auxiliary",
-                            "Build",
-                            vcvarsxx)
+    if shellcodes is None:
+        return results
 
-    if not os.path.isfile(vcvarsxx_path):
-        print("Visual studio path doesn't exist: {}".format(vcvarsxx_path))
-        return None
+    for i, shellcode in zip(missing, shellcodes):
+        results[i] = shellcode
 
-    objcopy_path = os.path.join(BIN_UTILS_PATH, "objcopy.exe")
-    if not os.path.isfile(objcopy_path):
-        print("Bin utils path doesn't exist: {}".format(objcopy_path))
-        return None
+        # failures aren't cached, the toolchain may be fixed between calls
+        if shellcode is not None and cache is not None:
+            cache.put(keys[i], shellcode)
 
-    code = b".code\nmain proc\n"
-    code += str2bytes(asm_code)
-    code += b"main endp\nend"
+    return results
 
-    with open(asm_file_path,"wb") as f:
-        f.write(code)
 
-    cmd = [vcvarsxx_path, ">NUL","&&", ml, "/nologo","/Fo", obj_file_path, "/c" , asm_file_path, ">NUL"]
-    if subprocess.Popen(cmd, shell=True).wait() != 0:
-        print("Assembled failed")
-        del_tmp_files()
-        return None
+def assemble(asm_code: Union[bytes, str],
+             target_arch: str="x64",
+             backend: Optional[Backend]=None
+             ) -> Optional[bytes]:
+    assert isinstance(asm_code, (bytes, str)), \
+            "`asm_code` must be 'bytes' or 'str'"
 
-    if not os.path.isfile(obj_file_path):
-        print("Object not builded")
-        del_tmp_files()
-        return None
+    if backend is None:
+        backend = get_backend()
 
-    cmd  = [
-        objcopy_path,
-        '-O', 'binary',
-        '-j', '.text$mn',
-        obj_file_path, bin_file_path
-    ]
-    if subprocess.Popen(cmd).wait() != 0:
-        del_tmp_files()
-        print("Error extracting the shellcode")
-        return None
+    return _lookup([str2bytes(asm_code)], target_arch, backend)[0]
 
-    if not os.path.isfile(bin_file_path):
-        del_tmp_files()
-        print("Binary file doesn't exist")
-        return None
 
-    shellcode = None
-    with open(bin_file_path, "rb") as f:
-        shellcode = f.read()
+def assemble_many(snippets: List[Union[bytes, str]],
+                  target_arch: str="x64",
+                  backend: Optional[Backend]=None
+                  ) -> List[Optional[bytes]]:
+    assert isinstance(snippets, (list, tuple)), \
+            "`snippets` must be 'list' or 'tuple'"
+
+    for code in snippets:
+        assert isinstance(code, (bytes, str)), \
+                "{} given, snippets must be 'bytes' or 'str'".format(type(code))
+
+    if backend is None:
+        backend = get_backend()
 
-    del_tmp_files()
+    if not snippets:
+        return []
 
-    return shellcode
+    return _lookup([str2bytes(code) for code in snippets], target_arch, backend)
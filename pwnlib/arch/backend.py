@@ -0,0 +1,51 @@
+import abc
+import struct
+from typing import Optional, List
+
+
+class Backend(metaclass=abc.ABCMeta):
+    name = None
+
+    @abc.abstractmethod
+    def identity(self, target_arch: str) -> str:
+        # anything that changes the produced bytes for the same source
+        # (tool versions, paths, flags), it is part of the cache key
+        pass
+
+
+    @abc.abstractmethod
+    def assemble_many(self, snippets: List[bytes],
+                      target_arch: str) -> Optional[List[bytes]]:
+        pass
+
+
+    def assemble(self, asm_code: bytes, target_arch: str) -> Optional[bytes]:
+        shellcodes = self.assemble_many([asm_code], target_arch)
+        if shellcodes is None:
+            return None
+
+        return shellcodes[0]
+
+
+def split_table(blob: bytes, count: int) -> Optional[List[bytes]]:
+    # batches are assembled into one section followed by a table of
+    # `count` (offset, length) dwords and the count itself, all resolved
+    # by the assembler from the labels around each snippet
+    table_size = 4 * (2 * count + 1)
+    if len(blob) < table_size:
+        return None
+
+    fields = struct.unpack("<{}I".format(2 * count + 1), blob[-table_size:])
+    if fields[-1] != count:
+        return None
+
+    code = blob[:-table_size]
+    shellcodes = []
+    for i in range(count):
+        offset, length = fields[2 * i], fields[2 * i + 1]
+        if offset + length > len(code):
+            return None
+
+        shellcodes.append(code[offset:offset + length])
+
+    return shellcodes
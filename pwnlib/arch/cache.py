@@ -0,0 +1,178 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class AssemblerCache(object):
+    def __init__(self,
+                 path: Optional[str]=None,
+                 max_size: int=64*1024*1024,
+                 memory_items: int=1024
+                 ):
+
+        assert isinstance(max_size, int) and max_size >= 0, \
+                "`max_size` is {}, must be positive 'int'".format(max_size)
+
+        assert isinstance(memory_items, int) and memory_items >= 0, \
+                "`memory_items` is {}, must be positive 'int'".format(memory_items)
+
+        self._path = path
+        self._max_size = max_size
+        self._memory_items = memory_items
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # running estimate of the on-disk store size, the directory is
+        # only rescanned when it may have grown over max_size
+        self._disk_size = None
+
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+
+    @staticmethod
+    def key(asm_code: bytes, target_arch: str, identity: str) -> str:
+        h = hashlib.sha256()
+        for part in (identity.encode(), target_arch.encode(), asm_code):
+            # length prefixed so fields can't run into each other
+            h.update(len(part).to_bytes(8, 'little'))
+            h.update(part)
+
+        return h.hexdigest()
+
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self._path, key[:2], key[2:] + ".bin")
+
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        if self._path is None:
+            return None
+
+        fpath = self._file(key)
+        try:
+            with open(fpath, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            # the mtime is the LRU clock of the on-disk store
+            os.utime(fpath)
+        except OSError:
+            pass
+
+        self._remember(key, data)
+        return data
+
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+
+        if self._path is None:
+            return
+
+        fpath = self._file(key)
+        os.makedirs(os.path.dirname(fpath), exist_ok=True)
+
+        # write to a private name and rename, readers in other processes
+        # see either nothing or the complete file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(fpath), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, fpath)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = self._scan_size()
+            else:
+                self._disk_size += len(data)
+
+            if self._disk_size > self._max_size:
+                self._disk_size = self._evict()
+
+
+    def _remember(self, key: str, data: bytes):
+        if self._memory_items == 0:
+            return
+
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+
+            while len(self._memory) > self._memory_items:
+                self._memory.popitem(last=False)
+
+
+    def _entries(self):
+        for root, _, files in os.walk(self._path):
+            for fname in files:
+                if not fname.endswith(".bin"):
+                    continue
+
+                fpath = os.path.join(root, fname)
+                try:
+                    st = os.stat(fpath)
+                except OSError:
+                    continue
+
+                yield st.st_mtime, st.st_size, fpath
+
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+
+    def _evict(self) -> int:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        # oldest first down to 3/4 of the budget so a full cache doesn't
+        # rescan the directory on every insert
+        target = self._max_size * 3 // 4
+        for _, size, fpath in entries:
+            if total <= target:
+                break
+
+            try:
+                os.unlink(fpath)
+            except OSError:
+                # another process evicted it first
+                pass
+
+            total -= size
+
+        return total
+
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+            if self._path is not None:
+                for _, _, fpath in self._entries():
+                    try:
+                        os.unlink(fpath)
+                    except OSError:
+                        pass
+
+            self._disk_size = 0
@@ -1,3 +1,9 @@
+import os
+
 VS_PATH="C:\\Program Files\\Microsoft Visual Studio\\2022\\Professional"
 VS_BUILD_VERSION="14.41.34120"
 BIN_UTILS_PATH="C:\\mingw64\\bin"
+
+CACHE_PATH=os.path.join(os.path.expanduser("~"), ".cache", "pwnlib")
+ASM_CACHE_SIZE=64*1024*1024
+GADGET_CACHE_SIZE=256*1024*1024
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import functools
+import subprocess
+from typing import Optional, List
+
+from .config import BIN_UTILS_PATH
+from .backend import Backend, split_table
+
+
+@functools.lru_cache(maxsize=None)
+def _tool(name: str) -> Optional[str]:
+    for fname in (name, name + ".exe"):
+        fpath = os.path.join(BIN_UTILS_PATH, fname)
+        if os.path.isfile(fpath):
+            return fpath
+
+    return shutil.which(name)
+
+
+class GnuBackend(Backend):
+    name = "gnu"
+
+    def __init__(self,
+                 as_path: Optional[str]=None,
+                 objcopy_path: Optional[str]=None,
+                 syntax: str="intel"
+                 ):
+
+        assert syntax in ("intel", "att"), \
+                "`syntax` is {}, must be 'intel' or 'att'".format(syntax)
+
+        self._as_path = as_path or _tool("as")
+        self._objcopy_path = objcopy_path or _tool("objcopy")
+        self._syntax = syntax
+        self._version = None
+
+
+    def identity(self, target_arch: str) -> str:
+        if self._version is None:
+            try:
+                out = subprocess.check_output([self._as_path, "--version"])
+                self._version = out.decode(errors="replace").splitlines()[0]
+            except (OSError, subprocess.CalledProcessError, TypeError, IndexError):
+                self._version = "unknown"
+
+        return "|".join((self.name, str(self._as_path), str(self._objcopy_path),
+                         self._version, self._syntax))
+
+
+    def assemble_many(self, snippets: List[bytes],
+                      target_arch: str="x64") -> Optional[List[bytes]]:
+
+        if target_arch == "x64":
+            flags = ["--64"]
+        elif target_arch == "x86":
+            flags = ["--32"]
+        else:
+            print("Unknow target architecture {}".format(target_arch))
+            return None
+
+        if self._as_path is None or self._objcopy_path is None:
+            print("GNU as/objcopy not found")
+            return None
+
+        code = b""
+        if self._syntax == "intel":
+            code += b".intel_syntax noprefix\n"
+
+        code += b".text\npwnlib_base:\n"
+        for i, asm_code in enumerate(snippets):
+            code += "pwnlib_{}:\n".format(i).encode()
+            code += asm_code + b"\n"
+            code += "pwnlib_end_{}:\n".format(i).encode()
+
+        for i in range(len(snippets)):
+            code += "    .long pwnlib_{0} - pwnlib_base\n".format(i).encode()
+            code += "    .long pwnlib_end_{0} - pwnlib_{0}\n".format(i).encode()
+
+        code += "    .long {}\n".format(len(snippets)).encode()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            asm_file_path = os.path.join(tmp_dir, "batch.s")
+            obj_file_path = os.path.join(tmp_dir, "batch.o")
+            bin_file_path = os.path.join(tmp_dir, "batch.bin")
+
+            with open(asm_file_path, "wb") as f:
+                f.write(code)
+
+            cmd = [self._as_path] + flags + ["-o", obj_file_path, asm_file_path]
+            if subprocess.Popen(cmd).wait() != 0:
+                print("Assembled failed")
+                return None
+
+            cmd = [
+                self._objcopy_path,
+                '-O', 'binary',
+                '-j', '.text',
+                obj_file_path, bin_file_path
+            ]
+            if subprocess.Popen(cmd).wait() != 0:
+                print("Error extracting the shellcode")
+                return None
+
+            with open(bin_file_path, "rb") as f:
+                shellcode = f.read()
+
+        return split_table(shellcode, len(snippets))
@@ -1,2 +1,9 @@
-from .encoding import *
-from .packing import *
+from pwnlib._lazy import lazy
+from . import encoding, packing, pattern, elf, rop, fmtstr
+
+_names = {}
+for _module in (encoding, packing, pattern, elf, rop, fmtstr):
+    _names.update(dict.fromkeys(_module.__all__, "." + _module.__name__.rsplit(".", 1)[1]))
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
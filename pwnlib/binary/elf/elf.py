@@ -0,0 +1,515 @@
+import os
+import mmap
+import struct
+from collections import namedtuple
+from typing import Union, Optional, List, Dict, Iterator, Mapping, Callable
+
+from pwnlib.binary.encoding import str2bytes, bytes2str
+
+Segment = namedtuple("Segment", "type flags offset vaddr filesz memsz align")
+Section = namedtuple("Section", "name type flags addr offset size link info entsize")
+
+PT_LOAD = 1
+PT_DYNAMIC = 2
+
+PF_X = 1
+PF_W = 2
+PF_R = 4
+
+SHT_SYMTAB = 2
+SHT_RELA = 4
+SHT_REL = 9
+SHT_DYNSYM = 11
+SHT_GNU_HASH = 0x6ffffff6
+SHT_GNU_VERSYM = 0x6fffffff
+
+# versym entries of non default symbol versions (name@VER, not name@@VER)
+VERSYM_HIDDEN = 0x8000
+
+ET_DYN = 3
+
+_machines = {
+    3: "i386",
+    8: "mips",
+    20: "powerpc",
+    21: "powerpc64",
+    40: "arm",
+    62: "amd64",
+    183: "aarch64",
+    243: "riscv",
+}
+
+# GLOB_DAT and JUMP_SLOT relocations, the ones filling GOT entries
+_got_relocs = {
+    "i386": (6, 7),
+    "amd64": (6, 7),
+    "arm": (21, 22),
+    "aarch64": (1025, 1026),
+    "mips": (51, 127),
+    "powerpc": (20, 21),
+    "powerpc64": (20, 21),
+    "riscv": (5,),
+}
+
+# (ehdr, phdr, shdr, sym, rel, rela) layouts, the 32-bit phdr and sym put
+# their fields in another order, the tuples are reordered on parsing
+_layouts = {
+    32: ("HHIIIIIHHHHHH", "IIIIIIII", "IIIIIIIIII", "IIIBBH", "II", "IIi"),
+    64: ("HHIQQQIHHHHHH", "IIQQQQQQ", "IIQQQQIIQQ", "IBBHQQ", "QQ", "QQq"),
+}
+
+
+class _Rebased(Mapping):
+    # read-only view adding the current load slide to link-time addresses,
+    # so rebasing a PIE doesn't rebuild anything. The table is built on
+    # first use, `lookup` may answer single names before that
+    def __init__(self, elf: "ELF",
+                 build: Callable[[], Dict[str, int]],
+                 lookup: Optional[Callable[[str], Optional[int]]]=None):
+        self._elf = elf
+        self._build = build
+        self._lookup = lookup
+        self._table = None
+
+
+    @property
+    def table(self) -> Dict[str, int]:
+        if self._table is None:
+            self._table = self._build()
+
+        return self._table
+
+
+    def _get(self, name: Union[str, bytes]) -> Optional[int]:
+        name = bytes2str(name)
+        if self._table is None and self._lookup is not None:
+            value = self._lookup(name)
+            if value is not None:
+                return value
+
+        return self.table.get(name)
+
+
+    def __getitem__(self, name: Union[str, bytes]) -> int:
+        value = self._get(name)
+        if value is None:
+            raise KeyError(name)
+
+        return value + self._elf._slide
+
+
+    def __contains__(self, name) -> bool:
+        return self._get(name) is not None
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table)
+
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+    def __repr__(self) -> str:
+        return "{{{}}}".format(", ".join("{!r}: {:#x}".format(k, v + self._elf._slide)
+                                         for k, v in self.table.items()))
+
+
+class ELF(object):
+    def __init__(self, path: Union[str, bytes]):
+        assert isinstance(path, (str, bytes)), \
+                "`path` is {}, must be 'str' or 'bytes'".format(type(path))
+
+        self.path = os.path.abspath(bytes2str(path))
+
+        with open(self.path, "rb") as f:
+            # pages are only read as they are touched
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:4] != b"\x7fELF":
+            self._map.close()
+            raise ValueError("{} is not an ELF file".format(self.path))
+
+        ei_class, ei_data = self._map[4], self._map[5]
+        if ei_class not in (1, 2) or ei_data not in (1, 2):
+            self._map.close()
+            raise ValueError("{} has an unknown ELF class or data encoding".format(self.path))
+
+        self.bits = 32 if ei_class == 1 else 64
+        self.endian = "little" if ei_data == 1 else "big"
+
+        prefix = "<" if self.endian == "little" else ">"
+        self._ehdr, self._phdr, self._shdr, self._sym, self._rel, self._rela = \
+                (struct.Struct(prefix + fmt) for fmt in _layouts[self.bits])
+
+        (self.type, self.machine, _, self.entry, self._phoff, self._shoff, _, _,
+         self._phentsize, self._phnum, self._shentsize, self._shnum,
+         self._shstrndx) = self._ehdr.unpack_from(self._map, 16)
+
+        self.arch = _machines.get(self.machine, str(self.machine))
+        self.pie = self.type == ET_DYN
+
+        self._segments = None
+        self._sections = None
+        self._section_list = None
+        self._symbols = None
+        self._got = None
+        self._plt = None
+
+        # the lowest PT_LOAD address, what `address` is relative to
+        loads = [seg.vaddr for seg in self.segments if seg.type == PT_LOAD]
+        self._base = min(loads) if loads else 0
+        self._slide = 0
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def __repr__(self) -> str:
+        return "ELF({!r}, arch={}, bits={}, pie={})".format(self.path, self.arch,
+                                                           self.bits, self.pie)
+
+
+    def close(self):
+        self._map.close()
+
+
+    @property
+    def address(self) -> int:
+        return self._base + self._slide
+
+
+    @address.setter
+    def address(self, address: int):
+        assert isinstance(address, int), \
+                "`address` is {}, must be 'int'".format(type(address))
+
+        self._slide = address - self._base
+
+
+    @property
+    def segments(self) -> List[Segment]:
+        if self._segments is None:
+            self._segments = []
+            for i in range(self._phnum):
+                fields = self._phdr.unpack_from(self._map, self._phoff + i * self._phentsize)
+                if self.bits == 32:
+                    p_type, offset, vaddr, _, filesz, memsz, flags, align = fields
+                else:
+                    p_type, flags, offset, vaddr, _, filesz, memsz, align = fields
+
+                self._segments.append(Segment(p_type, flags, offset, vaddr,
+                                              filesz, memsz, align))
+
+        return self._segments
+
+
+    @property
+    def sections(self) -> Dict[str, Section]:
+        if self._sections is None:
+            raw = []
+            for i in range(self._shnum if self._shoff else 0):
+                raw.append(self._shdr.unpack_from(self._map, self._shoff + i * self._shentsize))
+
+            # names may repeat, links between sections go by index
+            self._section_list = []
+            if raw and self._shstrndx < len(raw):
+                strtab = raw[self._shstrndx][4]
+                for fields in raw:
+                    name = self._string(strtab + fields[0])
+                    self._section_list.append(Section(name, *fields[1:8], fields[9]))
+
+            self._sections = {}
+            for section in self._section_list:
+                self._sections.setdefault(section.name, section)
+
+        return self._sections
+
+
+    @property
+    def symbols(self) -> Mapping[str, int]:
+        if self._symbols is None:
+            self._symbols = _Rebased(self, self._build_symbols, self._hash_lookup)
+
+        return self._symbols
+
+
+    @property
+    def got(self) -> Mapping[str, int]:
+        if self._got is None:
+            self._got = _Rebased(self, self._build_got)
+
+        return self._got
+
+
+    @property
+    def plt(self) -> Mapping[str, int]:
+        if self._plt is None:
+            self._plt = _Rebased(self, self._build_plt)
+
+        return self._plt
+
+
+    def _build_symbols(self) -> Dict[str, int]:
+        dynamic, static = {}, {}
+        for section in self._sections_list():
+            if section.type == SHT_DYNSYM:
+                for name, value, hidden in self._iter_symbols(section):
+                    # name@@VER is what the dynamic linker binds to
+                    if value and not (hidden and name in dynamic):
+                        dynamic[name] = value
+
+            elif section.type == SHT_SYMTAB:
+                # .symtab also names local functions
+                for name, value, _ in self._iter_symbols(section):
+                    if value:
+                        static[name] = value
+
+        # .dynsym wins, _hash_lookup answers from it before the table is built
+        static.update(dynamic)
+        return static
+
+
+    def _build_got(self) -> Dict[str, int]:
+        # other relocations of the same symbol (R_X86_64_64 in data, ...)
+        # don't point into the GOT, unknown machines keep every named one
+        types = _got_relocs.get(self.arch)
+
+        table = {}
+        for section in self._sections_list():
+            if section.type not in (SHT_REL, SHT_RELA):
+                continue
+
+            for name, offset, r_type in self._iter_relocs(section):
+                if name and (types is None or r_type in types):
+                    table[name] = offset
+
+        return table
+
+
+    def _build_plt(self) -> Dict[str, int]:
+        table = {}
+
+        # the lazy binding stubs follow the order of .rel(a).plt, after a
+        # 16 bytes header in .plt, or without one in .plt.sec (IBT)
+        sections = self.sections
+        relocs = sections.get(".rela.plt") or sections.get(".rel.plt")
+        stubs = sections.get(".plt.sec")
+        first = 0
+        if stubs is None:
+            stubs = sections.get(".plt")
+            first = 1
+
+        if relocs is not None and stubs is not None and self.arch in ("amd64", "i386"):
+            for i, (name, _, _) in enumerate(self._iter_relocs(relocs)):
+                if name:
+                    table[name] = stubs.addr + (first + i) * 16
+
+        return table
+
+
+    def _hash_lookup(self, name: str) -> Optional[int]:
+        # one dynamic symbol through .gnu.hash, the way the dynamic linker
+        # finds it, without building the whole table
+        gnu_hash = None
+        for section in self._sections_list():
+            if section.type == SHT_GNU_HASH:
+                gnu_hash = section
+                break
+
+        dynsym = self._section_by_index(gnu_hash.link) if gnu_hash is not None else None
+        strtab = self._section_by_index(dynsym.link) if dynsym is not None else None
+        if strtab is None:
+            return None
+
+        order = "<" if self.endian == "little" else ">"
+        nbuckets, symoffset, bloom_size, _ = struct.unpack_from(order + "4I", self._map,
+                                                                gnu_hash.offset)
+        if nbuckets == 0:
+            return None
+
+        buckets = gnu_hash.offset + 16 + bloom_size * self.bits // 8
+        chains = buckets + nbuckets * 4
+
+        key = str2bytes(name)
+        h = 5381
+        for c in key:
+            h = (h * 33 + c) & 0xffffffff
+
+        i = struct.unpack_from(order + "I", self._map, buckets + (h % nbuckets) * 4)[0]
+        if i < symoffset:
+            return None
+
+        versym = self._versym(dynsym)
+        found = None
+        while True:
+            h2 = struct.unpack_from(order + "I", self._map, chains + (i - symoffset) * 4)[0]
+            if h | 1 == h2 | 1:
+                fields = self._sym.unpack_from(self._map, dynsym.offset + i * self._sym.size)
+                value = fields[1] if self.bits == 32 else fields[4]
+                offset = strtab.offset + fields[0]
+                if value and self._map[offset:offset + len(key) + 1] == key + b"\x00":
+                    hidden = versym is not None and struct.unpack_from(
+                            order + "H", self._map, versym.offset + i * 2)[0] & VERSYM_HIDDEN
+                    if not hidden:
+                        return value
+                    found = value
+
+            if h2 & 1:
+                return found
+
+            i += 1
+
+
+    def _versym(self, dynsym: Section) -> Optional[Section]:
+        for section in self._sections_list():
+            if section.type == SHT_GNU_VERSYM and \
+                    self._section_by_index(section.link) is dynsym:
+                return section
+
+        return None
+
+
+    def _string(self, offset: int) -> str:
+        end = self._map.find(b"\x00", offset)
+        return bytes2str(self._map[offset:end])
+
+
+    def _iter_symbols(self, section: Section) -> Iterator:
+        strtab = self._section_by_index(section.link)
+        if strtab is None:
+            return
+
+        versym = self._versym(section) if section.type == SHT_DYNSYM else None
+        if versym is not None:
+            order = "<" if self.endian == "little" else ">"
+            versym = struct.unpack_from("{}{}H".format(order, versym.size // 2),
+                                        self._map, versym.offset)
+
+        end = section.offset + section.size - section.size % self._sym.size
+        view = memoryview(self._map)[section.offset:end]
+        try:
+            for i, fields in enumerate(self._sym.iter_unpack(view)):
+                if self.bits == 32:
+                    st_name, value = fields[0], fields[1]
+                else:
+                    st_name, value = fields[0], fields[4]
+
+                if st_name:
+                    hidden = versym is not None and versym[i] & VERSYM_HIDDEN
+                    yield self._string(strtab.offset + st_name), value, hidden
+        finally:
+            view.release()
+
+
+    def _sections_list(self) -> List[Section]:
+        self.sections
+        return self._section_list
+
+
+    def _section_by_index(self, index: int) -> Optional[Section]:
+        sections = self._sections_list()
+        if 0 < index < len(sections):
+            return sections[index]
+
+        return None
+
+
+    def _iter_relocs(self, section: Section) -> Iterator:
+        symtab = self._section_by_index(section.link)
+        strtab = self._section_by_index(symtab.link) if symtab is not None else None
+
+        layout = self._rela if section.type == SHT_RELA else self._rel
+        shift = 8 if self.bits == 32 else 32
+        mask = (1 << shift) - 1
+
+        end = section.offset + section.size - section.size % layout.size
+        view = memoryview(self._map)[section.offset:end]
+        try:
+            for fields in layout.iter_unpack(view):
+                offset, info = fields[0], fields[1]
+
+                name = None
+                index = info >> shift
+                if index and strtab is not None:
+                    st_name = self._sym.unpack_from(self._map,
+                                                    symtab.offset + index * self._sym.size)[0]
+                    name = self._string(strtab.offset + st_name)
+
+                yield name, offset, info & mask
+        finally:
+            view.release()
+
+
+    def vaddr_to_offset(self, address: int) -> Optional[int]:
+        address -= self._slide
+        for seg in self.segments:
+            if seg.type == PT_LOAD and seg.vaddr <= address < seg.vaddr + seg.filesz:
+                return seg.offset + address - seg.vaddr
+
+        return None
+
+
+    def offset_to_vaddr(self, offset: int) -> Optional[int]:
+        for seg in self.segments:
+            if seg.type == PT_LOAD and seg.offset <= offset < seg.offset + seg.filesz:
+                return seg.vaddr + offset - seg.offset + self._slide
+
+        return None
+
+
+    def view(self, address: int, size: int) -> memoryview:
+        # the mapped bytes themselves, nothing is copied. Release the view
+        # before close(), an exported mmap can't be closed
+        offset = self.vaddr_to_offset(address)
+        if offset is None:
+            raise ValueError("{:#x} is not mapped from the file".format(address))
+
+        return memoryview(self._map)[offset:offset + size]
+
+
+    def read(self, address: int, size: int) -> bytes:
+        offset = self.vaddr_to_offset(address)
+        if offset is None:
+            raise ValueError("{:#x} is not mapped from the file".format(address))
+
+        return self._map[offset:offset + size]
+
+
+    def string(self, address: int) -> bytes:
+        offset = self.vaddr_to_offset(address)
+        if offset is None:
+            raise ValueError("{:#x} is not mapped from the file".format(address))
+
+        return self._map[offset:self._map.find(b"\x00", offset)]
+
+
+    def search(self, needle: Union[str, bytes],
+               writable: bool=False,
+               executable: bool=False) -> Iterator[int]:
+        # addresses of every occurrence in the loaded segments, mmap.find runs
+        # over the mapping directly
+        needle = bytes(str2bytes(needle))
+
+        for seg in self.segments:
+            if seg.type != PT_LOAD:
+                continue
+            if writable and not seg.flags & PF_W:
+                continue
+            if executable and not seg.flags & PF_X:
+                continue
+
+            start = seg.offset
+            end = seg.offset + seg.filesz
+            while True:
+                i = self._map.find(needle, start, end)
+                if i == -1:
+                    break
+
+                yield seg.vaddr + i - seg.offset + self._slide
+                start = i + 1
@@ -1 +1,10 @@
-from .byte import *
+from pwnlib._lazy import lazy
+
+_names = {
+    "str2bytes": ".byte",
+    "bytes2str": ".byte",
+    "encode": ".encoder",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
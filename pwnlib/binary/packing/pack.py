@@ -34,3 +34,31 @@ def p64(data, byteorder:str='little') -> bytes:
                data)
 
     return (data & 0xFFFFFFFFFFFFFFFF).to_bytes(8, byteorder=byteorder)
+
+
+def u8(data: bytes, signed: bool=False) -> int:
+    assert isinstance(data, (bytes, bytearray, memoryview)) and len(data) == 1, \
+            "{} given, must be 1 byte long 'bytes'".format(type(data))
+
+    return int.from_bytes(data, byteorder='little', signed=signed)
+
+
+def u16(data: bytes, byteorder: str='little', signed: bool=False) -> int:
+    assert isinstance(data, (bytes, bytearray, memoryview)) and len(data) == 2, \
+            "{} given, must be 2 bytes long 'bytes'".format(type(data))
+
+    return int.from_bytes(data, byteorder=byteorder, signed=signed)
+
+
+def u32(data: bytes, byteorder: str='little', signed: bool=False) -> int:
+    assert isinstance(data, (bytes, bytearray, memoryview)) and len(data) == 4, \
+            "{} given, must be 4 bytes long 'bytes'".format(type(data))
+
+    return int.from_bytes(data, byteorder=byteorder, signed=signed)
+
+
+def u64(data: bytes, byteorder: str='little', signed: bool=False) -> int:
+    assert isinstance(data, (bytes, bytearray, memoryview)) and len(data) == 8, \
+            "{} given, must be 8 bytes long 'bytes'".format(type(data))
+
+    return int.from_bytes(data, byteorder=byteorder, signed=signed)
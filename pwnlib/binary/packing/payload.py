@@ -0,0 +1,107 @@
+import struct
+from typing import Union, Optional, Mapping, List
+
+from .bulk import flat, _format
+from pwnlib.binary.encoding import str2bytes
+
+Value = Union[int, str, bytes, bytearray, memoryview, List]
+
+class Payload(object):
+    def __init__(self,
+                 length: Optional[int]=None,
+                 filler: Union[str, bytes]=b'\x00',
+                 word_size: int=64,
+                 byteorder: str='little'
+                 ):
+
+        assert length is None or (isinstance(length, int) and length >= 0), \
+                "`length` is {}, must be positive 'int'".format(type(length))
+
+        assert isinstance(filler, (str, bytes)) and len(filler) > 0, \
+                "`filler` is {}, must be non empty 'str' or 'bytes'".format(type(filler))
+
+        self._length = length
+        self._filler = str2bytes(filler)
+        self._word_size = word_size
+        self._byteorder = byteorder
+        self._word = struct.Struct(_format(word_size, byteorder, False))
+        self._writes = {}
+
+
+    def __setitem__(self, offset: int, value: Value):
+        self.write(offset, value)
+
+
+    def __len__(self) -> int:
+        end = max((o + self._size(v) for o, v in self._writes.items()), default=0)
+        if self._length is not None:
+            end = max(end, self._length)
+
+        return end
+
+
+    def _size(self, value: Value) -> int:
+        if isinstance(value, int):
+            return self._word.size
+
+        return len(value)
+
+
+    def write(self, offset: int, value: Value):
+        assert isinstance(offset, int) and offset >= 0, \
+                "`offset` is {}, must be positive 'int'".format(offset)
+
+        if isinstance(value, str):
+            value = str2bytes(value)
+        elif isinstance(value, (list, tuple)):
+            value = flat(value, word_size=self._word_size, byteorder=self._byteorder)
+        elif not isinstance(value, (int, bytes, bytearray, memoryview)):
+            raise ValueError("{} given, must be 'int', 'str', 'bytes' or 'list'".format(type(value)))
+
+        if offset in self._writes:
+            raise ValueError("Overlapping writes at offset {:#x}".format(offset))
+
+        self._writes[offset] = value
+
+
+    def update(self, writes: Mapping[int, Value]):
+        for offset, value in writes.items():
+            self.write(offset, value)
+
+
+    def build(self) -> memoryview:
+        writes = sorted(self._writes.items())
+
+        end = 0
+        for offset, value in writes:
+            if offset < end:
+                raise ValueError("Overlapping writes at offset {:#x}".format(offset))
+            end = offset + self._size(value)
+
+        total = len(self)
+        if self._length is not None and end > self._length:
+            raise ValueError("Payload is {} bytes long, larger than {}".format(end, self._length))
+
+        # one allocation for the whole payload, the filler repeat and every
+        # write happen in place
+        buf = bytearray(self._filler) * (total // len(self._filler) + 1)
+        del buf[total:]
+
+        mask = (1 << self._word_size) - 1
+        for offset, value in writes:
+            if isinstance(value, int):
+                self._word.pack_into(buf, offset, value & mask)
+            else:
+                buf[offset:offset+len(value)] = value
+
+        return memoryview(buf)
+
+
+def fit(writes: Mapping[int, Value],
+        length: Optional[int]=None,
+        filler: Union[str, bytes]=b'\x00',
+        word_size: int=64,
+        byteorder: str='little') -> memoryview:
+    payload = Payload(length, filler, word_size, byteorder)
+    payload.update(writes)
+    return payload.build()
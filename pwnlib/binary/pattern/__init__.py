@@ -0,0 +1,9 @@
+from pwnlib._lazy import lazy
+
+_names = {
+    "cyclic": ".debruijn",
+    "cyclic_find": ".debruijn",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
@@ -0,0 +1,292 @@
+import string
+from typing import Union, Optional, List, Tuple
+
+from pwnlib.binary.encoding import str2bytes
+from pwnlib.binary.packing import p32, p64
+
+_default_alphabet = string.ascii_lowercase.encode()
+
+# The pattern is the lexicographically least de Bruijn sequence B(k, n), the
+# concatenation in lexicographic order of the Lyndon words whose length
+# divides n (Fredricksen-Kessler-Maiorana). Everything below works on symbol
+# indexes 0..k-1, the alphabet is only applied to the output.
+
+def _alphabet(alphabet: Union[str, bytes]) -> bytes:
+    assert isinstance(alphabet, (str, bytes, bytearray)), \
+            "`alphabet` is {}, must be 'str' or 'bytes'".format(type(alphabet))
+
+    alphabet = bytes(str2bytes(alphabet))
+    assert len(alphabet) > 0 and len(set(alphabet)) == len(alphabet), \
+            "`alphabet` must be non empty and can't repeat bytes"
+
+    return alphabet
+
+
+def _lyn(a: List[int]) -> int:
+    # length of the longest Lyndon prefix of the prenecklace `a`, 0 when `a`
+    # isn't a prenecklace
+    p = 1
+    for i in range(1, len(a)):
+        if a[i] < a[i - p]:
+            return 0
+        if a[i] > a[i - p]:
+            p = i + 1
+
+    return p
+
+
+def _next_prenecklace(a: List[int], k: int) -> int:
+    # steps `a` to the next prenecklace in place, returns its lyn or 0 past
+    # the last one
+    i = len(a) - 1
+    while i >= 0 and a[i] == k - 1:
+        i -= 1
+
+    if i < 0:
+        return 0
+
+    a[i] += 1
+    for j in range(i + 1, len(a)):
+        a[j] = a[j - i - 1]
+
+    return i + 1
+
+
+def _prev_prenecklace(a: List[int], k: int) -> int:
+    # the largest prenecklace below `a` shares a prefix with it, has a smaller
+    # symbol next and only k-1 after that
+    n = len(a)
+    for i in range(n - 1, -1, -1):
+        if a[i] == 0:
+            continue
+
+        low = a[i - _lyn(a[:i])] if i else 0
+        if a[i] - 1 >= low:
+            a[i] -= 1
+            a[i + 1:] = [k - 1] * (n - i - 1)
+            return _lyn(a)
+
+    return 0
+
+
+def _next_necklace(a: List[int], k: int) -> int:
+    n = len(a)
+    while True:
+        p = _next_prenecklace(a, k)
+        if p == 0 or n % p == 0:
+            return p
+
+
+def _prev_necklace(a: List[int], k: int) -> int:
+    n = len(a)
+    while True:
+        p = _prev_prenecklace(a, k)
+        if p == 0 or n % p == 0:
+            return p
+
+
+def _ceil_necklace(x: List[int], k: int) -> Tuple[List[int], int]:
+    # smallest necklace >= x, ([], 0) when there is none
+    a = list(x)
+    n = len(a)
+
+    p = 1
+    for i in range(1, n):
+        if a[i] < a[i - p]:
+            # the smallest prenecklace above keeps the prefix and repeats it
+            for j in range(i, n):
+                a[j] = a[j - p]
+            break
+        if a[i] > a[i - p]:
+            p = i + 1
+
+    p = _lyn(a)
+    if n % p != 0:
+        p = _next_necklace(a, k)
+
+    return (a, p) if p else ([], 0)
+
+
+def _rank(y: List[int], k: int) -> int:
+    # offset of the necklace y in the sequence: the sum of the periods of the
+    # necklaces below y, which is the number of strings whose least rotation
+    # is below y. The complement (every rotation >= y) is the number of
+    # cyclic strings avoiding the factors y[:j]+c with c < y[j], counted as
+    # the closed walks of length n of a KMP automaton over the prefixes of y
+    n = len(y)
+
+    # symbols that compare the same against every y[j] behave the same
+    values = sorted(set(y))
+    classes = []
+    prev = -1
+    for v in values:
+        if v - prev > 1:
+            classes.append((prev + 1, v - prev - 1))
+        classes.append((v, 1))
+        prev = v
+    if prev < k - 1:
+        classes.append((prev + 1, k - 1 - prev))
+
+    m = [[0] * n for _ in range(n)]
+    for q in range(n):
+        for c, count in classes:
+            t = y[:q] + [c]
+
+            bad = False
+            for i in range(len(t)):
+                s = t[i:]
+                if s[-1] < y[len(s) - 1] and s[:-1] == y[:len(s) - 1]:
+                    bad = True
+                    break
+            if bad:
+                continue
+
+            state = 0
+            for j in range(min(len(t), n - 1), 0, -1):
+                if t[-j:] == y[:j]:
+                    state = j
+                    break
+
+            m[q][state] += count
+
+    def mul(x, z):
+        return [[sum(x[i][l] * z[l][j] for l in range(n)) for j in range(n)]
+                for i in range(n)]
+
+    power = [[int(i == j) for j in range(n)] for i in range(n)]
+    e = n
+    while e:
+        if e & 1:
+            power = mul(power, m)
+        m = mul(m, m)
+        e >>= 1
+
+    return k ** n - sum(power[i][i] for i in range(n))
+
+
+def _generate(k: int, n: int, length: int) -> bytearray:
+    if n == 1:
+        return bytearray(range(k))[:length]
+
+    # the length-n prenecklaces are walked in blocks sharing their first
+    # n-1 symbols `a`: with p = lyn(a) the block is a[:p] (when p divides n)
+    # followed by a+c for every c > a[n-1-p], built with slice operations
+    t = n - 1
+    a = bytearray(t)
+    p = 1
+    symbols = bytes(range(k))
+
+    out = bytearray()
+    while len(out) < length:
+        low = a[t - p]
+        if n % p == 0:
+            out += a[:p]
+
+        count = k - 1 - low
+        if count:
+            block = bytearray((a + b"\x00") * count)
+            block[t::n] = symbols[low + 1:]
+            out += block
+
+        p = _next_prenecklace(a, k)
+        if p == 0:
+            break
+
+    del out[length:]
+    return out
+
+
+def cyclic(length: Optional[int]=None,
+           alphabet: Union[str, bytes]=_default_alphabet,
+           subseq_len: int=4) -> bytes:
+    assert isinstance(subseq_len, int) and subseq_len > 0, \
+            "`subseq_len` is {}, must be positive 'int'".format(subseq_len)
+
+    alphabet = _alphabet(alphabet)
+    k = len(alphabet)
+
+    if length is None:
+        length = k ** subseq_len
+
+    assert isinstance(length, int) and 0 <= length <= k ** subseq_len, \
+            "`length` is {}, must be 'int' up to {}".format(length, k ** subseq_len)
+
+    table = bytearray(range(256))
+    table[:k] = alphabet
+
+    return bytes(_generate(k, subseq_len, length).translate(table))
+
+
+def cyclic_find(subseq: Union[int, str, bytes],
+                alphabet: Union[str, bytes]=_default_alphabet,
+                subseq_len: int=4) -> int:
+    # offset of `subseq` (a crashed register value or bytes read from the
+    # target) in cyclic(), -1 when it isn't part of the pattern
+    assert isinstance(subseq_len, int) and subseq_len > 0, \
+            "`subseq_len` is {}, must be positive 'int'".format(subseq_len)
+
+    if isinstance(subseq, int):
+        if subseq_len == 4:
+            subseq = p32(subseq)
+        elif subseq_len == 8:
+            subseq = p64(subseq)
+        else:
+            subseq = (subseq % (1 << 8 * subseq_len)).to_bytes(subseq_len, "little")
+
+    subseq = bytes(str2bytes(subseq))
+    assert len(subseq) >= subseq_len, \
+            "`subseq` is {} bytes long, at least `subseq_len` are needed".format(len(subseq))
+
+    alphabet = _alphabet(alphabet)
+    k = len(alphabet)
+    n = subseq_len
+
+    index = {c: i for i, c in enumerate(alphabet)}
+    try:
+        w = [index[c] for c in subseq]
+    except KeyError:
+        return -1
+
+    # the window starts in the output of a necklace y, right before the
+    # next one. The n symbols output from the start of any necklace spell
+    # that necklace, so y is either the least rotation of the window or the
+    # window is a run of k-1 closing y followed by the start of the next
+    # necklace. Each candidate is checked on a few necklaces around it.
+    head = w[:n]
+    rotations = min(head[i:] + head[:i] for i in range(n))
+    candidates = [(rotations, _lyn(rotations))]
+    for j in range(n + 1):
+        candidates.append(_ceil_necklace(head[j:] + [0] * j, k))
+
+    tried = set()
+    for y, p in candidates:
+        if not p or tuple(y) in tried:
+            continue
+        tried.add(tuple(y))
+
+        # necklaces before y until n symbols precede it
+        before = []
+        a = list(y)
+        size = 0
+        while size < n:
+            q = _prev_necklace(a, k)
+            if q == 0:
+                break
+            before.append(a[:q])
+            size += q
+
+        text = []
+        for root in reversed(before):
+            text += root
+
+        a = list(y)
+        q = p
+        while q and len(text) < size + len(w) + n:
+            text += a[:q]
+            q = _next_necklace(a, k)
+
+        for i in range(len(text) - len(w) + 1):
+            if text[i:i + len(w)] == w:
+                return _rank(y, k) - size + i
+
+    return -1
@@ -0,0 +1,9 @@
+from pwnlib._lazy import lazy
+
+_names = {
+    "Gadgets": ".gadgets",
+    "find_gadget": ".gadgets",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
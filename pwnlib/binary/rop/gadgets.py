@@ -0,0 +1,216 @@
+import os
+import re
+import json
+import mmap
+import hashlib
+import multiprocessing
+from typing import Union, Optional, List, Dict, Tuple, Mapping, Iterator
+
+from .x86 import decode, INSN
+from pwnlib.arch.config import CACHE_PATH, GADGET_CACHE_SIZE
+from pwnlib.arch.cache import AssemblerCache
+from pwnlib.binary.elf import ELF
+from pwnlib.binary.elf.elf import _Rebased, PT_LOAD, PF_X
+
+# bumped whenever the decoder output changes, old indexes are then ignored
+INDEX_VERSION = 1
+
+# ret, ret imm16, syscall, int 0x80, call/jmp reg (a REX byte before the
+# ff is picked up when decoding backwards)
+_terminators = re.compile(rb"(?=\xc3|\xc2..|\x0f\x05|\xcd\x80|\xff[\xd0-\xd7\xe0-\xe7])", re.S)
+
+# longest instruction the decoder understands (REX + movabs)
+_max_insn = 10
+
+# segments smaller than this are scanned without starting workers
+_parallel_min = 1 << 20
+
+_cache = None
+
+
+def _get_cache() -> AssemblerCache:
+    global _cache
+
+    if _cache is None:
+        _cache = AssemblerCache(os.path.join(CACHE_PATH, "gadgets"), GADGET_CACHE_SIZE, 8)
+
+    return _cache
+
+
+def _scan(task: Tuple[str, int, int, int, int, int, int, int]) -> Dict[str, int]:
+    # one worker: the gadgets ending at the terminators found in
+    # [lo, hi) of a segment, the file is mapped again in the worker so
+    # only offsets cross the process boundary
+    path, seg_offset, seg_size, vaddr, lo, hi, bits, depth = task
+
+    gadgets = {}
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        code = memoryview(m)[seg_offset:seg_offset + seg_size]
+        try:
+            for match in _terminators.finditer(code, lo, hi):
+                t = match.start()
+                for start in range(t, max(t - depth * _max_insn, 0) - 1, -1):
+                    text = _gadget(code, start, t, seg_size, bits, depth)
+                    if text is not None and text not in gadgets:
+                        gadgets[text] = vaddr + start
+        finally:
+            code.release()
+
+    return gadgets
+
+
+def _gadget(code, start: int, t: int, end: int, bits: int, depth: int) -> Optional[str]:
+    # decodes from `start`, the gadget must run into the terminator at
+    # `t` (or one REX byte before it) within `depth` instructions
+    insns = []
+    pos = start
+    while len(insns) <= depth:
+        insn = decode(code, pos, end, bits)
+        if insn is None:
+            return None
+
+        size, text, kind = insn
+        insns.append(text)
+
+        if kind != INSN:
+            return "; ".join(insns) if t - 1 <= pos <= t else None
+
+        pos += size
+        if pos > t:
+            return None
+
+    return None
+
+
+def _file_hash(path: str) -> str:
+    # the digest is remembered per (inode, size, mtime) so an unchanged file
+    # isn't read again on every run
+    st = os.stat(path)
+    stat_key = AssemblerCache.key("{}|{}|{}|{}".format(path, st.st_ino, st.st_size,
+                                                       st.st_mtime_ns).encode(),
+                                  "stat", str(INDEX_VERSION))
+    digest = _get_cache().get(stat_key)
+    if digest is not None:
+        return digest.decode()
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            h.update(chunk)
+
+    _get_cache().put(stat_key, h.hexdigest().encode())
+    return h.hexdigest()
+
+
+class Gadgets(Mapping):
+    def __init__(self, elf: Union[str, bytes, ELF],
+                 depth: int=6,
+                 processes: Optional[int]=None,
+                 cache: bool=True):
+        assert isinstance(depth, int) and depth > 0, \
+                "`depth` is {}, must be positive 'int'".format(depth)
+
+        if not isinstance(elf, ELF):
+            elf = ELF(elf)
+
+        assert elf.arch in ("amd64", "i386"), \
+                "{} is not supported, only 'amd64' and 'i386'".format(elf.arch)
+
+        self.elf = elf
+        self.depth = depth
+
+        key = None
+        if cache:
+            key = AssemblerCache.key(str(depth).encode(), elf.arch,
+                                     "{}|{}".format(INDEX_VERSION, _file_hash(elf.path)))
+            data = _get_cache().get(key)
+            if data is not None:
+                self._table(json.loads(data))
+                return
+
+        table = self._search(processes)
+        self._table(table)
+
+        if key is not None:
+            _get_cache().put(key, json.dumps(table).encode())
+
+
+    def _table(self, table: Dict[str, int]):
+        # link-time addresses, rebased with the ELF
+        self._gadgets = _Rebased(self.elf, lambda: table)
+
+
+    def _search(self, processes: Optional[int]) -> Dict[str, int]:
+        processes = processes or os.cpu_count() or 1
+
+        # one chunk of terminators per worker in every executable segment
+        tasks = []
+        for seg in self.elf.segments:
+            if seg.type != PT_LOAD or not seg.flags & PF_X or not seg.filesz:
+                continue
+
+            step = -(-seg.filesz // processes)
+            for lo in range(0, seg.filesz, step):
+                tasks.append((self.elf.path, seg.offset, seg.filesz, seg.vaddr,
+                              lo, min(lo + step, seg.filesz), self.elf.bits, self.depth))
+
+        size = sum(seg.filesz for seg in self.elf.segments if seg.type == PT_LOAD and seg.flags & PF_X)
+        if processes > 1 and size >= _parallel_min:
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.map(_scan, tasks)
+        else:
+            results = map(_scan, tasks)
+
+        gadgets = {}
+        for result in results:
+            for text, address in result.items():
+                if text not in gadgets or address < gadgets[text]:
+                    gadgets[text] = address
+
+        return gadgets
+
+
+    def __getitem__(self, insns: Union[str, List[str]]) -> int:
+        address = self.find_gadget(insns)
+        if address is None:
+            raise KeyError(insns)
+
+        return address
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._gadgets)
+
+
+    def __len__(self) -> int:
+        return len(self._gadgets)
+
+
+    def find_gadget(self, insns: Union[str, List[str]]) -> Optional[int]:
+        # the address (following elf.address) of a gadget made of exactly
+        # these instructions, "pop rdi; ret" or ['pop rdi', 'ret']
+        if isinstance(insns, str):
+            insns = insns.split(";")
+
+        text = "; ".join(" ".join(insn.split()) for insn in insns if insn.strip())
+
+        return self._gadgets.get(text)
+
+
+    def search(self, pattern: str) -> Iterator[Tuple[int, str]]:
+        # (address, text) of every gadget matching a regular expression
+        regex = re.compile(pattern)
+
+        for text, address in self._gadgets.items():
+            if regex.search(text):
+                yield address, text
+
+
+def find_gadget(elf: Union[str, bytes, ELF],
+                insns: Union[str, List[str]],
+                depth: int=6) -> Optional[int]:
+    # one-off lookup, the index is loaded from (or saved to) the cache
+    return Gadgets(elf, depth).find_gadget(insns)
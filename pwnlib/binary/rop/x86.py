@@ -0,0 +1,187 @@
+from typing import Optional, Tuple
+
+# A small x86/amd64 decoder for the instructions that make up useful
+# gadgets, anything else makes the candidate gadget invalid. The text
+# follows the usual Intel syntax (as printed by objdump -M intel or
+# capstone) so gadgets can be looked up by name.
+
+_regs64 = ("rax", "rcx", "rdx", "rbx", "rsp", "rbp", "rsi", "rdi",
+           "r8", "r9", "r10", "r11", "r12", "r13", "r14", "r15")
+_regs32 = ("eax", "ecx", "edx", "ebx", "esp", "ebp", "esi", "edi",
+           "r8d", "r9d", "r10d", "r11d", "r12d", "r13d", "r14d", "r15d")
+
+# reg, r/m forms of the two operand ALU and move instructions
+_alu = {
+    0x01: "add", 0x09: "or", 0x21: "and", 0x29: "sub", 0x31: "xor",
+    0x39: "cmp", 0x85: "test", 0x87: "xchg", 0x89: "mov",
+}
+_alu_rev = {
+    0x03: "add", 0x0b: "or", 0x23: "and", 0x2b: "sub", 0x33: "xor",
+    0x3b: "cmp", 0x8b: "mov",
+}
+_group1 = ("add", "or", "adc", "sbb", "and", "sub", "xor", "cmp")
+
+# kinds of decoded instructions
+INSN = 0
+RET = 1
+JMP = 2
+SYSCALL = 3
+
+
+def _imm(value: int) -> str:
+    if value < 0:
+        return "-" + _imm(-value)
+
+    return str(value) if value < 10 else hex(value)
+
+
+def _ptr(bits: int) -> str:
+    return "qword ptr" if bits == 64 else "dword ptr"
+
+
+def decode(code, pos: int, end: int, bits: int=64) -> Optional[Tuple[int, str, int]]:
+    # (length, text, kind) of the instruction at `pos`, None if unsupported
+    if pos >= end:
+        return None
+
+    start = pos
+    rex = 0
+    if bits == 64 and 0x40 <= code[pos] <= 0x4f:
+        rex = code[pos]
+        pos += 1
+        if pos >= end:
+            return None
+
+    w = bits == 64 and rex & 8
+    r = 8 if rex & 4 else 0
+    b = 8 if rex & 1 else 0
+
+    # operand size of the instruction, and the size of stack operations
+    regs = _regs64 if w else _regs32
+    stack = _regs64 if bits == 64 else _regs32
+
+    op = code[pos]
+    pos += 1
+
+    def modrm():
+        if pos >= end:
+            return None
+        m = code[pos]
+        return m >> 6, (m >> 3) & 7, m & 7
+
+    if op == 0xc3:
+        return pos - start, "ret", RET
+
+    if op == 0xc2:
+        if pos + 2 > end:
+            return None
+        return pos + 2 - start, "ret " + _imm(code[pos] | code[pos + 1] << 8), RET
+
+    if op == 0x0f:
+        if pos < end and code[pos] == 0x05 and bits == 64:
+            return pos + 1 - start, "syscall", SYSCALL
+        return None
+
+    if op == 0xcd:
+        if pos < end and code[pos] == 0x80:
+            return pos + 1 - start, "int 0x80", SYSCALL
+        return None
+
+    if rex & 2:
+        # no SIB byte is ever decoded, REX.X makes no sense here
+        return None
+
+    if bits == 32 and 0x40 <= op <= 0x4f:
+        name = "inc" if op < 0x48 else "dec"
+        return pos - start, "{} {}".format(name, regs[op & 7]), INSN
+
+    if 0x50 <= op <= 0x57:
+        return pos - start, "push " + stack[op - 0x50 + b], INSN
+
+    if 0x58 <= op <= 0x5f:
+        return pos - start, "pop " + stack[op - 0x58 + b], INSN
+
+    if op == 0x90 and not b:
+        return pos - start, "nop", INSN
+
+    if 0x91 <= op <= 0x97:
+        return pos - start, "xchg {}, {}".format(regs[0], regs[op - 0x90 + b]), INSN
+
+    if op == 0xc9:
+        return pos - start, "leave", INSN
+
+    if 0xb8 <= op <= 0xbf:
+        size = 8 if w else 4
+        if pos + size > end:
+            return None
+        value = int.from_bytes(code[pos:pos + size], "little")
+        name = "movabs" if w else "mov"
+        return pos + size - start, "{} {}, {}".format(name, regs[op - 0xb8 + b], _imm(value)), INSN
+
+    if op in _alu or op in _alu_rev:
+        m = modrm()
+        if m is None:
+            return None
+        mod, reg, rm = m
+        pos += 1
+
+        name = _alu.get(op) or _alu_rev.get(op)
+        dst, src = regs[rm + b], regs[reg + r]
+
+        if mod == 3:
+            if op in _alu_rev:
+                dst, src = regs[reg + r], regs[rm + b]
+            return pos - start, "{} {}, {}".format(name, dst, src), INSN
+
+        # register indirect, only for moves: [reg] and [reg + disp8]
+        if op not in (0x89, 0x8b) or rm == 4 or (mod == 0 and rm == 5) or mod == 2:
+            return None
+
+        mem = stack[rm + b]
+        if mod == 1:
+            if pos >= end:
+                return None
+            disp = code[pos] - 256 if code[pos] > 127 else code[pos]
+            pos += 1
+            if disp:
+                mem = "{} {} {}".format(mem, "-" if disp < 0 else "+", _imm(abs(disp)))
+
+        size = _ptr(64 if w else 32)
+        if op == 0x89:
+            text = "mov {} [{}], {}".format(size, mem, regs[reg + r])
+        else:
+            text = "mov {}, {} [{}]".format(regs[reg + r], size, mem)
+        return pos - start, text, INSN
+
+    if op == 0x83:
+        m = modrm()
+        if m is None or m[0] != 3 or pos + 2 > end:
+            return None
+        _, digit, rm = m
+        imm = code[pos + 1]
+        imm = imm - 256 if imm > 127 else imm
+        return pos + 2 - start, "{} {}, {}".format(_group1[digit], regs[rm + b], _imm(imm)), INSN
+
+    if op == 0xf7:
+        m = modrm()
+        if m is None or m[0] != 3 or m[1] not in (2, 3):
+            return None
+        name = "not" if m[1] == 2 else "neg"
+        return pos + 1 - start, "{} {}".format(name, regs[m[2] + b]), INSN
+
+    if op == 0xff:
+        m = modrm()
+        if m is None or m[0] != 3:
+            return None
+        _, digit, rm = m
+        if digit == 0:
+            return pos + 1 - start, "inc " + regs[rm + b], INSN
+        if digit == 1:
+            return pos + 1 - start, "dec " + regs[rm + b], INSN
+        if digit == 2:
+            return pos + 1 - start, "call " + stack[rm + b], JMP
+        if digit == 4:
+            return pos + 1 - start, "jmp " + stack[rm + b], JMP
+        return None
+
+    return None
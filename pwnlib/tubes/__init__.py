@@ -1,2 +1,21 @@
-from .process import Process
-from .winprocess import WinProcess
+from pwnlib._lazy import lazy
+
+# submodules are imported on first use, `import pwnlib` stays cheap and
+# WinProcess only pulls in pywin32 when it is actually used
+_names = {
+    "Process": ".process",
+    "PTY": ".process",
+    "WinProcess": ".winprocess",
+    "Deadline": ".timeout",
+    "Matcher": ".matcher",
+    "Metrics": ".metrics",
+    "AsyncTube": ".asynctube",
+    "AsyncProcess": ".asyncprocess",
+    "Remote": ".remote",
+    "Listen": ".listen",
+    "TubeGroup": ".group",
+    "ProcessPool": ".pool",
+}
+
+__all__ = list(_names)
+__getattr__, __dir__ = lazy(__name__, _names)
@@ -0,0 +1,109 @@
+import asyncio
+from subprocess import PIPE, STDOUT
+from typing import List, Optional, Union, Mapping
+
+from .asynctube import AsyncTube
+from pwnlib.binary.encoding import bytes2str
+
+class AsyncProcess(AsyncTube):
+    _proc = None
+
+    def __init__(self,
+                 proc: asyncio.subprocess.Process,
+                 timeout: Optional[Union[int, float]]=None
+                 ):
+        super().__init__(timeout)
+        self._proc = proc
+
+
+    @classmethod
+    async def create(cls,
+                     args: Union[bytes, str, List[Union[bytes, str]]],
+                     stdin: Optional[int]=PIPE,
+                     stdout: Optional[int]=PIPE,
+                     stderr: Optional[int]=STDOUT,
+                     shell: Optional[bool]=False,
+                     cwd: Optional[Union[str, bytes]]=None,
+                     env: Optional[Union[Mapping[bytes, Union[bytes, str]], \
+                             Mapping[str, Union[bytes, str]]]]=None,
+                     timeout: Optional[Union[int, float]]=None
+                     ) -> "AsyncProcess":
+
+        assert isinstance(args, (bytes, str, list)), \
+                "`args` is {}, must be 'bytes', 'str' or 'list'".format(type(args))
+
+        assert isinstance(shell, bool), \
+                "`shell` is {}, must be 'bool'".format(type(shell))
+
+        if isinstance(args, (str, bytes)):
+            args = [bytes2str(args)]
+        else:
+            args = list(map(bytes2str, args))
+
+        try:
+            if shell:
+                proc = await asyncio.create_subprocess_shell(
+                            " ".join(args),
+                            stdin=stdin,
+                            stdout=stdout,
+                            stderr=stderr,
+                            cwd=cwd,
+                            env=env
+                            )
+            else:
+                proc = await asyncio.create_subprocess_exec(
+                            *args,
+                            stdin=stdin,
+                            stdout=stdout,
+                            stderr=stderr,
+                            cwd=cwd,
+                            env=env
+                            )
+
+        except FileNotFoundError as err:
+            raise ValueError("Could not execute {} ({})".format(args, err))
+
+        return cls(proc, timeout)
+
+
+    @property
+    def pid(self) -> int:
+        return self._proc.pid
+
+    def returncode(self) -> Optional[int]:
+        return self._proc.returncode
+
+
+    def _is_alive(self) -> bool:
+        return self._proc.returncode is None
+
+
+    async def _close(self):
+        if self.is_alive():
+            try:
+                self._proc.kill()
+            except ProcessLookupError:
+                pass
+
+        if self._proc.stdin is not None:
+            self._proc.stdin.close()
+
+        await self._proc.wait()
+
+
+    async def _recv_raw(self, size: int) -> bytes:
+        # returns as soon as some data is buffered, b'' on EOF
+        return await self._proc.stdout.read(size)
+
+
+    async def _send_raw(self, data: bytes) -> int:
+        self._proc.stdin.write(data)
+        await self._proc.stdin.drain()
+        return len(data)
+
+
+    async def _send_raw_many(self, buffers: List[Union[bytes, bytearray, memoryview]]) -> int:
+        # the transport gathers them into as few writes as it can
+        self._proc.stdin.writelines(buffers)
+        await self._proc.stdin.drain()
+        return sum(memoryview(b).nbytes for b in buffers)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+import abc
+import asyncio
+from typing import Union, Optional, List, Tuple, Iterable, Pattern, Match
+
+from .matcher import Matcher
+from .reader import Reader, Timeout, _Found
+from .timeout import Deadline
+from pwnlib.binary.encoding import str2bytes
+
+class AsyncTube(Reader, metaclass=abc.ABCMeta):
+    async def _fill(self, size: int, deadline: Deadline) -> int:
+        # asyncio.TimeoutError is only an alias of TimeoutError from 3.11
+        try:
+            data = await asyncio.wait_for(self._recv_raw(size),
+                                          deadline.remaining())
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout (_recv_raw)") from None
+
+        if data:
+            self._buffer.add(data)
+
+        return len(data)
+
+
+    async def recv(self, size: int=4096,
+                   timeout: Timeout=None
+                   ) -> bytes:
+        assert size is None or (isinstance(size, int) and size >=0), \
+                "`size` is {}, must be positive 'int'".format(type(size))
+
+        # no size reads until EOF
+        if size is None:
+            deadline = self.deadline(timeout)
+            while True:
+                try:
+                    n = await self._fill(65536, deadline)
+                except TimeoutError:
+                    raise TimeoutError("Timeout (recv)")
+                except Exception as err:
+                    raise err from None
+
+                if n == 0:
+                    return self._buffer.get()
+
+        if not self._buffer:
+            try:
+                await self._fill(size, self.deadline(timeout))
+            except TimeoutError:
+                raise TimeoutError("Timeout (recv)")
+            except Exception as err:
+                raise err from None
+
+        return self._buffer.get(size)
+
+
+    async def _recvmatch(self, matcher: Matcher,
+                         size: int,
+                         deadline: Deadline,
+                         name: str,
+                         capture: bool=False) -> _Found:
+        searched = 0
+        while True:
+            found = self._take_match(matcher, searched, capture)
+            if found is not None:
+                return found
+
+            searched = len(self._buffer)
+
+            try:
+                n = await self._fill(size, deadline)
+            except TimeoutError as err:
+                raise TimeoutError("Timeout ({})".format(name))
+            except Exception as err:
+                raise err from None
+
+            if n == 0:
+                raise ConnectionAbortedError("Connection closed ({})".format(name))
+
+
+    async def recvuntil(self,
+                        delim: Union[str, bytes, List[Union[str, bytes]]],
+                        size: int=4096,
+                        timeout: Timeout=None,
+                        drop: bool=False
+                        ) -> bytes:
+        data, i, _, _ = await self._recvmatch(self._until_matcher(delim), size,
+                                           self.deadline(timeout), "recvuntil")
+        if drop:
+            data = data[:i]
+
+        return data
+
+
+    async def recvuntil_any(self,
+                            delims: Union[List[Union[str, bytes]], Matcher],
+                            size: int=4096,
+                            timeout: Timeout=None,
+                            drop: bool=False
+                            ) -> Tuple[int, bytes]:
+        data, i, index, _ = await self._recvmatch(self._any_matcher(delims), size,
+                                               self.deadline(timeout), "recvuntil_any")
+        if drop:
+            data = data[:i]
+
+        return index, data
+
+
+    async def recvregex(self,
+                        pattern: Union[str, bytes, Pattern],
+                        size: int=4096,
+                        timeout: Timeout=None,
+                        drop: bool=False
+                        ) -> Tuple[bytes, Match]:
+        data, i, _, match = await self._recvmatch(self._regex_matcher(pattern), size,
+                                           self.deadline(timeout), "recvregex", True)
+        if drop:
+            data = data[:i]
+
+        return data, match
+
+
+    async def recvline(self, size: int=4096,
+                       timeout: Timeout=None,
+                       drop: bool=False) -> bytes:
+        try:
+            line = await self.recvuntil('\n', size, timeout, drop)
+        except TimeoutError as err:
+            raise TimeoutError("Timeout (recvline)")
+
+        return line
+
+
+    async def _write(self, buffers: List[Union[bytes, bytearray, memoryview]],
+                     timeout: Timeout=None) -> int:
+        if len(buffers) == 1:
+            coro = self._send_raw(buffers[0])
+        else:
+            coro = self._send_raw_many(buffers)
+
+        try:
+            return await asyncio.wait_for(coro, self.deadline(timeout).remaining())
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout (send)") from None
+        except Exception as err:
+            raise err from None
+
+
+    async def send(self, data: Union[str, bytes, bytearray, memoryview],
+                   timeout: Timeout=None
+                   ) -> int:
+        # buffers such as a built Payload are written as they are, any
+        # other type is rejected by str2bytes
+        return await self._write([str2bytes(data)], timeout)
+
+
+    async def sendline(self, data: Union[str, bytes, bytearray, memoryview],
+                       timeout: Timeout=None) -> int:
+        return await self._write([str2bytes(data), b'\n'], timeout)
+
+
+    async def sendmany(self, items: Iterable[Union[str, bytes, bytearray, memoryview]],
+                       timeout: Timeout=None) -> int:
+        buffers = [str2bytes(data) for data in items]
+        if not buffers:
+            return 0
+
+        return await self._write(buffers, timeout)
+
+
+    async def sendlines(self, lines: Iterable[Union[str, bytes, bytearray, memoryview]],
+                        timeout: Timeout=None) -> int:
+        buffers = []
+        for line in lines:
+            buffers.append(str2bytes(line))
+            buffers.append(b'\n')
+
+        if not buffers:
+            return 0
+
+        return await self._write(buffers, timeout)
+
+
+    async def sendafter(self, delim: Union[str, bytes],
+                        data: Union[str, bytes],
+                        size: int=4096,
+                        timeout: Timeout=None,
+                        drop: bool=False) -> int:
+        deadline = self.deadline(timeout)
+        await self.recvuntil(delim, size, deadline, drop)
+        return await self.send(data, deadline)
+
+
+    async def sendlineafter(self, delim: Union[str, bytes],
+                            data: Union[str, bytes],
+                            size: int=4096,
+                            timeout: Timeout=None,
+                            drop: bool=False) -> int:
+        deadline = self.deadline(timeout)
+        await self.recvuntil(delim, size, deadline, drop)
+        return await self.sendline(data, deadline)
+
+
+    def is_alive(self) -> bool:
+        if not self._is_closed:
+            return self._is_alive()
+
+        return False
+
+
+    async def close(self):
+        await self._close()
+        self._is_closed = True
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+    @abc.abstractmethod
+    async def _recv_raw(self, size: int) -> bytes:
+        pass
+
+
+    @abc.abstractmethod
+    async def _send_raw(self, data: bytes) -> int:
+        pass
+
+
+    async def _send_raw_many(self, buffers: List[Union[bytes, bytearray, memoryview]]) -> int:
+        return await self._send_raw(b''.join(buffers))
+
+
+    @abc.abstractmethod
+    async def _close(self):
+        pass
+
+
+    @abc.abstractmethod
+    def _is_alive(self) -> bool:
+        pass
@@ -0,0 +1,52 @@
+from typing import Union, Optional, List, Tuple
+
+
+class Buffer(object):
+    def __init__(self):
+        # bytearray deletes from the front in amortized O(1), so consuming
+        # the head of a large buffer does not copy the remaining bytes
+        self._data = bytearray()
+
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+    def __bool__(self) -> bool:
+        return len(self._data) > 0
+
+
+    def add(self, data: Union[bytes, bytearray]):
+        self._data += data
+
+
+    def unget(self, data: Union[bytes, bytearray]):
+        self._data[:0] = data
+
+
+    def get(self, size: Optional[int]=None) -> bytes:
+        if size is None or size >= len(self._data):
+            size = len(self._data)
+
+        data = bytes(self._data[:size])
+        del self._data[:size]
+        return data
+
+
+    def peek(self) -> bytes:
+        # copy of the unconsumed bytes, left in the buffer
+        return bytes(self._data)
+
+
+    def get_into(self, view: memoryview) -> int:
+        size = min(len(view), len(self._data))
+        view[:size] = self._data[:size]
+        del self._data[:size]
+        return size
+
+
+    def search(self, matcher: "Matcher", start: int=0) -> Optional[Tuple[int, int, int]]:
+        # the matcher only rescans the bytes before `start` that a match
+        # ending past it could begin in, so a caller that already scanned
+        # the first `start` bytes only pays for the new ones
+        return matcher.search(self._data, start)
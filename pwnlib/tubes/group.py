@@ -0,0 +1,190 @@
+import selectors
+from typing import Union, Optional, List, Tuple, Iterable
+
+from .tube import Tube, Timeout
+from .timeout import Deadline
+from .matcher import Matcher
+
+class TubeGroup(object):
+    def __init__(self, tubes: Optional[Iterable[Tube]]=None):
+        self._selector = selectors.DefaultSelector()
+        self._tubes = []
+
+        for tube in tubes or []:
+            self.add(tube)
+
+
+    def __len__(self) -> int:
+        return len(self._tubes)
+
+
+    def __iter__(self):
+        return iter(list(self._tubes))
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def add(self, tube: Tube):
+        assert isinstance(tube, Tube), \
+                "{} given, must be 'Tube'".format(type(tube))
+
+        self._selector.register(tube.fileno(), selectors.EVENT_READ, tube)
+        self._tubes.append(tube)
+
+
+    def remove(self, tube: Tube):
+        self._tubes.remove(tube)
+        self._unregister(tube)
+
+
+    def _unregister(self, tube: Tube):
+        # by the registered fd, the tube's may have changed since (Listen)
+        for key in list(self._selector.get_map().values()):
+            if key.data is tube:
+                self._selector.unregister(key.fd)
+
+
+    def _refresh(self, tube: Tube, fd: int):
+        # a Listen polls its server socket until a client connects and the
+        # connection's socket afterwards
+        try:
+            current = tube.fileno()
+        except (ValueError, OSError, NotImplementedError):
+            return
+
+        if current != fd:
+            self._selector.unregister(fd)
+            self._selector.register(current, selectors.EVENT_READ, tube)
+
+
+    def close(self, tubes: bool=True):
+        if tubes:
+            for tube in self._tubes:
+                self._unregister(tube)
+                tube.close()
+
+            self._tubes = []
+
+        self._selector.close()
+
+
+    def _broadcast(self, method: str,
+                   data: Union[str, bytes],
+                   timeout: Timeout) -> List[int]:
+        # a failing tube doesn't keep the data from the others, the first
+        # error is raised once every tube was tried
+        deadline = Deadline.get(timeout)
+        results = []
+        failed = None
+        for tube in self._tubes:
+            try:
+                results.append(getattr(tube, method)(data, deadline))
+            except Exception as err:
+                print("{} failed on {!r}: {}".format(method, tube, err))
+                results.append(None)
+                if failed is None:
+                    failed = err
+
+        if failed is not None:
+            raise failed from None
+
+        return results
+
+
+    def send(self, data: Union[str, bytes],
+             timeout: Timeout=None) -> List[int]:
+        return self._broadcast("send", data, timeout)
+
+
+    def sendline(self, data: Union[str, bytes],
+                 timeout: Timeout=None) -> List[int]:
+        return self._broadcast("sendline", data, timeout)
+
+
+    def wait_any(self,
+                 pattern: Optional[Union[str, bytes, List[Union[str, bytes]], Matcher]]=None,
+                 size: int=4096,
+                 timeout: Timeout=None
+                 ) -> Tube:
+        # compiled once and shared by every tube in the group
+        if pattern is None or isinstance(pattern, Matcher):
+            matcher = pattern
+        elif isinstance(pattern, list):
+            matcher = Matcher.literals(pattern) if pattern else None
+        else:
+            matcher = Matcher.literals([pattern])
+
+        def ready(tube: Tube, start: int=0) -> bool:
+            if matcher is None:
+                return len(tube._buffer) > 0
+
+            return tube._buffer.search(matcher, start) is not None
+
+        # data received by earlier calls may already satisfy the pattern
+        for tube in self._tubes:
+            if ready(tube):
+                return tube
+
+        deadline = Deadline.get(timeout)
+        poll = Deadline(0)
+
+        while self._selector.get_map():
+            events = self._selector.select(deadline.remaining())
+            if not events:
+                raise TimeoutError("Timeout (wait_any)")
+
+            for key, _ in events:
+                tube = key.data
+                searched = len(tube._buffer)
+
+                try:
+                    n = tube._fill(size, poll)
+                except TimeoutError:
+                    n = None
+
+                self._refresh(tube, key.fd)
+                if n is None:
+                    continue
+
+                if n == 0:
+                    # EOF, the fd stays readable forever
+                    self._unregister(tube)
+                    continue
+
+                if ready(tube, searched):
+                    return tube
+
+            if deadline.expired():
+                raise TimeoutError("Timeout (wait_any)")
+
+        raise ConnectionAbortedError("Connection closed (wait_any)")
+
+
+    def recvuntil_any(self,
+                      delim: Union[str, bytes, List[Union[str, bytes]]],
+                      size: int=4096,
+                      timeout: Timeout=None,
+                      drop: bool=False
+                      ) -> Tuple[Tube, int, bytes]:
+        # the tube that matched first, then (index, data) like
+        # Tube.recvuntil_any
+        if not isinstance(delim, list):
+            delim = [delim]
+
+        matcher = Matcher.literals(delim)
+        tube = self.wait_any(matcher, size, timeout)
+        index, data = tube.recvuntil_any(matcher, size, Deadline(0), drop)
+        return tube, index, data
+
+
+    def recvline_any(self, size: int=4096,
+                     timeout: Timeout=None,
+                     drop: bool=False) -> Tuple[Tube, bytes]:
+        tube, _, line = self.recvuntil_any('\n', size, timeout, drop)
+        return tube, line
@@ -0,0 +1,131 @@
+import socket
+from typing import Union, Optional, List
+
+from .sock import Sock
+from .timeout import Deadline
+from pwnlib.binary.encoding import bytes2str
+
+class Listen(Sock):
+    def __init__(self,
+                 port: int=0,
+                 bindaddr: Union[str, bytes]="0.0.0.0",
+                 timeout: Optional[Union[int, float]]=None,
+                 nodelay: bool=True,
+                 rcvbuf: Optional[int]=None,
+                 sndbuf: Optional[int]=None,
+                 recv_size: int=4096
+                 ):
+
+        assert isinstance(port, int) and 0 <= port < 65536, \
+                "`port` is {}, must be 'int' in range 0-65535".format(port)
+
+        assert isinstance(bindaddr, (str, bytes)), \
+                "`bindaddr` is {}, must be 'str' or 'bytes'".format(type(bindaddr))
+
+        super().__init__(timeout, nodelay, rcvbuf, sndbuf, recv_size)
+
+        bindaddr = bytes2str(bindaddr)
+        family = socket.AF_INET6 if ":" in bindaddr else socket.AF_INET
+
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        # SO_RCVBUF must be set before listen() to affect the window scale
+        # negotiated for accepted connections
+        if rcvbuf is not None:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+
+        self._server.bind((bindaddr, port))
+        self._server.listen(1)
+
+        # the server socket is closed once a client connects
+        self._lport = self._server.getsockname()[1]
+
+        self._rhost = None
+        self._rport = None
+
+
+    @property
+    def lport(self) -> int:
+        return self._lport
+
+
+    @property
+    def rhost(self) -> Optional[str]:
+        return self._rhost
+
+
+    @property
+    def rport(self) -> Optional[int]:
+        return self._rport
+
+
+    def wait_for_connection(self,
+                            timeout: Optional[Union[int, float]]=None
+                            ) -> "Listen":
+        if self._sock is not None:
+            return self
+
+        self._server.settimeout(timeout if timeout is not None else self._timeout)
+
+        try:
+            sock, addr = self._server.accept()
+        except socket.timeout:
+            raise TimeoutError("Timeout (accept)") from None
+
+        self._rhost, self._rport = addr[0], addr[1]
+        self._setup_socket(sock)
+
+        self._server.close()
+
+        return self
+
+
+    def fileno(self) -> int:
+        if self._sock is None:
+            return self._server.fileno()
+
+        return self._sock.fileno()
+
+
+    def _accept(self):
+        # the implicit accept spends part of the caller's budget, only the
+        # rest is left for the read or write that follows
+        deadline = Deadline(self._current_timeout)
+        self.wait_for_connection(deadline.remaining())
+        self._set_timeout(deadline.remaining())
+
+
+    def _recv_raw(self, size: int) -> Union[bytes, memoryview]:
+        if self._sock is None:
+            self._accept()
+
+        return super()._recv_raw(size)
+
+
+    def _recv_raw_into(self, view: memoryview) -> int:
+        if self._sock is None:
+            self._accept()
+
+        return super()._recv_raw_into(view)
+
+
+    def _send_raw(self, data: bytes) -> int:
+        if self._sock is None:
+            self._accept()
+
+        return super()._send_raw(data)
+
+
+    def _send_raw_many(self, buffers: List[Union[bytes, bytearray, memoryview]]) -> int:
+        if self._sock is None:
+            self._accept()
+
+        return super()._send_raw_many(buffers)
+
+
+    def _close(self):
+        if self._sock is None:
+            self._server.close()
+
+        super()._close()
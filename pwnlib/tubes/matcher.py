@@ -0,0 +1,131 @@
+import re
+from typing import Union, Optional, List, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from pwnlib.binary.encoding import str2bytes
+
+# how far back the scan of an unbounded pattern (\d+, .*) resumes after each
+# read, rescanning the whole buffer every time would be quadratic
+MAX_LOOKBACK = 65536
+
+
+def _has_lookaround(node) -> bool:
+    # lookaheads and lookbehinds don't count in getwidth(), but a match
+    # depends on bytes outside of it
+    if isinstance(node, sre_parse.SubPattern):
+        node = node.data
+
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            if isinstance(item, tuple) and item and \
+                    item[0] in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                return True
+            if isinstance(item, (list, tuple, sre_parse.SubPattern)) and _has_lookaround(item):
+                return True
+
+    return False
+
+
+def _max_width(regex: "re.Pattern") -> Optional[int]:
+    # longest string the pattern can depend on, None when unbounded
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+        _, hi = parsed.getwidth()
+    except Exception:
+        return None
+
+    if hi >= sre_parse.MAXREPEAT or _has_lookaround(parsed):
+        return None
+
+    return hi
+
+
+class Matcher(object):
+    def __init__(self, regex: "re.Pattern",
+                 lookback: Optional[int],
+                 literal: Optional[bytes]=None,
+                 indexed: bool=False):
+        self._regex = regex
+        self._literal = literal
+
+        # literal alternations name each delimiter's group p<index>
+        self._indexed = indexed
+
+        # how far back from the end of the previous scan a match that
+        # spans the chunk boundary may start, None rescans everything
+        self._lookback = lookback
+
+
+    @classmethod
+    def literals(cls, delims: List[Union[str, bytes]]) -> "Matcher":
+        assert len(delims) > 0, "At least one delimiter is required"
+
+        delims = [bytes(str2bytes(d)) for d in delims]
+        for d in delims:
+            assert len(d) > 0, "Delimiters can't be empty"
+
+        # one compiled alternation scanned in C, longest first so the
+        # longest delimiter wins among those starting at the same offset
+        order = sorted(range(len(delims)), key=lambda i: -len(delims[i]))
+        regex = re.compile(b"|".join(
+                    b"(?P<p" + str(i).encode() + b">" + re.escape(delims[i]) + b")"
+                    for i in order))
+
+        literal = delims[0] if len(delims) == 1 else None
+        return cls(regex, max(map(len, delims)) - 1, literal, True)
+
+
+    @classmethod
+    def pattern(cls, pattern: Union[str, bytes, "re.Pattern"],
+                lookback: Optional[int]=MAX_LOOKBACK) -> "Matcher":
+        # `lookback` only applies to unbounded patterns: a match starting more
+        # than that many bytes before the end of the previous read is missed,
+        # None always rescans the whole buffer
+        if isinstance(pattern, re.Pattern):
+            regex = pattern
+            if isinstance(regex.pattern, str):
+                regex = re.compile(str2bytes(regex.pattern), regex.flags & ~re.UNICODE)
+        else:
+            regex = re.compile(str2bytes(pattern))
+
+        hi = _max_width(regex)
+        return cls(regex, lookback if hi is None else max(hi - 1, 0))
+
+
+    def start(self, searched: int) -> int:
+        if self._lookback is None:
+            return 0
+
+        return max(0, searched - self._lookback)
+
+
+    def search(self, data: Union[bytes, bytearray],
+               searched: int=0) -> Optional[Tuple[int, int, int]]:
+        # (start, end, index of the matched pattern) of the leftmost match
+        pos = self.start(searched)
+
+        if self._literal is not None:
+            i = data.find(self._literal, pos)
+            if i == -1:
+                return None
+            return i, i + len(self._literal), 0
+
+        m = self._regex.search(data, pos)
+        if m is None:
+            return None
+
+        index = 0
+        if self._indexed:
+            index = int(m.lastgroup[1:])
+
+        return m.start(), m.end(), index
+
+
+    def match(self, data: bytes, pos: int) -> "re.Match":
+        # re-run on a copy of the buffer, a match on the live buffer would
+        # see it change under it once the bytes are consumed
+        return self._regex.match(data, pos)
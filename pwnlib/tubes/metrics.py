@@ -0,0 +1,209 @@
+import json
+import time
+import functools
+from typing import Union, Optional, Dict, Callable, Any
+
+# raw child hooks, each call is (roughly) one syscall
+_RAW = {
+    "_recv_raw": "bytes_in",
+    "_recv_raw_into": "bytes_in",
+    "_send_raw": "bytes_out",
+    "_send_raw_many": "bytes_out",
+    # output a Process reads while waiting for its stdin to drain
+    "_drain": "bytes_in",
+}
+
+# public operations, timed end to end including waits
+_OPS = (
+    "recv", "recvn", "recv_into", "recvall",
+    "recvuntil", "recvuntil_any", "recvregex", "recvline",
+    "send", "sendline", "sendmany", "sendlines", "send_file", "flush",
+    "sendafter", "sendlineafter",
+)
+
+# latency buckets are powers of two microseconds, the last one is open
+_BUCKETS = 28
+
+Hook = Callable[[Any, str, float, int], None]
+
+
+def _size(result: Any) -> int:
+    if isinstance(result, int):
+        return result
+    if isinstance(result, (bytes, bytearray, memoryview)):
+        return len(result)
+    if isinstance(result, tuple):
+        # (index, data) and (data, match)
+        for item in result:
+            if isinstance(item, (bytes, bytearray)):
+                return len(item)
+    return 0
+
+
+class Histogram(object):
+    def __init__(self):
+        self.reset()
+
+
+    def reset(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._buckets = [0] * _BUCKETS
+
+
+    def record(self, ns: int):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+        self._buckets[min((ns // 1000).bit_length(), _BUCKETS - 1)] += 1
+
+
+    def percentile(self, p: float) -> float:
+        # upper bound of the bucket holding the p-th percentile, in seconds
+        if self.count == 0:
+            return 0.0
+
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self._buckets):
+            seen += n
+            if n and seen >= rank:
+                return min((1 << i) * 1e-6, self.max / 1e9)
+
+        return self.max / 1e9
+
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total / 1e9,
+            "min": (self.min or 0) / 1e9,
+            "max": self.max / 1e9,
+            "mean": self.total / self.count / 1e9 if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            # bucket i counts calls under 2**i microseconds
+            "buckets": list(self._buckets),
+        }
+
+
+class Metrics(object):
+    def __init__(self):
+        self._hooks = []
+        self.reset()
+
+
+    def reset(self):
+        self.counters = {
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+        self.calls = {}
+        self.latency = {}
+
+
+    def add_hook(self, hook: Hook):
+        # called as hook(tube, name, seconds, nbytes) after every timed call,
+        # for feeding a profiler or a tracer
+        assert callable(hook), "{} given, must be callable".format(type(hook))
+        self._hooks.append(hook)
+
+
+    def remove_hook(self, hook: Hook):
+        self._hooks.remove(hook)
+
+
+    def _record(self, tube: Any, name: str, ns: int, nbytes: int):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+        hist = self.latency.get(name)
+        if hist is None:
+            hist = self.latency[name] = Histogram()
+        hist.record(ns)
+
+        for hook in self._hooks:
+            hook(tube, name, ns / 1e9, nbytes)
+
+
+    def _wrap(self, tube: Any, name: str, func: Callable, depth: Dict[str, int]) -> Callable:
+        counter = _RAW.get(name)
+        level = counter or "ops"
+        label = name.lstrip("_")
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            depth[level] += 1
+            try:
+                result = func(*args, **kwargs)
+            except Exception as err:
+                # failures are counted once, by the outermost public
+                # operation (recvline calls recvuntil, sendafter send, ...)
+                if counter is None and depth[level] == 1:
+                    if isinstance(err, TimeoutError):
+                        self.counters["timeouts"] += 1
+                    else:
+                        self.counters["errors"] += 1
+                self._record(tube, label, time.perf_counter_ns() - start, 0)
+                raise
+            finally:
+                depth[level] -= 1
+
+            nbytes = _size(result)
+            # the default _send_raw_many calls _send_raw (and _recv_raw_into
+            # _recv_raw), the bytes are counted by the outermost hook only
+            if counter is not None and depth[level] == 0:
+                self.counters[counter] += nbytes
+            self._record(tube, label, time.perf_counter_ns() - start, nbytes)
+            return result
+
+        return timed
+
+
+    def attach(self, tube: Any):
+        # shadows the methods on the instance only, a tube without metrics
+        # runs the plain class methods and pays nothing. The public
+        # operations of one tube share how deep they are nested, and so do
+        # the raw hooks of each direction
+        depth = {"ops": 0, "bytes_in": 0, "bytes_out": 0}
+        for name in list(_RAW) + list(_OPS):
+            func = getattr(tube, name, None)
+            if func is not None:
+                setattr(tube, name, self._wrap(tube, name, func, depth))
+
+
+    @staticmethod
+    def detach(tube: Any):
+        for name in list(_RAW) + list(_OPS):
+            tube.__dict__.pop(name, None)
+
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "counters": dict(self.counters),
+            "calls": dict(self.calls),
+            "latency": {name: hist.snapshot() for name, hist in self.latency.items()},
+        }
+
+
+    def export(self, to: Optional[Union[str, Any]]=None) -> str:
+        # JSON of the snapshot, appended as one line to `to` (a path or a
+        # file object) so many runs can share one file
+        line = json.dumps(self.snapshot(), sort_keys=True)
+
+        if isinstance(to, str):
+            with open(to, "a") as f:
+                f.write(line + "\n")
+        elif to is not None:
+            to.write(line + "\n")
+
+        return line
@@ -0,0 +1,103 @@
+import queue
+import threading
+from typing import Union, Optional, List, Callable
+
+from .process import Process
+
+class ProcessPool(object):
+    def __init__(self,
+                 args: Union[bytes, str, List[Union[bytes, str]]],
+                 size: int=4,
+                 prepare: Optional[Callable[[Process], None]]=None,
+                 **kwargs
+                 ):
+
+        assert isinstance(size, int) and size > 0, \
+                "`size` is {}, must be positive 'int'".format(size)
+
+        self._args = args
+        self._kwargs = kwargs
+        self._prepare = prepare
+
+        self._ready = queue.Queue()
+        # one permit per missing process, the spawner sleeps on it
+        self._slots = threading.Semaphore(size)
+        self._closed = False
+
+        self._spawner = threading.Thread(target=self._replenish, daemon=True)
+        self._spawner.start()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def spawn(self) -> Process:
+        proc = Process(self._args, **self._kwargs)
+
+        if self._prepare is not None:
+            # e.g. consume the banner so acquire() hands out a target
+            # already sitting at its first prompt
+            try:
+                self._prepare(proc)
+            except BaseException:
+                # don't leak the child and its fds
+                proc.close()
+                raise
+
+        return proc
+
+
+    def _replenish(self):
+        while True:
+            self._slots.acquire()
+            if self._closed:
+                return
+
+            try:
+                proc = self.spawn()
+            except Exception as err:
+                self._ready.put(err)
+                continue
+
+            self._ready.put(proc)
+
+
+    def acquire(self, timeout: Optional[Union[int, float]]=None) -> Process:
+        assert not self._closed, "Pool is closed"
+
+        while True:
+            try:
+                proc = self._ready.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("Timeout (acquire)") from None
+
+            self._slots.release()
+
+            if isinstance(proc, Exception):
+                raise proc
+
+            # skip targets that died while waiting in the pool
+            if proc.is_alive():
+                return proc
+
+            proc.close()
+
+
+    def close(self):
+        self._closed = True
+        self._slots.release()
+        self._spawner.join()
+
+        while True:
+            try:
+                proc = self._ready.get_nowait()
+            except queue.Empty:
+                break
+
+            if isinstance(proc, Process):
+                proc.close()
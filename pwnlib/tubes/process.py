@@ -1,25 +1,53 @@
-from .tube import Tube
+import os
+import sys
+from .tube import Tube, Timeout, _advance
+from .timeout import Deadline
 from subprocess import Popen, PIPE,STDOUT
 from typing import List, Optional, Union, Mapping
 
 from pwnlib.binary.encoding import bytes2str
 
+is_windows = os.name == "nt"
+
+if not is_windows:
+    import pty
+    import tty
+    import errno
+    import fcntl
+    import selectors
+
+    IOV_MAX = os.sysconf("SC_IOV_MAX") if "SC_IOV_MAX" in os.sysconf_names else 1024
+
+    # linux only, the constant is missing from fcntl before python 3.10
+    F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+    F_GETPIPE_SZ = getattr(fcntl, "F_GETPIPE_SZ", 1032)
+
+# allocate a pseudo-terminal for stdin/stdout/stderr, the target then sees
+# a tty and libc keeps its stdout line buffered
+PTY = object()
+
 class processerror(Exception):
     pass
 
 class Process(Tube):
     _proc = None
+    _selector = None
+    _send_selector = None
+    _stdin_fd = None
+    _stdout_fd = None
+    _pty = None
 
     def __init__(self,
                  args: Union[bytes, str, List[Union[bytes, str]]],
-                 stdin: Optional[int]=PIPE,
-                 stdout: Optional[int]=PIPE,
-                 stderr: Optional[int]=STDOUT,
+                 stdin: Optional[Union[int, object]]=PIPE,
+                 stdout: Optional[Union[int, object]]=PIPE,
+                 stderr: Optional[Union[int, object]]=STDOUT,
                  shell: Optional[bool]=False,
                  cwd: Optional[Union[str, bytes]]=None,
                  env: Optional[Union[Mapping[bytes, Union[bytes, str]], \
                          Mapping[str, Union[bytes, str]]]]=None,
-                 timeout: Optional[Union[int, float]]=None
+                 timeout: Optional[Union[int, float]]=None,
+                 pipe_size: Optional[int]=None
                  ):
 
         self._current_timeout = timeout
@@ -37,6 +65,20 @@ class Process(Tube):
         else:
             args = list(map(bytes2str, args))
 
+        slave = None
+        if PTY in (stdin, stdout, stderr):
+            assert not is_windows, "PTY is only supported on unix"
+
+            self._pty, slave = pty.openpty()
+
+            # no echo, no line discipline and no \n -> \r\n translation,
+            # bytes go through the terminal unchanged
+            tty.setraw(slave)
+
+            stdin = slave if stdin is PTY else stdin
+            stdout = slave if stdout is PTY else stdout
+            stderr = slave if stderr is PTY else stderr
+
         try:
 
             self._proc = Popen(
@@ -50,15 +92,53 @@ class Process(Tube):
                         )
 
         except FileNotFoundError as err:
+            if self._pty is not None:
+                os.close(self._pty)
+                self._pty = None
             raise ValueError("Could not execute {} ({})".format(args, err))
+        finally:
+            # only the child keeps the slave, so its exit gives us EOF
+            if slave is not None:
+                os.close(slave)
 
-        """
-        only for unix/linux
-        if self.proc.stdout:
-            fd = self.proc.stdout.fileno()
+        if not is_windows:
+            if self._proc.stdin:
+                self._stdin_fd = self._proc.stdin.fileno()
+            elif stdin == slave:
+                self._stdin_fd = self._pty
+
+            if self._proc.stdout:
+                self._stdout_fd = self._proc.stdout.fileno()
+            elif stdout == slave:
+                self._stdout_fd = self._pty
+
+        # only for unix/linux, windows pipes can't be polled
+        if self._stdout_fd is not None:
+            fd = self._stdout_fd
+            fl = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
+
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(fd, selectors.EVENT_READ)
+
+        if self._stdin_fd is not None:
+            # writes never block, a full pipe is waited on in _wait_writable
+            # while the target's output is drained
+            fd = self._stdin_fd
             fl = fcntl.fcntl(fd, fcntl.F_GETFL)
             fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
-        """
+
+            self._send_selector = selectors.DefaultSelector()
+            if fd == self._stdout_fd:
+                # both ends on the same pty master
+                self._send_selector.register(fd, selectors.EVENT_READ | selectors.EVENT_WRITE)
+            else:
+                self._send_selector.register(fd, selectors.EVENT_WRITE)
+                if self._stdout_fd is not None:
+                    self._send_selector.register(self._stdout_fd, selectors.EVENT_READ)
+
+        if pipe_size is not None:
+            self.set_pipe_size(pipe_size)
 
     @property
     def pid(self) -> int:
@@ -68,6 +148,33 @@ class Process(Tube):
         return self._proc.returncode
 
 
+    def set_pipe_size(self, size: int) -> int:
+        assert isinstance(size, int) and size > 0, \
+                "`size` is {}, must be positive 'int'".format(size)
+
+        if not sys.platform.startswith("linux"):
+            raise NotImplementedError("Pipe size can only be changed on linux")
+
+        # the kernel rounds up to a power of two pages and caps unprivileged
+        # users at /proc/sys/fs/pipe-max-size, the real size is returned
+        pipes = [f.fileno() for f in (self._proc.stdin, self._proc.stdout)
+                 if f is not None]
+        if not pipes:
+            raise NotImplementedError("Pipe size can't be changed on a PTY")
+
+        for fd in pipes:
+            fcntl.fcntl(fd, F_SETPIPE_SZ, size)
+
+        return fcntl.fcntl(pipes[0], F_GETPIPE_SZ)
+
+
+    def fileno(self) -> int:
+        if self._selector is None:
+            return super().fileno()
+
+        return self._stdout_fd
+
+
     def _set_timeout(self, timeout:Union[int, float]=None):
         self._current_timeout = timeout
 
@@ -87,6 +194,14 @@ class Process(Tube):
         except BrokenPipeError:
             pass
 
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+        if self._send_selector is not None:
+            self._send_selector.close()
+            self._send_selector = None
+
         try:
             if self._proc.stdout is not None:
                 self._proc.stdout.close()
@@ -99,27 +214,187 @@ class Process(Tube):
         except BrokenPipeError:
             pass
 
+        if self._pty is not None:
+            os.close(self._pty)
+            self._pty = None
+
 
     def _recv_raw(self, size: int) -> bytes:
         data = None
 
-        if not self.is_alive():
-            return b''
+        if self._selector is None:
+            if not self.is_alive():
+                return b''
+
+            try:
+                data = self._proc.stdout.read1(size)
+            except Exception as err:
+                raise err from None
+
+            if data is None:
+                raise ConnectionAbortedError("Connection closed (_recv_raw)", b'') from None
+
+            return data
+
+        # wait until the pipe is readable or the timeout expires, the read
+        # itself never blocks and returns b'' only on EOF
+        while True:
+            if not self._selector.select(self._current_timeout):
+                raise TimeoutError("Timeout (_recv_raw)")
+
+            try:
+                return self._read(size)
+            except BlockingIOError:
+                continue
+            except Exception as err:
+                raise err from None
 
+
+    def _recv_raw_into(self, view: memoryview) -> int:
+        if self._selector is None:
+            return super()._recv_raw_into(view)
+
+        while True:
+            if not self._selector.select(self._current_timeout):
+                raise TimeoutError("Timeout (_recv_raw)")
+
+            try:
+                return self._readinto(view)
+            except BlockingIOError:
+                continue
+            except Exception as err:
+                raise err from None
+
+
+    def _readinto(self, view: memoryview) -> int:
         try:
-            data = self._proc.stdout.read(size)
-        except Exception as err:
-            raise err from None
+            return os.readv(self._stdout_fd, [view])
+        except OSError as err:
+            if err.errno == errno.EIO and self._stdout_fd == self._pty:
+                return 0
+            raise
+
+
+    def _read(self, size: int) -> bytes:
+        try:
+            return os.read(self._stdout_fd, size)
+        except OSError as err:
+            # a pty master reports the slave side closing as EIO, that is
+            # the EOF of a pipe
+            if err.errno == errno.EIO and self._stdout_fd == self._pty:
+                return b''
+            raise
+
+    def _drain(self, size: int) -> bytes:
+        # apart from _recv_raw so metrics count what is read here too
+        return self._read(size)
+
+
+    def _wait_writable(self, deadline: Deadline):
+        # the target may be blocked writing to a full stdout pipe instead of
+        # reading its stdin, keep emptying stdout into the tube buffer
+        while True:
+            events = self._send_selector.select(deadline.remaining())
+            if not events:
+                raise TimeoutError("Timeout (_send_raw)")
+
+            writable = False
+            for key, mask in events:
+                if mask & selectors.EVENT_WRITE:
+                    writable = True
+
+                if not mask & selectors.EVENT_READ:
+                    continue
+
+                try:
+                    data = self._drain(65536)
+                except BlockingIOError:
+                    continue
+
+                if data:
+                    self._buffer.add(data)
+                elif key.events & selectors.EVENT_WRITE:
+                    # EOF on a shared pty master, only wait for writes
+                    self._send_selector.modify(key.fd, selectors.EVENT_WRITE)
+                else:
+                    # EOF, stop polling it
+                    self._send_selector.unregister(key.fd)
 
-        if data is None:
-            raise ConnectionAbortedError("Connection closed (_recv_raw)", b'') from None
+            if writable:
+                return
 
-        return data
 
-    def _send_raw(self, data: Union[str, bytes]) -> int:
+    def _send_views(self, views: List[memoryview]) -> int:
+        fd = self._stdin_fd
+        deadline = Deadline(self._current_timeout)
+
+        i = _advance(views, 0)
+        total = 0
         try:
-            n = self._proc.stdin.write(data)
-            self._proc.stdin.flush()
-            return n
+            while i < len(views):
+                try:
+                    n = os.writev(fd, views[i:i + IOV_MAX])
+                except BlockingIOError:
+                    self._wait_writable(deadline)
+                    continue
+
+                total += n
+                i = _advance(views, n, i)
+        except TimeoutError:
+            # how much went out, a flush keeps the rest queued
+            raise TimeoutError("Timeout (_send_raw)", total) from None
         except Exception as err:
             raise err from None
+
+        return total
+
+
+    def _send_raw(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        if is_windows:
+            try:
+                n = self._proc.stdin.write(data)
+                self._proc.stdin.flush()
+                return n
+            except Exception as err:
+                raise err from None
+
+        # straight to the fd, the buffered writer would copy the payload
+        # into its own buffer first
+        return self._send_views([memoryview(data).cast('B')])
+
+
+    def _send_raw_many(self, buffers: List[Union[bytes, bytearray, memoryview]]) -> int:
+        if is_windows:
+            return self._send_raw(b''.join(buffers))
+
+        # one writev per IOV_MAX buffers instead of a write per buffer
+        return self._send_views([memoryview(b).cast('B') for b in buffers])
+
+
+    def send_file(self, path: Union[str, bytes],
+                  timeout: Timeout=None) -> int:
+        if is_windows:
+            return super().send_file(path, timeout)
+
+        deadline = self.deadline(timeout)
+        self.flush(deadline)
+
+        fd = self._stdin_fd
+        total = 0
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            # the kernel copies from the page cache into the pipe
+            while total < size:
+                try:
+                    n = os.sendfile(fd, f.fileno(), total, size - total)
+                except BlockingIOError:
+                    self._wait_writable(deadline)
+                    continue
+
+                if n == 0:
+                    break
+
+                total += n
+
+        return total
@@ -0,0 +1,105 @@
+import re
+from typing import Union, Optional, List, Tuple, Pattern, Match
+
+from .buffer import Buffer
+from .matcher import Matcher
+from .timeout import Deadline
+from pwnlib.binary.encoding import str2bytes
+
+Timeout = Optional[Union[int, float, Deadline]]
+
+# (data up to the end of the match, match start, delimiter index, match)
+_Found = Tuple[bytes, int, int, Optional[Match]]
+
+class Reader(object):
+    # the receive side shared by Tube and AsyncTube: the buffer, the timeouts
+    # and the delimiter/pattern matching on the buffer. Only reading more
+    # data (_fill) is sync in one and a coroutine in the other
+    def __init__(self, timeout: Optional[Union[int, float]]=None):
+        # set the default timeout
+        self._default_timeout = timeout
+        self._timeout = timeout
+
+        # bytes received from the target but not consumed yet
+        self._buffer = Buffer()
+
+        self._is_closed = False
+
+
+    def set_timeout(self,
+                    timeout: Optional[Union[int, float]]=None
+                    ):
+        assert timeout is None or \
+                (isinstance(timeout, (int, float)) and timeout >=0), \
+                "`timeout` is {}, must be positive 'int' or 'float'".format(type(timeout))
+
+        if timeout == None:
+            self._timeout = self._default_timeout
+        else:
+            self._timeout = timeout
+
+
+    def deadline(self, timeout: Timeout=None) -> Deadline:
+        # a number starts a new budget, a Deadline is passed through so
+        # nested calls share the budget of the outermost operation
+        return Deadline.get(timeout, self._timeout)
+
+
+    def unrecv(self, data: Union[str, bytes]):
+        assert isinstance(data, (str, bytes)), \
+                "{} given, must be 'str' or 'bytes'".format(type(data))
+
+        self._buffer.unget(str2bytes(data))
+
+
+    @staticmethod
+    def _until_matcher(delim: Union[str, bytes, List[Union[str, bytes]]]) -> Matcher:
+        assert isinstance(delim, (str, bytes, list)), \
+                "{} given, must be positive 'str' or 'bytes' or 'list'".format(type(delim))
+
+        if isinstance(delim, list):
+            for d in delim:
+                assert isinstance(d, (str, bytes)), \
+                        "{}({}) delimter must be 'str' or 'bytes'".format(d, type(d))
+        else:
+            delim = [delim]
+
+        return Matcher.literals(delim)
+
+
+    @staticmethod
+    def _any_matcher(delims: Union[List[Union[str, bytes]], Matcher]) -> Matcher:
+        # a Matcher built once with Matcher.literals saves recompiling in loops
+        if isinstance(delims, Matcher):
+            return delims
+
+        assert isinstance(delims, list), \
+                "{} given, must be 'list' or 'Matcher'".format(type(delims))
+
+        return Matcher.literals(delims)
+
+
+    @staticmethod
+    def _regex_matcher(pattern: Union[str, bytes, Pattern, Matcher]) -> Matcher:
+        assert isinstance(pattern, (str, bytes, re.Pattern, Matcher)), \
+                "{} given, must be 'str', 'bytes' or 're.Pattern'".format(type(pattern))
+
+        return pattern if isinstance(pattern, Matcher) else Matcher.pattern(pattern)
+
+
+    def _take_match(self, matcher: Matcher,
+                    searched: int,
+                    capture: bool) -> Optional[_Found]:
+        # only the bytes after `searched` (plus the few a match spanning the
+        # chunk boundary may start in) are scanned, None when nothing matched
+        found = self._buffer.search(matcher, searched)
+        if found is None:
+            return None
+
+        start, end, index = found
+
+        # the match object has to see the bytes after `end` too (lookaheads),
+        # so it is taken on a copy made before they are consumed
+        match = matcher.match(self._buffer.peek(), start) if capture else None
+
+        return self._buffer.get(end), start, index, match
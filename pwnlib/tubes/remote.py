@@ -0,0 +1,47 @@
+import socket
+from typing import Union, Optional
+
+from .sock import Sock
+from pwnlib.binary.encoding import bytes2str
+
+class Remote(Sock):
+    def __init__(self,
+                 host: Union[str, bytes],
+                 port: int,
+                 timeout: Optional[Union[int, float]]=None,
+                 nodelay: bool=True,
+                 rcvbuf: Optional[int]=None,
+                 sndbuf: Optional[int]=None,
+                 recv_size: int=4096
+                 ):
+
+        assert isinstance(host, (str, bytes)), \
+                "`host` is {}, must be 'str' or 'bytes'".format(type(host))
+
+        assert isinstance(port, int) and 0 < port < 65536, \
+                "`port` is {}, must be 'int' in range 1-65535".format(port)
+
+        super().__init__(timeout, nodelay, rcvbuf, sndbuf, recv_size)
+
+        self._host = bytes2str(host)
+        self._port = port
+
+        try:
+            sock = socket.create_connection((self._host, port), timeout)
+        except socket.timeout:
+            raise TimeoutError("Timeout (connect)") from None
+        except OSError as err:
+            raise ConnectionRefusedError("Could not connect to {}:{} ({})".format(
+                                            self._host, port, err)) from None
+
+        self._setup_socket(sock)
+
+
+    @property
+    def rhost(self) -> str:
+        return self._host
+
+
+    @property
+    def rport(self) -> int:
+        return self._port
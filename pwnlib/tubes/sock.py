@@ -0,0 +1,186 @@
+import os
+import socket
+import select
+from typing import Union, Optional, List
+
+from .tube import Tube, Timeout, _advance
+from .timeout import Deadline
+
+IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf_names") and \
+            "SC_IOV_MAX" in os.sysconf_names else 1024
+
+class Sock(Tube):
+    _sock = None
+
+    def __init__(self,
+                 timeout: Optional[Union[int, float]]=None,
+                 nodelay: bool=True,
+                 rcvbuf: Optional[int]=None,
+                 sndbuf: Optional[int]=None,
+                 recv_size: int=4096
+                 ):
+
+        assert isinstance(recv_size, int) and recv_size > 0, \
+                "`recv_size` is {}, must be positive 'int'".format(type(recv_size))
+
+        self._current_timeout = timeout
+        self._nodelay = nodelay
+        self._rcvbuf = rcvbuf
+        self._sndbuf = sndbuf
+
+        # every recv lands in this buffer, only the received part is copied
+        # out into the tube buffer
+        self._recv_buf = bytearray(recv_size)
+        self._recv_view = memoryview(self._recv_buf)
+
+        super().__init__(timeout)
+
+
+    def _setup_socket(self, sock: socket.socket):
+        if self._nodelay and sock.family in (socket.AF_INET, socket.AF_INET6):
+            # no Nagle, small writes such as menu choices go out immediately
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        if self._rcvbuf is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._rcvbuf)
+
+        if self._sndbuf is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self._sndbuf)
+
+        sock.settimeout(self._current_timeout)
+        self._sock = sock
+
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+
+    def _set_timeout(self, timeout: Optional[Union[int, float]]=None):
+        self._current_timeout = timeout
+
+        if self._sock is not None:
+            self._sock.settimeout(timeout)
+
+
+    def _is_alive(self) -> bool:
+        if self._sock is None or self._sock.fileno() == -1:
+            return False
+
+        # readable with nothing to peek means the peer sent FIN
+        try:
+            if hasattr(select, "poll"):
+                # select() can't watch descriptors past FD_SETSIZE (1024)
+                poller = select.poll()
+                poller.register(self._sock, select.POLLIN)
+                readable = poller.poll(0)
+            else:
+                # winsock select() has no limit on the descriptor values
+                readable, _, _ = select.select([self._sock], [], [], 0)
+
+            if not readable:
+                return True
+
+            return self._sock.recv(1, socket.MSG_PEEK) != b''
+        except OSError:
+            return False
+
+
+    def _close(self):
+        if self._sock is None:
+            return
+
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+        self._sock.close()
+
+
+    def _recv_raw(self, size: int) -> Union[bytes, memoryview]:
+        if size > len(self._recv_buf):
+            self._recv_buf = bytearray(size)
+            self._recv_view = memoryview(self._recv_buf)
+
+        try:
+            n = self._sock.recv_into(self._recv_view, size)
+        except (socket.timeout, BlockingIOError):
+            # a zero timeout puts the socket in non-blocking mode
+            raise TimeoutError("Timeout (_recv_raw)") from None
+        except Exception as err:
+            raise err from None
+
+        # the view is only valid until the next call, Tube._fill copies it
+        return self._recv_view[:n]
+
+
+    def _recv_raw_into(self, view: memoryview) -> int:
+        try:
+            return self._sock.recv_into(view)
+        except (socket.timeout, BlockingIOError):
+            raise TimeoutError("Timeout (_recv_raw)") from None
+        except Exception as err:
+            raise err from None
+
+
+    def _send_raw(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        # sendall can't tell how much went out before a timeout, flush()
+        # needs it to queue the unsent tail again
+        view = memoryview(data).cast('B')
+        deadline = Deadline(self._current_timeout)
+        total = 0
+        try:
+            while True:
+                total += self._sock.send(view[total:])
+                if total >= view.nbytes:
+                    break
+
+                self._set_timeout(deadline.remaining())
+        except (socket.timeout, BlockingIOError):
+            # a zero timeout puts the socket in non-blocking mode
+            raise TimeoutError("Timeout (_send_raw)", total) from None
+        except Exception as err:
+            raise err from None
+
+        return total
+
+
+    def _send_raw_many(self, buffers: List[Union[bytes, bytearray, memoryview]]) -> int:
+        if not hasattr(self._sock, "sendmsg"):
+            return self._send_raw(b''.join(buffers))
+
+        views = [memoryview(b).cast('B') for b in buffers]
+        i = _advance(views, 0)
+        deadline = Deadline(self._current_timeout)
+        total = 0
+        try:
+            while i < len(views):
+                n = self._sock.sendmsg(views[i:i + IOV_MAX])
+                total += n
+                i = _advance(views, n, i)
+                if i < len(views):
+                    self._set_timeout(deadline.remaining())
+        except (socket.timeout, BlockingIOError):
+            raise TimeoutError("Timeout (_send_raw)", total) from None
+        except Exception as err:
+            raise err from None
+
+        return total
+
+
+    def send_file(self, path: Union[str, bytes],
+                  timeout: Timeout=None) -> int:
+        deadline = self.deadline(timeout)
+        self.flush(deadline)
+        if deadline.expired():
+            # socket.sendfile rejects a non-blocking socket with ValueError
+            raise TimeoutError("Timeout (send_file)")
+
+        self._set_timeout(deadline.remaining())
+
+        try:
+            with open(path, "rb") as f:
+                # sendfile(2) when the socket is blocking, chunked otherwise
+                return self._sock.sendfile(f)
+        except (socket.timeout, BlockingIOError):
+            raise TimeoutError("Timeout (send_file)") from None
@@ -0,0 +1,43 @@
+import time
+from typing import Union, Optional
+
+
+class Deadline(object):
+    def __init__(self, timeout: Optional[Union[int, float]]=None):
+        assert timeout is None or \
+                (isinstance(timeout, (int, float)) and timeout >=0), \
+                "`timeout` is {}, must be positive 'int' or 'float'".format(type(timeout))
+
+        # monotonic so wall clock adjustments can't stretch or cut the budget
+        self._expires = None
+        if timeout is not None:
+            self._expires = time.monotonic() + timeout
+
+
+    @classmethod
+    def get(cls,
+            timeout: Optional[Union[int, float, "Deadline"]],
+            default: Optional[Union[int, float]]=None
+            ) -> "Deadline":
+        if isinstance(timeout, Deadline):
+            return timeout
+
+        if timeout is None:
+            timeout = default
+
+        return cls(timeout)
+
+
+    def remaining(self) -> Optional[float]:
+        if self._expires is None:
+            return None
+
+        return max(0.0, self._expires - time.monotonic())
+
+
+    def expired(self) -> bool:
+        return self._expires is not None and time.monotonic() >= self._expires
+
+
+    def __repr__(self) -> str:
+        return "Deadline(remaining={})".format(self.remaining())
@@ -1,107 +1,319 @@
 # -*- coding: utf-8 -*-
+import io
+import os
 import sys
 import abc
 import time
 import queue
-from typing import Union, Optional, List
+import contextlib
+from typing import Union, Optional, List, Tuple, Iterable, Iterator, BinaryIO, Pattern, Match
 
+from .matcher import Matcher
+from .metrics import Metrics
+from .reader import Reader, Timeout, _Found
+from .timeout import Deadline
 from pwnlib.binary.encoding import str2bytes
 
-class Tube(metaclass=abc.ABCMeta):
+def _advance(views: List[memoryview], n: int, start: int=0) -> int:
+    # drops `n` written bytes from the front of a gather list, returns the
+    # index of the first pending view (a partially written one is sliced)
+    while n and start < len(views):
+        size = views[start].nbytes
+        if n < size:
+            views[start] = views[start][n:]
+            break
+
+        n -= size
+        start += 1
+
+    while start < len(views) and views[start].nbytes == 0:
+        start += 1
+
+    return start
+
+class Tube(Reader, metaclass=abc.ABCMeta):
+    # instrumentation is off unless enable_metrics() is called
+    _metrics = None
+
     def __init__(self, timeout: Optional[Union[int, float]]=None):
-        # set the default timeout
-        self._default_timeout = timeout
+        super().__init__(timeout)
+
+        # buffers queued inside `with tube.batch()`, None when not batching
+        self._batch = None
 
         if timeout is not None:
             # pass the default timeout to the child class
             self._set_timeout(timeout)
 
-        self._is_closed = False
-
 
     def set_timeout(self,
                     timeout: Optional[Union[int, float]]=None
                     ):
-        assert timeout is None or \
-                (isinstance(timeout, (int, float)) and timeout >=0), \
-                "`timeout` is, must be positive 'int' or 'float'".format(type(timeout))
+        super().set_timeout(timeout)
+        self._set_timeout(self._timeout)
+
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        return self._metrics
+
+
+    def enable_metrics(self, metrics: Optional[Metrics]=None) -> Metrics:
+        # pass the same Metrics to several tubes to aggregate them
+        assert metrics is None or isinstance(metrics, Metrics), \
+                "{} given, must be 'Metrics'".format(type(metrics))
+
+        self.disable_metrics()
+
+        self._metrics = metrics or Metrics()
+        self._metrics.attach(self)
+        return self._metrics
 
-        if timeout == None:
-            self._set_timeout(self._default_timeout)
-        else:
-            self._set_timeout(timeout)
+
+    def disable_metrics(self) -> Optional[Metrics]:
+        metrics = self._metrics
+        if metrics is not None:
+            Metrics.detach(self)
+            self._metrics = None
+
+        return metrics
+
+
+    def _fill(self, size: int, deadline: Deadline) -> int:
+        # whatever is corked may be what the target waits for to answer
+        if self._batch:
+            self.flush(deadline)
+
+        # the child only knows relative timeouts, so hand it whatever is
+        # left of the budget right before each raw read
+        self._set_timeout(deadline.remaining())
+
+        data = self._recv_raw(size)
+        if data:
+            self._buffer.add(data)
+
+        return len(data)
 
 
     def recv(self, size:int=4096,
-             timeout: Optional[Union[int, float]]=None
+             timeout: Timeout=None
              ) -> bytes:
         assert size is None or (isinstance(size, int) and size >=0), \
                 "`size` is {}, must be positive 'int'".format(type(size))
 
-        current_timeout = self._default_timeout
-        if timeout is not None:
-            self.set_timeout(timeout)
-            current_timeout = timeout
+        # no size reads until EOF
+        if size is None:
+            return self.recvall(timeout=timeout)
+
+        if not self._buffer:
+            try:
+                self._fill(size, self.deadline(timeout))
+            except TimeoutError:
+                raise TimeoutError("Timeout (recv)")
+            except Exception as err:
+                raise err from None
+
+        return self._buffer.get(size)
 
+
+    def recvn(self, n: int,
+              timeout: Timeout=None
+              ) -> bytes:
+        assert isinstance(n, int) and n >= 0, \
+                "`n` is {}, must be positive 'int'".format(type(n))
+
+        deadline = self.deadline(timeout)
+
+        # on timeout or EOF the partial data stays in the buffer
+        while len(self._buffer) < n:
+            try:
+                read = self._fill(max(n - len(self._buffer), 4096), deadline)
+            except TimeoutError:
+                raise TimeoutError("Timeout (recvn)")
+            except Exception as err:
+                raise err from None
+
+            if read == 0:
+                raise ConnectionAbortedError("Connection closed (recvn)")
+
+        return self._buffer.get(n)
+
+
+    def recv_into(self, buffer: Union[bytearray, memoryview],
+                  nbytes: int=0,
+                  timeout: Timeout=None
+                  ) -> int:
+        view = memoryview(buffer).cast('B')
+        if nbytes:
+            view = view[:nbytes]
+
+        if self._buffer:
+            return self._buffer.get_into(view)
+
+        deadline = self.deadline(timeout)
+        if self._batch:
+            self.flush(deadline)
+
+        self._set_timeout(deadline.remaining())
+
+        # nothing buffered, the child reads straight into the caller's memory
         try:
-            return self._recv_raw(size)
+            return self._recv_raw_into(view)
         except TimeoutError:
-            raise TimeoutError("Timeout (recv)")
+            raise TimeoutError("Timeout (recv_into)")
         except Exception as err:
             raise err from None
-        finally:
-            if timeout is not None:
-                self.set_timeout()
+
+
+    def iter_chunks(self, size: int=65536,
+                    timeout: Timeout=None
+                    ) -> Iterator[bytes]:
+        # `timeout` bounds the wait for each chunk, iteration ends on EOF
+        while True:
+            chunk = self.recv(size, timeout)
+            if not chunk:
+                return
+
+            yield chunk
+
+
+    def recvall(self, to: Optional[Union[str, bytes, BinaryIO, bytearray, memoryview]]=None,
+                size: int=65536,
+                timeout: Timeout=None
+                ) -> Union[bytes, int]:
+        deadline = self.deadline(timeout)
+
+        if to is None:
+            # everything stays in the buffer until EOF, a timeout loses nothing
+            while True:
+                try:
+                    n = self._fill(size, deadline)
+                except TimeoutError:
+                    raise TimeoutError("Timeout (recvall)")
+                except Exception as err:
+                    raise err from None
+
+                if n == 0:
+                    return self._buffer.get()
+
+        if isinstance(to, (str, bytes, os.PathLike)):
+            with open(to, "wb") as f:
+                return self.recvall(f, size, deadline)
+
+        # writable buffers (bytearray, mmap, ...) are filled in place, mmap
+        # has a write() too but would copy every chunk and can't grow
+        view = None
+        if not isinstance(to, io.IOBase):
+            try:
+                view = memoryview(to)
+            except TypeError:
+                pass
+
+        if view is None:
+            assert hasattr(to, "write"), \
+                    "{} given, must be a path, a file or a writable buffer".format(type(to))
+
+            # one reusable chunk, memory use doesn't grow with the stream
+            chunk = memoryview(bytearray(size))
+            total = 0
+            while True:
+                n = self.recv_into(chunk, 0, deadline)
+                if n == 0:
+                    return total
+
+                to.write(chunk[:n])
+                total += n
+
+        assert not view.readonly, \
+                "{} given, the buffer must be writable".format(type(to))
+
+        # filled until full or EOF
+        view = view.cast('B')
+        total = 0
+        while total < len(view):
+            n = self.recv_into(view[total:], 0, deadline)
+            if n == 0:
+                break
+
+            total += n
+
+        return total
+
+
+    def _recvmatch(self, matcher: Matcher,
+                   size: int,
+                   deadline: Deadline,
+                   name: str,
+                   capture: bool=False) -> _Found:
+        # bytes already in the buffer are scanned before reading anything,
+        # then only what each read added
+        searched = 0
+        while True:
+            found = self._take_match(matcher, searched, capture)
+            if found is not None:
+                return found
+
+            searched = len(self._buffer)
+
+            try:
+                n = self._fill(size, deadline)
+            except TimeoutError as err:
+                raise TimeoutError("Timeout ({})".format(name))
+            except Exception as err:
+                raise err from None
+
+            if n == 0:
+                raise ConnectionAbortedError("Connection closed ({})".format(name))
+
 
     def recvuntil(self,
                   delim: Union[str, bytes, List[Union[str, bytes]]],
                   size: int=4096,
-                  timeout: Optional[Union[int, float]]=None,
+                  timeout: Timeout=None,
                   drop: bool=False,
                   interval_time: float=0.01
                   ) -> bytes:
-        assert isinstance(delim, (str, bytes, list)), \
-                "{} given, must be positive 'str' or 'bytes' or 'list'".format(type(delim))
-
-        if isinstance(delim, list):
-            for i, d in enumerate(delim):
-                assert isinstance(d, (str, bytes)), \
-                        "{}({}) delimter must be 'str' or 'bytes'".format(d, type(d))
-                delim[i] = str2bytes(d)
-        else:
-            delim = [str2bytes(delim)]
-
-        found_delim = None
-        data = b""
-        while True:
-            try:
-                data += self.recv(size, timeout)
-            except TimeoutError as err:
-                raise TimeoutError("Timeout (recvuntil)")
-            except Exception as err:
-                raise err from None
+        data, i, _, _ = self._recvmatch(self._until_matcher(delim), size,
+                                     self.deadline(timeout), "recvuntil")
+        if drop:
+            data = data[:i]
 
-            for d in delim:
-                if d in data:
-                    found_delim = d
-                    break
+        return data
 
-            if found_delim is not None:
-                break
 
-            time.sleep(interval_time)
+    def recvuntil_any(self,
+                      delims: Union[List[Union[str, bytes]], Matcher],
+                      size: int=4096,
+                      timeout: Timeout=None,
+                      drop: bool=False
+                      ) -> Tuple[int, bytes]:
+        # returns the index of the delimiter that matched first
+        data, i, index, _ = self._recvmatch(self._any_matcher(delims), size,
+                                         self.deadline(timeout), "recvuntil_any")
+        if drop:
+            data = data[:i]
 
-        i = data.find(found_delim)
-        j = i + len(delim)
+        return index, data
 
-        if not drop:
-            i = j
 
-        return data[:i]
+    def recvregex(self,
+                  pattern: Union[str, bytes, Pattern],
+                  size: int=4096,
+                  timeout: Timeout=None,
+                  drop: bool=False
+                  ) -> Tuple[bytes, Match]:
+        # returns the received bytes up to the end of the first match and
+        # the match itself
+        data, i, _, match = self._recvmatch(self._regex_matcher(pattern), size,
+                                     self.deadline(timeout), "recvregex", True)
+        if drop:
+            data = data[:i]
+
+        return data, match
 
 
     def recvline(self, size: int=4096,
-                 timeout: Optional[Union[int, float]]=None,
+                 timeout: Timeout=None,
                  drop: bool=False):
         try:
             line = self.recvuntil('\n', size, timeout, drop)
@@ -111,56 +323,147 @@ class Tube(metaclass=abc.ABCMeta):
         return line
 
 
-    def send(self, data: Union[str, bytes],
-             timeout: Optional[Union[int, float]]=None
-             ) -> int:
-        assert isinstance(data, (str, bytes)), "{} given, must be 'str' or 'bytes')".format(type(data))
-        data = str2bytes(data)
+    def _write(self, buffers: List[Union[bytes, bytearray, memoryview]],
+               timeout: Timeout=None) -> int:
+        if self._batch is not None:
+            # the caller may change its buffer before the flush, only
+            # immutable ones are queued as they are
+            for b in buffers:
+                if not isinstance(b, bytes) and \
+                        not (isinstance(b, memoryview) and b.readonly):
+                    b = bytes(b)
+                self._batch.append(b)
+            return sum(memoryview(b).nbytes for b in buffers)
 
-        current_timeout = self._default_timeout
-        if timeout is not None:
-            self.set_timeout(timeout)
-            current_timeout = timeout
+        self._set_timeout(self.deadline(timeout).remaining())
 
         try:
-            return self._send_raw(data)
+            if len(buffers) == 1:
+                return self._send_raw(buffers[0])
+
+            return self._send_raw_many(buffers)
         except TimeoutError:
-            raise TimeoutError("Timeout (recv)")
+            raise TimeoutError("Timeout (send)")
         except Exception as err:
             raise err from None
+
+
+    def send(self, data: Union[str, bytes, bytearray, memoryview],
+             timeout: Timeout=None
+             ) -> int:
+        # buffers such as a built Payload are written as they are, any
+        # other type is rejected by str2bytes
+        return self._write([str2bytes(data)], timeout)
+
+    def sendline(self, data: Union[str, bytes, bytearray, memoryview],
+                 timeout: Timeout=None) -> int:
+        data = str2bytes(data)
+
+        # the newline goes out as its own iovec, the payload isn't copied
+        return self._write([data, b'\n'], timeout)
+
+
+    def sendmany(self, items: Iterable[Union[str, bytes, bytearray, memoryview]],
+                 timeout: Timeout=None) -> int:
+        buffers = [str2bytes(data) for data in items]
+        if not buffers:
+            return 0
+
+        return self._write(buffers, timeout)
+
+
+    def sendlines(self, lines: Iterable[Union[str, bytes, bytearray, memoryview]],
+                  timeout: Timeout=None) -> int:
+        buffers = []
+        for line in lines:
+            buffers.append(str2bytes(line))
+            buffers.append(b'\n')
+
+        if not buffers:
+            return 0
+
+        return self._write(buffers, timeout)
+
+
+    def send_file(self, path: Union[str, bytes],
+                  timeout: Timeout=None) -> int:
+        deadline = self.deadline(timeout)
+
+        total = 0
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+
+                total += self.send(chunk, deadline)
+
+        return total
+
+
+    @contextlib.contextmanager
+    def batch(self, timeout: Timeout=None):
+        # nested batches join the outermost one
+        if self._batch is not None:
+            yield self
+            return
+
+        self._batch = []
+        try:
+            yield self
+            self.flush(timeout)
         finally:
-            if timeout is not None:
-                self.set_timeout()
+            # on error the queued data is dropped, not half sent
+            self._batch = None
+
 
-    def sendline(self, data: Union[str,bytes],
-                 timeout: Optional[Union[int, float]]=None) -> int:
-        assert isinstance(data, (str, bytes)), "{} given, 'str' or 'bytes')".format(type(data))
+    def flush(self, timeout: Timeout=None) -> int:
+        if not self._batch:
+            return 0
 
-        if isinstance(int, float):
-            data = str(data).encode()
-        else:
-            data = str2bytes(data)
+        buffers = self._batch
+        self._batch = []
 
-        return self.send(data + b'\n', timeout)
+        self._set_timeout(self.deadline(timeout).remaining())
+
+        try:
+            return self._send_raw_many(buffers)
+        except TimeoutError as err:
+            # the unsent tail stays queued in front of anything newer
+            written = err.args[1] if len(err.args) > 1 else 0
+            views = [memoryview(b).cast('B') for b in buffers]
+            self._batch[:0] = views[_advance(views, written):]
+            raise TimeoutError("Timeout (flush)") from None
+        except Exception as err:
+            raise err from None
 
 
     def sendafter(self, delim: Union[str, bytes],
                   data: Union[str,bytes],
                   size: int=4096,
-                  timeout: Optional[Union[int, float]]=None,
+                  timeout: Timeout=None,
                   drop: bool=False,
                   interval_time: float=0.01) -> int:
-        recv_data = self.recvuntil(delim, size, timeout, drop, interval_time)
-        return self.send(data, timeout)
+        # one budget for the whole exchange, the send gets what is left
+        deadline = self.deadline(timeout)
+        recv_data = self.recvuntil(delim, size, deadline, drop, interval_time)
+        return self.send(data, deadline)
 
 
     def sendlineafter(self, delim, data, size=4096, timeout=None, drop=False, interval_time=0.01) -> int:
-        recv_data = self.recvuntil(delim, size, timeout, drop, interval_time)
-        return self.sendline(data, timeout)
+        deadline = self.deadline(timeout)
+        recv_data = self.recvuntil(delim, size, deadline, drop, interval_time)
+        return self.sendline(data, deadline)
+
+
+    def fileno(self) -> int:
+        # the fd that becomes readable when the target produces output,
+        # used to multiplex many tubes from one thread
+        raise NotImplementedError("{} can't be polled".format(type(self).__name__))
 
 
     def is_alive(self) -> bool:
-        if not self._close:
+        if not self._is_closed:
             return self._is_alive()
 
         return False
@@ -176,11 +479,24 @@ class Tube(metaclass=abc.ABCMeta):
         pass
 
 
+    def _recv_raw_into(self, view: memoryview) -> int:
+        # children that can read into a caller buffer (readv, recv_into)
+        # override this to skip the intermediate bytes object
+        data = self._recv_raw(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+
     @abc.abstractmethod
-    def _send_raw(self, data: Union[str, bytes]) -> int:
+    def _send_raw(self, data: Union[bytes, bytearray, memoryview]) -> int:
         pass
 
 
+    def _send_raw_many(self, buffers: List[Union[bytes, bytearray, memoryview]]) -> int:
+        # children that can gather writes (writev, sendmsg) override this
+        return self._send_raw(b''.join(buffers))
+
+
     @abc.abstractmethod
     def _close(self):
         pass
@@ -0,0 +1,64 @@
+import pytest
+
+from pwnlib.tubes.tube import Tube
+
+
+class StubTube(Tube):
+    # replays `chunks`, one per raw read: bytes are received data, None a
+    # timeout and the end of the list EOF. Writes are collected in `writes`,
+    # at most `accept` bytes are taken before a write times out
+    def __init__(self, chunks=(), timeout=None, accept=None):
+        self.chunks = list(chunks)
+        self.writes = []
+        self.accept = accept
+        self.reads = 0
+        self.timeouts = []
+        super().__init__(timeout)
+
+    @property
+    def sent(self):
+        return b"".join(self.writes)
+
+    def _recv_raw(self, size):
+        self.reads += 1
+        if not self.chunks:
+            return b""
+
+        chunk = self.chunks.pop(0)
+        if chunk is None:
+            raise TimeoutError("Timeout (_recv_raw)")
+
+        if len(chunk) > size:
+            self.chunks.insert(0, chunk[size:])
+            chunk = chunk[:size]
+
+        return chunk
+
+    def _send_raw(self, data):
+        return self._send_raw_many([data])
+
+    def _send_raw_many(self, buffers):
+        data = b"".join(bytes(b) for b in buffers)
+        if self.accept is not None and len(data) > self.accept:
+            taken, self.accept = self.accept, 0
+            self.writes.append(data[:taken])
+            raise TimeoutError("Timeout (_send_raw)", taken)
+
+        if self.accept is not None:
+            self.accept -= len(data)
+        self.writes.append(data)
+        return len(data)
+
+    def _set_timeout(self, timeout):
+        self.timeouts.append(timeout)
+
+    def _is_alive(self):
+        return True
+
+    def _close(self):
+        pass
+
+
+@pytest.fixture
+def stub():
+    return StubTube
@@ -0,0 +1,167 @@
+import os
+
+import pytest
+
+from pwnlib.arch import (Backend, AssemblerCache, assemble, assemble_many,
+                         get_cache, set_cache)
+
+
+class StubBackend(Backend):
+    # "assembles" a snippet to its reversed text, counting the calls
+    name = "stub"
+
+    def __init__(self, version="1"):
+        self.version = version
+        self.calls = []
+
+    def identity(self, target_arch):
+        return "stub " + self.version
+
+    def assemble_many(self, snippets, target_arch):
+        self.calls.append(list(snippets))
+        if any(code.startswith(b"bad") for code in snippets):
+            return None
+
+        return [target_arch.encode() + b":" + code[::-1] for code in snippets]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    old = get_cache()
+    cache = AssemblerCache(str(tmp_path), max_size=1 << 20)
+    set_cache(cache)
+    yield cache
+    set_cache(old)
+
+
+def test_cached(cache):
+    backend = StubBackend()
+    assert assemble("nop", backend=backend) == b"x64:pon"
+    assert assemble("nop", backend=backend) == b"x64:pon"
+    assert len(backend.calls) == 1
+
+
+def test_key(cache):
+    backend = StubBackend()
+    assemble("nop", "x64", backend)
+    assemble("nop", "x86", backend)
+    assemble("nop", "x64", StubBackend("2"))
+    assert len(backend.calls) == 2
+
+    keys = {AssemblerCache.key(b"nop", arch, identity)
+            for arch in ("x64", "x86") for identity in ("a", "ab")}
+    assert len(keys) == 4
+    # the fields are length prefixed
+    assert AssemblerCache.key(b"bc", "x64", "a") != AssemblerCache.key(b"c", "x64", "ab")
+
+
+def test_disk(cache, tmp_path):
+    backend = StubBackend()
+    assemble("nop", backend=backend)
+
+    # a new process only has the on-disk store
+    set_cache(AssemblerCache(str(tmp_path)))
+    assert assemble("nop", backend=backend) == b"x64:pon"
+    assert len(backend.calls) == 1
+
+    files = [f for _, _, fs in os.walk(tmp_path) for f in fs]
+    assert len(files) == 1 and files[0].endswith(".bin")
+
+
+def test_memory_only():
+    old = get_cache()
+    set_cache(AssemblerCache(None))
+    try:
+        backend = StubBackend()
+        assemble("nop", backend=backend)
+        assemble("nop", backend=backend)
+        assert len(backend.calls) == 1
+    finally:
+        set_cache(old)
+
+
+def test_no_cache():
+    old = get_cache()
+    set_cache(None)
+    try:
+        backend = StubBackend()
+        assemble("nop", backend=backend)
+        assemble("nop", backend=backend)
+        assert len(backend.calls) == 2
+    finally:
+        set_cache(old)
+
+
+def test_memory_lru():
+    cache = AssemblerCache(None, memory_items=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+
+
+def test_eviction(tmp_path):
+    cache = AssemblerCache(str(tmp_path), max_size=4000, memory_items=0)
+    for i in range(10):
+        key = AssemblerCache.key(str(i).encode(), "x64", "stub")
+        cache.put(key, bytes(1000))
+        # the mtime is the LRU clock, keep it increasing
+        os.utime(cache._file(key), (i, i))
+
+    sizes = [os.path.getsize(os.path.join(root, f))
+             for root, _, fs in os.walk(tmp_path) for f in fs]
+    assert sum(sizes) <= 4000
+
+    # the newest entries survive
+    assert cache.get(AssemblerCache.key(b"9", "x64", "stub")) == bytes(1000)
+    assert cache.get(AssemblerCache.key(b"0", "x64", "stub")) is None
+
+
+def test_many(cache):
+    backend = StubBackend()
+    assemble("a", backend=backend)
+
+    # only the missing snippets reach the backend, in one batch
+    assert assemble_many(["a", "b", "c"], backend=backend) == [b"x64:a", b"x64:b", b"x64:c"]
+    assert backend.calls == [[b"a"], [b"b", b"c"]]
+
+
+def test_many_failure(cache):
+    backend = StubBackend()
+    assert assemble_many(["a", "bad", "c"], backend=backend) == [b"x64:a", None, b"x64:c"]
+
+    # failures aren't cached
+    backend.calls.clear()
+    assert assemble("bad", backend=backend) is None
+    assert assemble_many(["a", "c"], backend=backend) == [b"x64:a", b"x64:c"]
+    assert backend.calls == [[b"bad"]]
+
+
+def _fill(path):
+    cache = AssemblerCache(path, memory_items=0)
+    for i in range(200):
+        key = AssemblerCache.key(str(i % 20).encode(), "x64", "stub")
+        cache.put(key, str(i % 20).encode() * 100)
+        data = cache.get(key)
+        assert data is None or data == str(i % 20).encode() * 100
+
+
+def test_processes(tmp_path):
+    import multiprocessing
+
+    procs = [multiprocessing.Process(target=_fill, args=(str(tmp_path),)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+
+    cache = AssemblerCache(str(tmp_path))
+    for i in range(20):
+        assert cache.get(AssemblerCache.key(str(i).encode(), "x64", "stub")) == str(i).encode() * 100
+
+    # no temporary file left behind
+    assert not [f for _, _, fs in os.walk(tmp_path) for f in fs if not f.endswith(".bin")]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from pwnlib.tubes import AsyncProcess
+
+SLOW = ["python3", "-c", "import sys, time; sys.stdout.write('ab'); sys.stdout.flush(); "
+                         "time.sleep(0.2); print('cX12;')"]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_recv_helpers():
+    async def main():
+        p = await AsyncProcess.create(SLOW)
+
+        # the lookahead needs a byte of the second chunk
+        data, match = await p.recvregex(rb"b(?=c)", timeout=5)
+        assert (data, match.group()) == (b"ab", b"b")
+
+        assert await p.recvuntil_any([b";", b"X"], timeout=5) == (1, b"cX")
+        assert await p.recvuntil(b"2", timeout=5, drop=True) == b"1"
+
+        p.unrecv(b"u")
+        assert await p.recv(None, timeout=5) == b"u;\n"
+        await p.close()
+
+    run(main())
+
+
+def test_timeout_keeps_data():
+    async def main():
+        p = await AsyncProcess.create(SLOW)
+        with pytest.raises(TimeoutError):
+            await p.recvline(timeout=0.05)
+
+        assert await p.recvline(timeout=5) == b"abcX12;\n"
+        await p.close()
+
+    run(main())
+
+
+def test_sendline():
+    async def main():
+        p = await AsyncProcess.create(["cat"])
+        await p.sendlines([b"one", b"two"], timeout=5)
+        assert await p.recvline(timeout=5) == b"one\n"
+        assert await p.recvline(timeout=5) == b"two\n"
+        await p.close()
+
+    run(main())
@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+
+from pwnlib.tubes import Remote, Listen, TubeGroup, Deadline
+
+
+@pytest.fixture
+def pair():
+    l = Listen(0, "127.0.0.1", timeout=5)
+    r = Remote("127.0.0.1", l.lport, timeout=5, sndbuf=4096)
+    l.wait_for_connection()
+    yield l, r
+    r.close()
+    l.close()
+
+
+def _full(size=1 << 22):
+    # more than the socket buffers of both ends can hold
+    return bytes(i & 0xff for i in range(256)) * (size // 256)
+
+
+def test_flush_timeout_requeues(pair):
+    l, r = pair
+    data = _full()
+
+    r._batch = []
+    r.send(b"head")
+    r.send(data)
+    r.sendline(b"tail")
+    with pytest.raises(TimeoutError):
+        r.flush(timeout=0.2)
+
+    queued = sum(memoryview(b).nbytes for b in r._batch)
+    assert 0 < queued < len(data) + 9
+
+    received = []
+    reader = threading.Thread(target=lambda: received.append(l.recvn(len(data) + 9, timeout=10)))
+    reader.start()
+    r.flush(timeout=10)
+    reader.join()
+    r._batch = None
+
+    assert received[0] == b"head" + data + b"tail\n"
+
+
+def test_batch_timeout(pair):
+    l, r = pair
+    with pytest.raises(TimeoutError):
+        with r.batch(timeout=0.2):
+            r.send(b"head")
+            r.send(_full())
+
+    # the queue is dropped when the batch block itself fails
+    assert r._batch is None
+
+
+def test_zero_deadline(pair):
+    l, r = pair
+    data = _full()
+
+    r._batch = []
+    r.sendmany([b"x", data])
+    with pytest.raises(TimeoutError):
+        r.flush(Deadline(0))
+
+    # the single buffer path too
+    r._batch = None
+    with pytest.raises(TimeoutError):
+        r.send(data, Deadline(0))
+
+
+def test_wait_any_with_queued_data(pair):
+    l, r = pair
+    l.sendline(b"ready")
+
+    # reading flushes the queue first, with a zero budget inside wait_any
+    r._batch = [_full()]
+    with pytest.raises(TimeoutError):
+        TubeGroup([r]).wait_any(b"never", timeout=0.3)
+
+    assert r._batch
+    r._batch = None
+
+
+def test_sendlines_one_write(stub):
+    tube = stub()
+    assert tube.sendlines([b"1", "2", bytearray(b"3")]) == 6
+    assert tube.writes == [b"1\n2\n3\n"]
+    assert tube.sendlines([]) == 0
+    assert tube.writes == [b"1\n2\n3\n"]
+
+
+def test_batch_single_write(stub):
+    tube = stub()
+    with tube.batch():
+        tube.sendline(b"a")
+        with tube.batch():
+            tube.send(b"b")
+        tube.sendmany([b"c", b"d"])
+        assert tube.writes == []
+
+    assert tube.writes == [b"a\nbcd"]
+
+
+def test_batch_flushes_before_reading(stub):
+    # the target may only answer once it got the queued data
+    tube = stub([b"ok\n"])
+    with tube.batch():
+        tube.sendline(b"go")
+        assert tube.recvline() == b"ok\n"
+        assert tube.writes == [b"go\n"]
+
+
+def test_batch_snapshots_mutable_buffers(stub):
+    tube = stub()
+    buf = bytearray(b"1")
+    with tube.batch():
+        tube.sendline(buf)
+        buf[0] = ord("2")
+        tube.sendline(buf)
+
+    assert tube.sent == b"1\n2\n"
+
+
+@pytest.mark.parametrize("accept", [0, 3, 5, 7])
+def test_flush_requeues_unsent_tail(stub, accept):
+    tube = stub(accept=accept)
+    tube._batch = []
+    tube.send(b"hello")
+    tube.send(b"world")
+
+    with pytest.raises(TimeoutError):
+        tube.flush()
+
+    assert b"".join(bytes(b) for b in tube._batch) == b"helloworld"[accept:]
+
+    # newer data goes after the requeued tail
+    tube.send(b"!")
+    tube.accept = None
+    tube.flush()
+    assert tube.sent == b"helloworld!"
+    tube._batch = None
@@ -0,0 +1,95 @@
+from pwnlib.tubes.buffer import Buffer
+
+
+def test_buffer():
+    buf = Buffer()
+    assert not buf
+
+    buf.add(b"hello ")
+    buf.add(bytearray(b"world"))
+    assert len(buf) == 11
+    assert buf.peek() == b"hello world"
+
+    assert buf.get(6) == b"hello "
+    buf.unget(b">> ")
+    assert buf.get() == b">> world"
+    assert buf.get() == b""
+
+
+def test_get_into():
+    buf = Buffer()
+    buf.add(b"abcdef")
+    out = bytearray(4)
+    assert buf.get_into(memoryview(out)) == 4
+    assert out == b"abcd"
+    assert buf.get_into(memoryview(out)) == 2
+    assert out[:2] == b"ef"
+
+
+def test_recvline_keeps_the_rest(stub):
+    tube = stub([b"one\ntwo\nthr", b"ee\nfour"])
+    assert tube.recvline() == b"one\n"
+    assert tube.recvline() == b"two\n"
+    assert tube.recvline() == b"three\n"
+    assert tube.recv() == b"four"
+
+
+def test_recvuntil_then_recv(stub):
+    tube = stub([b"prompt> tail"])
+    assert tube.recvuntil(b"> ", drop=True) == b"prompt"
+    assert tube.recv(2) == b"ta"
+    assert tube.recvn(2) == b"il"
+
+
+def test_unrecv(stub):
+    tube = stub([b"abc\n"])
+    assert tube.recvuntil(b"b") == b"ab"
+    tube.unrecv(b"xyz")
+    assert tube.recvline() == b"xyzc\n"
+
+
+def test_sendafter_keeps_the_rest(stub):
+    tube = stub([b"name: extra"])
+    assert tube.sendlineafter(b": ", b"bob") == 4
+    assert tube.sent == b"bob\n"
+    assert tube.recv() == b"extra"
+
+
+def test_eof_keeps_partial(stub):
+    tube = stub([b"no newline"])
+    try:
+        tube.recvline()
+    except ConnectionAbortedError:
+        pass
+    else:
+        raise AssertionError("recvline didn't hit EOF")
+
+    assert tube.recv() == b"no newline"
+
+
+def test_incremental_scan(stub):
+    # a 1 MB line in 4 KB reads, every scan starts where the last one stopped
+    chunks = [b"x" * 4096] * 256 + [b"\r\n"]
+    tube = stub(chunks)
+
+    starts = []
+    search = tube._buffer.search
+
+    def spy(matcher, start=0):
+        starts.append((start, len(tube._buffer)))
+        return search(matcher, start)
+
+    tube._buffer.search = spy
+    assert len(tube.recvuntil(b"\r\n")) == (1 << 20) + 2
+
+    assert len(starts) == len(chunks) + 1
+    for (start, _), (_, previous) in zip(starts[1:], starts):
+        assert start == previous
+
+
+def test_many_lines(stub):
+    lines = [b"line %d\n" % i for i in range(20000)]
+    data = b"".join(lines)
+    tube = stub([data[i:i + 65536] for i in range(0, len(data), 65536)])
+    for line in lines:
+        assert tube.recvline(size=65536) == line
@@ -0,0 +1,105 @@
+import itertools
+
+import pytest
+
+from pwnlib.binary import cyclic, cyclic_find, p32, p64
+
+
+def fkm(k, n):
+    # Fredricksen-Kessler-Maiorana, the textbook recursive form
+    a = [0] * k * n
+    out = []
+
+    def db(t, p):
+        if t > n:
+            if n % p == 0:
+                out.extend(a[1:p + 1])
+        else:
+            a[t] = a[t - p]
+            db(t + 1, p)
+            for j in range(a[t - p] + 1, k):
+                a[t] = j
+                db(t + 1, t)
+
+    db(1, 1)
+    return bytes(out)
+
+
+def alphabet(k):
+    return bytes(range(ord("a"), ord("a") + k))
+
+
+cases = [(k, n) for k in range(2, 7) for n in range(1, 7) if k ** n <= 50000]
+
+# each lookup costs about a millisecond, every window is checked on the smaller ones
+small = [(k, n) for k, n in cases if k ** n <= 5000]
+
+
+@pytest.mark.parametrize("k, n", cases)
+def test_pattern(k, n):
+    expected = fkm(k, n).translate(bytes.maketrans(bytes(range(k)), alphabet(k)))
+    assert cyclic(alphabet=alphabet(k), subseq_len=n) == expected
+
+    # every prefix of the pattern
+    for length in range(0, min(len(expected), 200)):
+        assert cyclic(length, alphabet(k), n) == expected[:length]
+
+
+@pytest.mark.parametrize("k, n", small)
+def test_find(k, n):
+    pattern = cyclic(alphabet=alphabet(k), subseq_len=n)
+
+    # every window, with and without trailing bytes
+    for i in range(len(pattern) - n + 1):
+        assert cyclic_find(pattern[i:i + n], alphabet(k), n) == i
+        assert cyclic_find(pattern[i:i + n + 3], alphabet(k), n) == i
+
+    # the windows over the wrap of the sequence aren't in the linear pattern
+    wrapped = pattern + pattern[:n - 1]
+    for i in range(len(pattern) - n + 1, len(pattern)):
+        window = wrapped[i:i + n]
+        assert cyclic_find(window, alphabet(k), n) == pattern.find(window)
+
+
+@pytest.mark.parametrize("k, n", [(2, 3), (3, 4), (4, 5)])
+def test_find_all(k, n):
+    # every possible subsequence, found or not
+    pattern = cyclic(alphabet=alphabet(k), subseq_len=n)
+    for window in itertools.product(alphabet(k), repeat=n):
+        window = bytes(window)
+        assert cyclic_find(window, alphabet(k), n) == pattern.find(window)
+
+
+def test_find_missing():
+    assert cyclic_find(b"ABCD") == -1
+    assert cyclic_find(b"aaaa") == 0
+    # trailing bytes must continue the pattern
+    assert cyclic_find(b"aaabaaac") == 1
+    assert cyclic_find(b"aaabaaad") == -1
+
+
+def test_packed():
+    pattern = cyclic(1000)
+    assert cyclic_find(0x61616166) == 20
+    assert cyclic_find(int.from_bytes(pattern[400:404], "little")) == 400
+    assert cyclic_find(p32(int.from_bytes(pattern[123:127], "little"))) == 123
+
+    pattern = cyclic(100000, subseq_len=8)
+    value = int.from_bytes(pattern[99000:99008], "little")
+    assert cyclic_find(value, subseq_len=8) == 99000
+    assert cyclic_find(p64(value), subseq_len=8) == 99000
+
+
+def test_str():
+    assert cyclic(8, "ab", 3) == b"aaababbb"
+    assert cyclic_find("abb", "ab", 3) == 4
+
+
+def test_large():
+    # 8 byte subsequences, index arithmetic instead of a scan
+    pattern = cyclic(1 << 24, subseq_len=8)
+    assert len(pattern) == 1 << 24
+    for i in (0, 12345, (1 << 24) - 8):
+        assert cyclic_find(pattern[i:i + 8], subseq_len=8) == i
+
+    assert cyclic_find(b"zzzzzzzz", subseq_len=8) == 26 ** 8 - 8
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from pwnlib.tubes import Process, Deadline
+
+DRIP = ["python3", "-c", "import sys, time\n"
+                         "while True:\n"
+                         "    sys.stdout.write('x'); sys.stdout.flush(); time.sleep(0.05)"]
+
+
+def test_deadline():
+    forever = Deadline()
+    assert forever.remaining() is None
+    assert not forever.expired()
+
+    assert Deadline(0).expired()
+    assert Deadline(0).remaining() == 0.0
+
+    d = Deadline(10)
+    assert 9 < d.remaining() <= 10
+    assert Deadline.get(d) is d
+    assert Deadline.get(None, 5).remaining() <= 5
+    assert Deadline.get(None).remaining() is None
+
+
+def test_dripping_target_is_bounded():
+    # every read gets data, only the total budget ends the wait
+    p = Process(DRIP)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        p.recvuntil(b"END", timeout=0.5)
+    assert time.monotonic() - start < 1.5
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        p.recvline(timeout=0.3)
+    assert time.monotonic() - start < 1.3
+
+    # the data read so far is still there
+    assert p.recvn(10, timeout=5) == b"x" * 10
+    p.close()
+
+
+def test_composite_shares_one_budget(stub):
+    tube = stub([b"na", b"me", b": ", b"rest"])
+    tube.sendlineafter(b": ", b"bob", timeout=10)
+
+    # every raw call got what was left of the same 10 s
+    budgets = [t for t in tube.timeouts if t is not None]
+    assert len(budgets) >= 4
+    assert all(t <= 10 for t in budgets)
+    assert budgets == sorted(budgets, reverse=True)
+    assert tube.sent == b"bob\n"
+
+
+def test_sendlineafter_times_out_as_a_whole():
+    p = Process(["python3", "-c", "import time; time.sleep(0.4); print('name: ', flush=True); "
+                                  "time.sleep(5)"])
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        p.sendlineafter(b"name: ", b"bob", timeout=0.2)
+    assert time.monotonic() - start < 1
+    p.close()
+
+
+def test_default_timeout_untouched(stub):
+    tube = stub([b"a\n", b"b\n"], timeout=30)
+    tube.recvline(timeout=1)
+    assert tube._timeout == 30
+
+    # the default applies when no timeout is given
+    tube.recvline()
+    assert 29 < tube.timeouts[-1] <= 30
+
+
+def test_passed_deadline(stub):
+    tube = stub([None, b"late\n"])
+    deadline = Deadline(0)
+    with pytest.raises(TimeoutError):
+        tube.recvline(timeout=deadline)
+    assert tube.timeouts[-1] == 0.0
@@ -0,0 +1,197 @@
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from pwnlib.binary import ELF
+
+LIBC = "/lib/x86_64-linux-gnu/libc.so.6"
+LS = "/bin/ls"
+
+need_libc = pytest.mark.skipif(not os.path.isfile(LIBC), reason="no x86_64 libc")
+need_ls = pytest.mark.skipif(not os.path.isfile(LS), reason="no /bin/ls")
+need_binutils = pytest.mark.skipif(not (shutil.which("nm") and shutil.which("readelf")
+                                        and shutil.which("objdump")),
+                                   reason="binutils not installed")
+
+
+def _run(*cmd):
+    return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+
+
+def _nm_dynamic(path):
+    # name -> address of the defined dynamic symbols, default versions only
+    table = {}
+    for line in _run("nm", "-D", "--defined-only", path).splitlines():
+        fields = line.split()
+        if len(fields) != 3 or fields[1] in "AU":
+            continue
+
+        value, _, name = fields
+        if "@" in name and "@@" not in name:
+            continue
+
+        value = int(value, 16)
+        if value:
+            table[name.split("@")[0]] = value
+
+    return table
+
+
+@need_libc
+def test_header():
+    with ELF(LIBC) as elf:
+        assert elf.bits == 64
+        assert elf.arch == "amd64"
+        assert elf.endian == "little"
+        assert elf.pie
+        assert elf.address == 0
+
+
+def test_not_elf(tmp_path):
+    path = tmp_path / "data"
+    path.write_bytes(b"MZ" + bytes(100))
+    with pytest.raises(ValueError):
+        ELF(str(path))
+
+
+@need_libc
+@need_binutils
+def test_symbols():
+    expected = _nm_dynamic(LIBC)
+    assert "system" in expected
+
+    # single names go through .gnu.hash, before any table is built
+    with ELF(LIBC) as elf:
+        for name in ("system", "printf", "memcpy", "__libc_start_main"):
+            if name in expected:
+                assert elf.symbols[name] == expected[name], name
+        assert elf.symbols._table is None
+
+        table = dict(elf.symbols)
+        for name, value in expected.items():
+            assert table.get(name) == value, name
+
+        assert "no_such_symbol" not in elf.symbols
+        with pytest.raises(KeyError):
+            elf.symbols["no_such_symbol"]
+
+
+@need_libc
+@need_binutils
+def test_sections():
+    expected = {}
+    for line in _run("readelf", "-SW", LIBC).splitlines():
+        m = re.match(r"\s*\[\s*[1-9]\d*\]\s+(\S+)\s+\S+\s+([0-9a-f]+)\s+([0-9a-f]+)\s+([0-9a-f]+)", line)
+        if m:
+            expected.setdefault(m.group(1), tuple(int(x, 16) for x in m.group(2, 3, 4)))
+
+    with ELF(LIBC) as elf:
+        for name, (addr, offset, size) in expected.items():
+            section = elf.sections[name]
+            assert (section.addr, section.offset, section.size) == (addr, offset, size), name
+
+
+def _readelf_got(path):
+    got = {}
+    for line in _run("readelf", "-rW", path).splitlines():
+        fields = line.split()
+        if len(fields) >= 5 and fields[2] in ("R_X86_64_GLOB_DAT", "R_X86_64_JUMP_SLOT"):
+            got[fields[4].split("@")[0]] = int(fields[0], 16)
+
+    return got
+
+
+@need_libc
+@need_binutils
+def test_got_only_got_relocs():
+    # libc also has R_X86_64_64 data relocations against some of them
+    with ELF(LIBC) as elf:
+        assert dict(elf.got) == _readelf_got(LIBC)
+
+
+@need_ls
+@need_binutils
+def test_got_plt():
+    got = _readelf_got(LS)
+
+    plt = {}
+    for line in _run("objdump", "-d", "-j", ".plt", "-j", ".plt.sec", LS).splitlines():
+        m = re.match(r"([0-9a-f]+) <(\S+)@plt>:", line)
+        if m:
+            plt[m.group(2)] = int(m.group(1), 16)
+
+    with ELF(LS) as elf:
+        assert dict(elf.got) == got
+        assert plt and dict(elf.plt) == plt
+
+
+@need_libc
+def test_search():
+    with ELF(LIBC) as elf:
+        address = next(elf.search(b"/bin/sh\x00"))
+        assert elf.read(address, 8) == b"/bin/sh\x00"
+        assert elf.string(address) == b"/bin/sh"
+
+        view = elf.view(address, 7)
+        assert view == b"/bin/sh"
+        view.release()
+
+        # ret instructions in code only
+        for i, address in zip(range(10), elf.search(b"\xc3", executable=True)):
+            assert elf.read(address, 1) == b"\xc3"
+
+        assert not list(elf.search(b"/bin/sh\x00", executable=True, writable=True))
+
+
+@need_libc
+def test_rebase():
+    with ELF(LIBC) as elf:
+        system = elf.symbols["system"]
+        address = next(elf.search(b"/bin/sh\x00"))
+
+        elf.address = 0x7f0000000000
+        assert elf.symbols["system"] == system + 0x7f0000000000
+        assert next(elf.search(b"/bin/sh\x00")) == address + 0x7f0000000000
+        assert elf.read(address + 0x7f0000000000, 7) == b"/bin/sh"
+
+        elf.address = 0
+        assert elf.symbols["system"] == system
+
+
+@pytest.mark.skipif(not shutil.which("gcc"), reason="gcc not installed")
+def test_symtab(tmp_path):
+    # local functions are only in .symtab
+    src = tmp_path / "t.c"
+    src.write_text("static int helper(void) { return 1; }\n"
+                   "int (*keep)(void) = helper;\n"
+                   "int main(void) { return keep(); }\n")
+    path = str(tmp_path / "t")
+    subprocess.run(["gcc", "-O0", "-o", path, str(src)], check=True)
+
+    address = int(_run("nm", path).split(" t helper")[0].split()[-1], 16)
+    with ELF(path) as elf:
+        assert elf.symbols["helper"] == address
+        assert "main" in elf.symbols
+
+
+@pytest.mark.skipif(not (shutil.which("gcc") and shutil.which("objcopy")),
+                    reason="gcc or objcopy not installed")
+def test_symbol_precedence(tmp_path):
+    # an exported foo, plus a .symtab only foo somewhere else
+    src = tmp_path / "d.c"
+    src.write_text("int foo(void) { return 1; }\n"
+                   "int main(void) { return foo(); }\n")
+    plain, path = str(tmp_path / "plain"), str(tmp_path / "d")
+    subprocess.run(["gcc", "-rdynamic", "-o", plain, str(src)], check=True)
+    subprocess.run(["objcopy", "--add-symbol", "foo=.text:0x1,global", plain, path], check=True)
+
+    dynamic = _nm_dynamic(path)["foo"]
+
+    # the same answer before and after the table is built
+    with ELF(path) as elf:
+        assert elf.symbols["foo"] == dynamic
+        assert dict(elf.symbols)["foo"] == dynamic
+        assert elf.symbols["foo"] == dynamic
@@ -0,0 +1,91 @@
+import os
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from pwnlib.binary.encoding import encode
+from pwnlib.binary.encoding.encoder import _encode, _getpc, _targets
+
+# exit(42)
+_exit = {
+    "x64": bytes.fromhex("bf2a000000b83c0000000f05"),
+    "x86": bytes.fromhex("bb2a000000b801000000cd80"),
+}
+
+_tools = {
+    "x64": (["as", "--64"], ["ld", "-N"]),
+    "x86": (["as", "--32"], ["ld", "-m", "elf_i386", "-N"]),
+}
+
+_bad = [b"\x00", b"\x00\n", b"\x00\x0f\x05\xcd\x80*", b"\x00\n\r \t\x0b\x0c"]
+
+needs_binutils = pytest.mark.skipif(shutil.which("as") is None or shutil.which("ld") is None,
+                                    reason="GNU as/ld not installed")
+
+
+def _run(code, arch, tmp_path):
+    # a static binary whose writable text is `code`, -N keeps it RWX so the
+    # decoder can write the payload over
+    asm, ld = _tools[arch]
+    src, obj, exe = tmp_path / "a.s", tmp_path / "a.o", tmp_path / "a"
+
+    lines = "\n".join(".byte " + ",".join(str(b) for b in code[i:i + 16])
+                      for i in range(0, len(code), 16))
+    src.write_text(".globl _start\n_start:\n" + lines + "\n")
+
+    subprocess.run(asm + ["-o", str(obj), str(src)], check=True)
+    result = subprocess.run(ld + ["-o", str(exe), str(obj)], capture_output=True)
+    if result.returncode:
+        pytest.skip("ld can't link {}: {}".format(arch, result.stderr.decode()))
+
+    return subprocess.run([str(exe)], timeout=10).returncode
+
+
+_cases = [(arch, strategy, method)
+          for arch in _targets
+          for strategy in _targets[arch]
+          for method in _getpc[arch]]
+
+
+@needs_binutils
+@pytest.mark.parametrize("arch,strategy,method", _cases)
+def test_round_trip(arch, strategy, method, tmp_path):
+    ran = 0
+    for bad in _bad:
+        encoded = _encode(_exit[arch], bad, arch, strategy, method)
+        if encoded is None:
+            continue
+
+        assert not set(encoded) & set(bad)
+        assert _run(encoded, arch, tmp_path) == 42
+        ran += 1
+
+    assert ran
+
+
+@needs_binutils
+@pytest.mark.parametrize("arch", list(_targets))
+def test_random_payload(arch, tmp_path):
+    # high entropy data only fits the pair strategy, the exit is appended so
+    # the decoded junk is skipped over with a jump
+    rand = random.Random(1)
+    junk = bytes(rand.randrange(256) for _ in range(4096))
+    shellcode = b"\xe9" + len(junk).to_bytes(4, "little") + junk + _exit[arch]
+
+    bad = b"\x00\n\r\x0f\x05\xcd\x80"
+    encoded = encode(shellcode, bad, arch)
+    assert encoded is not None
+    assert not set(encoded) & set(bad)
+    assert len(encoded) > 2 * len(shellcode)
+    assert _run(encoded, arch, tmp_path) == 42
+
+
+def test_clean_passthrough():
+    assert encode(b"\x90\x90", b"\x00") == b"\x90\x90"
+
+
+def test_no_encoder(capsys):
+    assert encode(_exit["x64"], bytes(range(1, 256)), "x64") is None
+    assert "every decoder stub needs" in capsys.readouterr().out
@@ -0,0 +1,115 @@
+import random
+import re
+
+import pytest
+
+from pwnlib.binary.fmtstr import fmtstr_payload
+
+_sizes = {"hhn": 1, "hn": 2, "n": 4, "lln": 8}
+
+_spec = re.compile(rb"%(?:(\d+)c|(\d+)\$(hhn|hn|n|lln))")
+
+
+def _printf(payload, offset, word_size, written=0):
+    # what printf does with `payload` as the format when the payload itself
+    # sits on the stack at argument `offset`: the memory it writes
+    word = word_size // 8
+    fmt = payload.split(b"\x00")[0]
+
+    memory = {}
+    count = written
+    i = 0
+    while i < len(fmt):
+        if fmt[i:i + 1] != b"%":
+            count += 1
+            i += 1
+            continue
+
+        m = _spec.match(fmt, i)
+        assert m, "unexpected conversion at {}: {!r}".format(i, fmt[i:i + 16])
+        if m.group(1):
+            count += int(m.group(1))
+        else:
+            j = int(m.group(2)) - offset
+            assert j >= 0 and (j + 1) * word <= len(payload), "argument {} outside the payload".format(m.group(2))
+            address = int.from_bytes(payload[j * word:(j + 1) * word], "little")
+            size = _sizes[m.group(3).decode()]
+            value = count % (1 << (8 * size))
+            for k, byte in enumerate(value.to_bytes(size, "little")):
+                memory[address + k] = byte
+        i = m.end()
+
+    return memory
+
+
+def _expected(writes, word_size):
+    memory = {}
+    for address, value in writes.items():
+        if isinstance(value, int):
+            value = value.to_bytes(word_size // 8, "little")
+        for k, byte in enumerate(value):
+            memory[address + k] = byte
+    return memory
+
+
+def _address(rand, base, used, size):
+    # clear of "%" so the packed addresses read as literals by the model,
+    # and of earlier writes
+    while True:
+        address = base + rand.randrange(0, 0x1000)
+        if any(b"%" in a.to_bytes(8, "little") for a in range(address, address + size)):
+            continue
+        if any(a in used for a in range(address, address + size)):
+            continue
+        used.update(range(address, address + size))
+        return address
+
+
+def _writes(rand, word_size):
+    base = 0x601000 if word_size == 64 else 0x0804a000
+    used = set()
+    writes = {}
+    for _ in range(rand.randrange(1, 5)):
+        if rand.random() < 0.5:
+            address = _address(rand, base, used, word_size // 8)
+            writes[address] = rand.getrandbits(word_size)
+        else:
+            data = bytes(rand.randrange(256) for _ in range(rand.randrange(1, 12)))
+            writes[_address(rand, base, used, len(data))] = data
+    return writes
+
+
+@pytest.mark.parametrize("word_size", [32, 64])
+@pytest.mark.parametrize("write_size", [None, "byte", "short", "int"])
+def test_against_printf(word_size, write_size):
+    rand = random.Random(word_size * 10 + len(write_size or ""))
+    for _ in range(30):
+        writes = _writes(rand, word_size)
+        offset = rand.randrange(1, 20)
+        written = rand.choice([0, 0, 7, 300, 70000])
+
+        payload = fmtstr_payload(offset, writes, word_size, written, write_size)
+        assert len(payload) % (word_size // 8) == 0
+        assert _printf(payload, offset, word_size, written) == _expected(writes, word_size)
+
+
+def test_write_size():
+    writes = {0x601000: 0xdeadbeef}
+    for write_size, spec in (("byte", b"hhn"), ("short", b"hn"), ("int", b"$n")):
+        payload = fmtstr_payload(6, writes, 32, write_size=write_size)
+        specs = re.findall(rb"\$(hhn|hn|n|lln)", payload.split(b"\x00")[0])
+        assert set(specs) == {spec.lstrip(b"$")}
+        assert _printf(payload, 6, 32) == _expected(writes, 32)
+
+
+def test_adjacent_writes_merge():
+    # two byte strings next to each other are planned as one run, a single
+    # %n when the counter is already right for it
+    writes = {0x601000: b"\x00\x00", 0x601002: b"\x00\x00"}
+    payload = fmtstr_payload(8, writes)
+    assert payload.count(b"$") == 1
+    assert _printf(payload, 8, 64) == _expected(writes, 64)
+
+
+def test_empty():
+    assert fmtstr_payload(6, {}) == b""
@@ -0,0 +1,95 @@
+import os
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from pwnlib.arch import GnuBackend, assemble_many, get_backend, get_cache, set_cache
+from pwnlib.arch import gnu
+from pwnlib.arch.backend import split_table
+
+pytestmark = pytest.mark.skipif(not (shutil.which("as") and shutil.which("objcopy")),
+                                reason="GNU as/objcopy not installed")
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    old = get_cache()
+    set_cache(None)
+    yield
+    set_cache(old)
+
+
+@pytest.fixture
+def spawns(monkeypatch):
+    calls = []
+    popen = subprocess.Popen
+
+    def counting(cmd, *args, **kwargs):
+        calls.append(os.path.basename(cmd[0]))
+        return popen(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(gnu.subprocess, "Popen", counting)
+    return calls
+
+
+def test_default_backend():
+    if os.name != "nt":
+        assert isinstance(get_backend(), GnuBackend)
+
+
+def test_assemble_many():
+    backend = GnuBackend()
+    assert backend.assemble_many([b"nop", b"ret", b"mov eax, 1", b"xor rdi, rdi"], "x64") == \
+            [b"\x90", b"\xc3", b"\xb8\x01\x00\x00\x00", b"\x48\x31\xff"]
+
+    assert backend.assemble(b"push ebp\nmov ebp, esp", "x86") == b"\x55\x89\xe5"
+    assert GnuBackend(syntax="att").assemble(b"movl $1, %eax", "x64") == b"\xb8\x01\x00\x00\x00"
+
+
+def test_labels_stay_local():
+    # jumps resolve inside their own snippet
+    code = assemble_many(["jmp 1f\nnop\n1: ret", "2: jmp 2b"], backend=GnuBackend())
+    assert code == [b"\xeb\x01\x90\xc3", b"\xeb\xfe"]
+
+
+def _backend(spawns):
+    # `as --version` is run once per backend for the cache key
+    backend = GnuBackend()
+    backend.identity("x64")
+    spawns.clear()
+    return backend
+
+
+def test_one_batch_one_spawn(spawns):
+    snippets = ["mov eax, {}".format(i) for i in range(200)]
+    code = assemble_many(snippets, backend=_backend(spawns))
+    assert code == [b"\xb8" + struct.pack("<I", i) for i in range(200)]
+    assert sorted(spawns) == ["as", "objcopy"]
+
+
+def test_fallback(spawns, capsys):
+    # one bad snippet fails the batch, the others are then assembled alone
+    code = assemble_many(["nop", "not_an_insn eax", "ret"], backend=_backend(spawns))
+    assert code == [b"\x90", None, b"\xc3"]
+    assert spawns.count("as") == 4
+
+    # the same label in two snippets collides in one batch only
+    code = assemble_many(["a: nop", "a: ret"], backend=GnuBackend())
+    assert code == [b"\x90", b"\xc3"]
+
+
+def test_unknown_arch(capsys):
+    assert GnuBackend().assemble_many([b"nop"], "mips") is None
+    assert "mips" in capsys.readouterr().out
+
+
+def test_split_table():
+    code = b"\x90\xc3\xc3"
+    table = struct.pack("<5I", 0, 1, 1, 2, 2)
+    assert split_table(code + table, 2) == [b"\x90", b"\xc3\xc3"]
+
+    assert split_table(b"\x00" * 3, 2) is None
+    assert split_table(code + table[:-4] + struct.pack("<I", 3), 2) is None
+    assert split_table(code[:1] + table, 2) is None
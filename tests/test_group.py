@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from pwnlib.tubes import Process, TubeGroup
+
+CAT = ["cat"]
+
+
+def test_recvuntil_any():
+    with TubeGroup([Process(CAT), Process(CAT)]) as group:
+        a, b = list(group)
+        b.send(b"x;y")
+
+        tube, index, data = group.recvuntil_any([b"!", b";"], timeout=5)
+        assert tube is b
+        assert (index, data) == (1, b"x;")
+
+        a.sendline(b"line")
+        assert group.recvline_any(timeout=5) == (a, b"line\n")
+
+
+def test_broadcast():
+    with TubeGroup([Process(CAT), Process(CAT)]) as group:
+        assert group.sendline(b"all", timeout=5) == [4, 4]
+        for tube in group:
+            assert tube.recvline(timeout=5) == b"all\n"
+
+
+def test_broadcast_failure(capsys):
+    dead = Process(["true"])
+    dead._proc.wait()
+    time.sleep(0.1)
+
+    first, last = Process(CAT), Process(CAT)
+    with TubeGroup([first, dead, last]) as group:
+        # the tubes after the failing one still get the data
+        with pytest.raises(OSError):
+            group.sendline(b"x" * 200000, timeout=5)
+
+        assert "sendline failed" in capsys.readouterr().out
+        for tube in (first, last):
+            assert tube.recvn(200001, timeout=5) == b"x" * 200000 + b"\n"
@@ -0,0 +1,109 @@
+import re
+
+import pytest
+
+from pwnlib.tubes import Matcher
+from pwnlib.tubes.matcher import MAX_LOOKBACK
+
+
+def test_literals():
+    m = Matcher.literals([b"b", "abc", b"zz"])
+    # leftmost, then longest among those starting there
+    assert m.search(b"xxabcd") == (2, 5, 1)
+    assert m.search(b"xxbzz") == (2, 3, 0)
+    assert m.search(b"xxzz") == (2, 4, 2)
+    assert m.search(b"nothing") is None
+
+    single = Matcher.literals([b"\n"])
+    assert single.search(b"ab\ncd\n", 3) == (5, 6, 0)
+
+
+def test_empty_delimiters():
+    with pytest.raises(AssertionError):
+        Matcher.literals([])
+    with pytest.raises(AssertionError):
+        Matcher.literals([b""])
+
+
+def test_start():
+    # only the bytes a match crossing the old end can begin in are rescanned
+    assert Matcher.literals([b"abcd", b"x"]).start(100) == 97
+    assert Matcher.pattern(rb"a\d{3}").start(100) == 97
+    assert Matcher.pattern(rb"a\d+").start(1 << 20) == (1 << 20) - MAX_LOOKBACK
+    assert Matcher.pattern(rb"a\d+", lookback=None).start(1 << 20) == 0
+    # a lookaround depends on bytes outside of the match width
+    assert Matcher.pattern(rb"a(?=bc)").start(1 << 20) == (1 << 20) - MAX_LOOKBACK
+
+
+def test_pattern_types():
+    assert Matcher.pattern("é+").search("xéé".encode("latin-1")) == (1, 3, 0)
+    assert Matcher.pattern(re.compile(r"\d+")).search(b"ab123") == (2, 5, 0)
+
+
+def test_delimiter_across_chunks(stub):
+    tube = stub([b"ab", b"c:", b":d", b"rest"])
+    assert tube.recvuntil_any([b"zz", b"::d"]) == (1, b"abc::d")
+    assert tube.recv() == b"rest"
+
+
+def test_list_delimiter_length(stub):
+    # the cut is at the end of the delimiter that matched
+    tube = stub([b"one>>two>three"])
+    assert tube.recvuntil([b">", b">>"], drop=True) == b"one"
+    assert tube.recvuntil([b">", b">>"]) == b"two>"
+    assert tube.recv() == b"three"
+
+
+def test_lookahead_across_chunks(stub):
+    tube = stub([b"ab", b"c", b"d"])
+    data, match = tube.recvregex(rb"b(?=c)")
+    assert (data, match.group(), match.start()) == (b"ab", b"b", 1)
+    assert tube.recv() == b"c"
+
+
+def test_lookbehind_across_chunks(stub):
+    tube = stub([b"xa", b"b"])
+    data, match = tube.recvregex(rb"(?<=a)b")
+    assert data == b"xab"
+    assert match.group() == b"b"
+
+
+def test_unbounded_across_chunks(stub):
+    tube = stub([b"noise END12", b"34", b";tail"])
+    data, match = tube.recvregex(rb"END(\d+);", drop=True)
+    assert data == b"noise "
+    assert match.group(1) == b"1234"
+    assert tube.recv() == b"tail"
+
+
+def test_unbounded_rescan_is_bounded(stub):
+    # 32 KB of digits in 1 KB reads, each scan resumes at most MAX_LOOKBACK
+    # before the end of the previous one instead of at the start
+    chunks = [b"1" * 1024] * 32 + [b";"]
+    tube = stub([b"x" * (MAX_LOOKBACK * 2), b"END"] + chunks)
+
+    scans = []
+    search = tube._buffer.search
+
+    def spy(matcher, start=0):
+        scans.append((matcher.start(start), start))
+        return search(matcher, start)
+
+    tube._buffer.search = spy
+    data, match = tube.recvregex(rb"END(\d+);", size=1 << 20)
+    assert len(match.group(1)) == 32 * 1024
+    assert all(start - begin <= MAX_LOOKBACK for begin, start in scans)
+    assert scans[-1][0] > MAX_LOOKBACK
+
+
+def test_unbounded_without_lookback(stub):
+    # longer than the window, only found when every scan starts at 0
+    chunks = [b"1" * 4096] * (2 * MAX_LOOKBACK // 4096) + [b";"]
+    tube = stub([b"END"] + chunks)
+    matcher = Matcher.pattern(rb"END(\d+);", lookback=None)
+    data, match = tube.recvregex(matcher)
+    assert len(match.group(1)) == 2 * MAX_LOOKBACK
+
+    tube = stub([b"END"] + chunks)
+    with pytest.raises(ConnectionAbortedError):
+        tube.recvregex(rb"END(\d+);")
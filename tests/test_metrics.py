@@ -0,0 +1,85 @@
+from pwnlib.tubes.tube import Tube
+from pwnlib.tubes import Metrics
+
+
+class StubTube(Tube):
+    # only the mandatory hooks, the default _recv_raw_into and
+    # _send_raw_many go through them
+    def __init__(self, incoming=b""):
+        self.incoming = bytearray(incoming)
+        self.sent = bytearray()
+        super().__init__()
+
+    def _recv_raw(self, size):
+        if not self.incoming:
+            raise TimeoutError("Timeout (_recv_raw)")
+        data = bytes(self.incoming[:size])
+        del self.incoming[:size]
+        return data
+
+    def _send_raw(self, data):
+        self.sent += data
+        return len(data)
+
+    def _set_timeout(self, timeout):
+        pass
+
+    def _is_alive(self):
+        return True
+
+    def _close(self):
+        pass
+
+
+def test_bytes_counted_once():
+    tube = StubTube(b"abcdef")
+    metrics = tube.enable_metrics()
+
+    tube.sendline(b"1234")
+    assert metrics.counters["bytes_out"] == 5
+
+    buf = bytearray(6)
+    assert tube.recv_into(buf) == 6
+    assert metrics.counters["bytes_in"] == 6
+
+
+def test_gather_counted_once():
+    tube = StubTube()
+    metrics = tube.enable_metrics()
+
+    tube.sendmany([b"ab", b"cd", b"ef"])
+    assert tube.sent == b"abcdef"
+    assert metrics.counters["bytes_out"] == 6
+
+
+def test_nested_failures_counted_once():
+    tube = StubTube(b"no newline")
+    metrics = tube.enable_metrics()
+
+    try:
+        tube.recvline(timeout=0.01)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("recvline didn't time out")
+
+    assert metrics.counters["timeouts"] == 1
+    assert metrics.counters["errors"] == 0
+    assert metrics.counters["bytes_in"] == 10
+    assert metrics.calls["recvline"] == 1
+
+
+def test_shared_and_detach():
+    metrics = Metrics()
+    a, b = StubTube(), StubTube()
+    a.enable_metrics(metrics)
+    b.enable_metrics(metrics)
+
+    a.send(b"abc")
+    b.send(b"de")
+    assert metrics.counters["bytes_out"] == 5
+
+    b.disable_metrics()
+    b.send(b"fgh")
+    assert metrics.counters["bytes_out"] == 5
+    assert "_send_raw" not in b.__dict__
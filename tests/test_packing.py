@@ -0,0 +1,58 @@
+import pytest
+
+from pwnlib.binary import flat, fit, Payload, pack_many, unpack_many, p32, p64
+
+
+def test_flat():
+    data = flat(1, [2, [b"ab"]], "cd", word_size=32)
+    assert type(data) is bytes
+    assert data == p32(1) + p32(2) + b"abcd"
+
+    assert flat(-1) == b"\xff" * 8
+    assert flat(0x4142, word_size=16, byteorder="big") == b"AB"
+    assert flat() == b""
+
+
+def test_flat_text():
+    # like str2bytes, latin-1 when it fits and utf-8 otherwise
+    assert flat("\xff") == b"\xff"
+    assert flat("€") == "€".encode()
+
+
+def test_flat_rejects():
+    with pytest.raises(ValueError):
+        flat(1.5)
+
+
+def test_payload():
+    payload = Payload(24, "A")
+    payload[0] = 0x41424344
+    payload[8] = "€"
+    payload[16] = [1]
+    data = bytes(payload.build())
+    assert data == p64(0x41424344) + "€".encode() + b"AAAAA" + p64(1)
+
+
+def test_payload_errors():
+    payload = Payload(8)
+    payload[4] = b"abcd"
+    with pytest.raises(ValueError):
+        payload[4] = b"x"
+
+    payload[6] = b"xy"
+    with pytest.raises(ValueError):
+        payload.build()
+
+    with pytest.raises(ValueError):
+        fit({4: b"abcdefgh"}, length=8)
+
+
+def test_fit():
+    assert bytes(fit({2: b"xy"}, filler="é")) == b"\xe9\xe9xy"
+
+
+def test_pack_many():
+    values = [0, 1, 0xdeadbeef, (1 << 64) - 1]
+    data = pack_many(values)
+    assert data == b"".join(p64(v) for v in values)
+    assert list(unpack_many(data)) == values
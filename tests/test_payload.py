@@ -0,0 +1,67 @@
+import pytest
+
+from pwnlib.binary import Payload, fit, p32, p64
+from pwnlib.tubes import Process
+
+
+def test_offsets_and_filler():
+    payload = Payload(filler=b"ABC")
+    payload.update({8: 0x1122334455667788, 2: b"xy"})
+    data = payload.build()
+    assert isinstance(data, memoryview)
+    assert bytes(data) == b"ABxyBCAB" + p64(0x1122334455667788)
+    assert len(payload) == 16
+
+
+def test_word_size_and_byteorder():
+    data = fit({0: 0x41424344, 4: [1, 2]}, word_size=32, byteorder="big")
+    assert bytes(data) == b"ABCD" + b"\x00\x00\x00\x01\x00\x00\x00\x02"
+
+    # negative values wrap like the target's registers
+    assert bytes(fit({0: -1}, word_size=32)) == b"\xff" * 4
+
+
+def test_overlaps():
+    payload = Payload()
+    payload[0] = 1
+    with pytest.raises(ValueError):
+        payload[0] = 2
+
+    # only known once the sizes are laid out
+    payload[4] = b"abcd"
+    with pytest.raises(ValueError):
+        payload.build()
+
+
+def test_length():
+    assert bytes(fit({}, length=4, filler="z")) == b"zzzz"
+    with pytest.raises(ValueError):
+        fit({0: 1}, length=4)
+
+
+def test_spray():
+    # 16 MB built in one buffer, every write lands in place
+    writes = {i: p32(i) for i in range(0, 16 << 20, 4096)}
+    data = fit(writes, length=16 << 20, filler=b"\x90")
+    assert len(data) == 16 << 20
+    assert data.obj.__class__ is bytearray and len(data.obj) == 16 << 20
+    assert bytes(data[4096:4100]) == p32(4096)
+    assert bytes(data[4100:4104]) == b"\x90" * 4
+
+
+def test_send_without_copy(stub):
+    data = fit({0: b"hello", 8: 1})
+    tube = stub()
+
+    sent = []
+    tube._send_raw = lambda buf: sent.append(buf) or len(buf)
+    assert tube.send(data) == 16
+    assert sent[0] is data
+
+
+def test_send_to_process():
+    data = fit({0: b"line", 4: b"\n"}, length=5)
+    p = Process(["cat"])
+    p.send(data)
+    assert p.recvline(timeout=5) == b"line\n"
+    p.close()
@@ -0,0 +1,64 @@
+import time
+import selectors
+
+import pytest
+
+from pwnlib.tubes import Process
+
+LATE = ["python3", "-c", "import time; time.sleep(0.3); print('late', flush=True); time.sleep(5)"]
+
+
+def test_wakes_on_data():
+    p = Process(LATE)
+    start = time.monotonic()
+    assert p.recvline(timeout=5) == b"late\n"
+    assert time.monotonic() - start < 2
+    p.close()
+
+
+@pytest.mark.parametrize("call", ["recv", "recvline", "recv_into"])
+def test_timeout_fires(call):
+    p = Process(["sleep", "10"])
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        if call == "recv_into":
+            p.recv_into(bytearray(10), timeout=0.2)
+        else:
+            getattr(p, call)(timeout=0.2)
+
+    assert 0.15 < time.monotonic() - start < 1.5
+    p.close()
+
+
+def test_round_trips():
+    # a sleeping poll loop costs 10 ms a round trip, this would take 20 s
+    p = Process(["cat"])
+    start = time.monotonic()
+    for i in range(2000):
+        p.sendline(b"%d" % i)
+        assert p.recvline(timeout=5) == b"%d\n" % i
+    assert time.monotonic() - start < 10
+    p.close()
+
+
+def test_fileno_is_pollable():
+    p = Process(LATE)
+    with selectors.DefaultSelector() as sel:
+        sel.register(p.fileno(), selectors.EVENT_READ)
+        assert sel.select(5)
+    assert p.recvline(timeout=5) == b"late\n"
+    p.close()
+
+
+def test_eof():
+    p = Process(["echo", "bye"])
+    assert p.recvline(timeout=5) == b"bye\n"
+    assert p.recv(timeout=5) == b""
+    with pytest.raises(ConnectionAbortedError):
+        p.recvline(timeout=5)
+    p.close()
+
+
+def test_bad_command():
+    with pytest.raises(ValueError):
+        Process(["/nonexistent/binary"])
@@ -0,0 +1,71 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from pwnlib.tubes import Process, PTY
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="unix only")
+
+
+@pytest.fixture(scope="module")
+def buffered(tmp_path_factory):
+    # plain stdio, block buffered on a pipe and line buffered on a tty
+    if not shutil.which("gcc"):
+        pytest.skip("gcc not installed")
+
+    tmp = tmp_path_factory.mktemp("pty")
+    src = tmp / "buffered.c"
+    src.write_text("#include <stdio.h>\n#include <unistd.h>\n"
+                   "int main(void) { printf(\"ready\\n\"); sleep(3); return 0; }\n")
+    path = str(tmp / "buffered")
+    subprocess.run(["gcc", "-o", path, str(src)], check=True)
+    return path
+
+
+def test_line_buffered(buffered):
+    p = Process([buffered], stdout=PTY)
+    assert p.recvline(timeout=2) == b"ready\n"
+    p.close()
+
+    p = Process([buffered])
+    with pytest.raises(TimeoutError):
+        p.recvline(timeout=0.5)
+    p.close()
+
+
+def test_eof():
+    p = Process(["echo", "hi"], stdout=PTY)
+    assert p.recvall(timeout=5) == b"hi\n"
+    assert p.recv(timeout=5) == b""
+    with pytest.raises(ConnectionAbortedError):
+        p.recvline(timeout=5)
+    p.close()
+
+
+def test_eof_into():
+    p = Process(["echo", "hi"], stdout=PTY)
+    buf = bytearray(16)
+    assert p.recvall(buf, timeout=5) == 3
+    assert buf[:3] == b"hi\n"
+    p.close()
+
+
+def test_raw_mode():
+    # no echo, no \n -> \r\n and control characters pass through
+    p = Process(["cat"], stdin=PTY, stdout=PTY)
+    p.send(b"a\x03\x04\x1a\n")
+    assert p.recvline(timeout=5) == b"a\x03\x04\x1a\n"
+    assert p.is_alive()
+    p.close()
+    assert not p.is_alive()
+
+
+def test_no_fd_leak():
+    before = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+    for _ in range(20):
+        p = Process(["cat"], stdin=PTY, stdout=PTY)
+        p.close()
+    if before is not None:
+        assert len(os.listdir("/proc/self/fd")) == before
@@ -0,0 +1,57 @@
+import io
+import mmap
+
+from pwnlib.tubes import Process
+
+SLOW = ["python3", "-c", "import sys, time; sys.stdout.write('partial data'); "
+                         "sys.stdout.flush(); time.sleep(1); print(' rest')"]
+
+
+def test_timeout_keeps_data():
+    p = Process(SLOW)
+    try:
+        p.recvall(timeout=0.3)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("recvall didn't time out")
+
+    assert p.recvall(timeout=5) == b"partial data rest\n"
+    p.close()
+
+
+def test_recv_none_timeout_keeps_data():
+    p = Process(SLOW)
+    try:
+        p.recv(None, timeout=0.3)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("recv didn't time out")
+
+    assert p.recvn(7, timeout=5) == b"partial"
+    assert p.recv(None, timeout=5) == b" data rest\n"
+    p.close()
+
+
+def test_file(tmp_path):
+    p = Process(["python3", "-c", "print('x' * 100000)"])
+    path = tmp_path / "out"
+    assert p.recvall(str(path), timeout=5) == 100001
+    assert path.read_bytes() == b"x" * 100000 + b"\n"
+    p.close()
+
+    p = Process(["python3", "-c", "print('y' * 10)"])
+    f = io.BytesIO()
+    assert p.recvall(f, timeout=5) == 11
+    assert f.getvalue() == b"y" * 10 + b"\n"
+    p.close()
+
+
+def test_buffer():
+    p = Process(["python3", "-c", "print('z' * 1000)"])
+    buf = mmap.mmap(-1, 100)
+    assert p.recvall(buf, timeout=5) == 100
+    assert buf[:] == b"z" * 100
+    assert len(p.recvall(timeout=5)) == 901
+    p.close()
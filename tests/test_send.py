@@ -0,0 +1,89 @@
+import sys
+import time
+import threading
+
+import pytest
+
+from pwnlib.tubes import Process, PTY, Remote, Listen
+
+linux = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="linux only")
+
+
+def _data(size):
+    return bytes(i & 0xff for i in range(256)) * (size // 256)
+
+
+def test_large_echo():
+    # cat blocks on its full stdout while we write, the send drains it
+    data = _data(8 << 20)
+    p = Process(["cat"])
+    assert p.send(data, timeout=30) == len(data)
+    assert p.recvn(len(data), timeout=30) == data
+    p.close()
+
+
+def test_send_timeout():
+    p = Process(["sleep", "10"])
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        p.send(_data(8 << 20), timeout=0.3)
+    assert time.monotonic() - start < 2
+    p.close()
+
+
+@linux
+def test_pipe_size():
+    p = Process(["cat"], pipe_size=1 << 18)
+    assert p.set_pipe_size(1 << 18) >= 1 << 18
+    p.close()
+
+    p = Process(["cat"], stdin=PTY, stdout=PTY)
+    with pytest.raises(NotImplementedError):
+        p.set_pipe_size(1 << 18)
+    p.close()
+
+
+def test_send_file_process(tmp_path):
+    data = _data(4 << 20)
+    path = tmp_path / "payload"
+    path.write_bytes(data)
+
+    p = Process(["cat"])
+    p.sendline(b"head")
+    assert p.send_file(str(path), timeout=30) == len(data)
+    assert p.recvline(timeout=5) == b"head\n"
+    assert p.recvn(len(data), timeout=30) == data
+    p.close()
+
+
+def test_send_file_socket(tmp_path):
+    data = _data(4 << 20)
+    path = tmp_path / "payload"
+    path.write_bytes(data)
+
+    l = Listen(0, "127.0.0.1", timeout=30)
+    r = Remote("127.0.0.1", l.lport, timeout=30)
+    l.wait_for_connection()
+
+    received = []
+    reader = threading.Thread(target=lambda: received.append(l.recvn(len(data) + 5)))
+    reader.start()
+
+    # queued data goes out first
+    with r.batch():
+        r.sendline(b"head")
+        assert r.send_file(str(path)) == len(data)
+
+    reader.join()
+    assert received[0] == b"head\n" + data
+    r.close()
+    l.close()
+
+
+def test_send_file_generic(stub, tmp_path):
+    path = tmp_path / "payload"
+    path.write_bytes(b"x" * 3000000)
+
+    tube = stub()
+    assert tube.send_file(str(path)) == 3000000
+    assert tube.sent == b"x" * 3000000
@@ -0,0 +1,199 @@
+import os
+import time
+import socket
+import threading
+
+import pytest
+
+from pwnlib.tubes import Remote, Listen, TubeGroup
+
+
+@pytest.fixture
+def echo_server():
+    # one connection, every line is sent back until the client closes
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            conn.sendall(b"hello\n")
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                conn.sendall(data)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server.getsockname()[1]
+    thread.join(5)
+    server.close()
+
+
+def test_remote_echo(echo_server):
+    r = Remote("127.0.0.1", echo_server, timeout=5)
+    assert r.rport == echo_server
+    assert r.recvline() == b"hello\n"
+
+    r.sendline(b"abc")
+    assert r.recvline() == b"abc\n"
+
+    r.send(b"name: ")
+    assert r.sendlineafter(b": ", b"x") > 0
+    assert r.recvline() == b"x\n"
+    r.close()
+
+
+def test_remote_nodelay(echo_server):
+    r = Remote("127.0.0.1", echo_server, timeout=5, rcvbuf=1 << 16)
+    sock = r._sock
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    # the kernel doubles the value for its bookkeeping
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 1 << 16
+    r.close()
+
+    r = Remote("127.0.0.1", echo_server, timeout=5, nodelay=False)
+    assert not r._sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    r.close()
+
+
+def test_remote_large(echo_server):
+    data = bytes(range(256)) * 4096
+    r = Remote("127.0.0.1", echo_server, timeout=5, recv_size=1024)
+    r.recvline()
+
+    sender = threading.Thread(target=r.send, args=(data,))
+    sender.start()
+    assert r.recvn(len(data)) == data
+    sender.join()
+    r.close()
+
+
+def test_remote_refused():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    server.close()
+
+    with pytest.raises(ConnectionRefusedError):
+        Remote("127.0.0.1", port, timeout=5)
+
+
+def test_remote_timeout(echo_server):
+    r = Remote("127.0.0.1", echo_server, timeout=5)
+    r.recvline()
+    with pytest.raises(TimeoutError):
+        r.recvline(timeout=0.1)
+    r.close()
+
+
+def test_listen_remote():
+    l = Listen(0, "127.0.0.1", timeout=5)
+    port = l.lport
+    assert port
+
+    r = Remote("127.0.0.1", port, timeout=5)
+    l.wait_for_connection()
+
+    # still valid once the server socket is closed
+    assert l.lport == port
+    assert l.rport == r._sock.getsockname()[1]
+
+    l.sendline(b"ping")
+    assert r.recvline() == b"ping\n"
+    r.sendline(b"pong")
+    assert l.recvline() == b"pong\n"
+
+    r.close()
+    assert l.recv(None) == b""
+    l.close()
+
+
+def test_listen_recv_until_eof():
+    l = Listen(0, "127.0.0.1", timeout=5)
+    r = Remote("127.0.0.1", l.lport, timeout=5)
+    l.wait_for_connection()
+
+    r.send(b"a" * 100000)
+    r.close()
+    assert l.recv(None) == b"a" * 100000
+    l.close()
+
+
+def test_listen_accept_timeout():
+    l = Listen(0, "127.0.0.1")
+    with pytest.raises(TimeoutError):
+        l.wait_for_connection(timeout=0.1)
+    l.close()
+
+
+def test_listen_in_group():
+    # the fd of a Listen changes when the client connects
+    l = Listen(0, "127.0.0.1", timeout=5)
+    group = TubeGroup([l])
+
+    r = Remote("127.0.0.1", l.lport, timeout=5)
+    r.sendline(b"first")
+    assert group.wait_any(timeout=5) is l
+    l.wait_for_connection()
+    assert l.recvline() == b"first\n"
+
+    r.sendline(b"second")
+    assert group.wait_any(timeout=5) is l
+    assert l.recvline() == b"second\n"
+
+    group.close()
+    r.close()
+
+
+def test_is_alive_high_fd(echo_server):
+    # pushes the next descriptors past FD_SETSIZE
+    fillers = []
+    fd = os.open(os.devnull, os.O_RDONLY)
+    try:
+        while fd < 1100:
+            fillers.append(fd)
+            fd = os.dup(fillers[0])
+        fillers.append(fd)
+    except OSError:
+        pytest.skip("not enough file descriptors")
+
+    try:
+        r = Remote("127.0.0.1", echo_server, timeout=5)
+        assert r.fileno() >= 1024
+        assert r.is_alive()
+        assert r.recvline() == b"hello\n"
+        r._sock.shutdown(socket.SHUT_WR)
+        assert r.recv(None) == b""
+        assert not r.is_alive()
+        r.close()
+    finally:
+        for fd in fillers:
+            os.close(fd)
+
+
+def test_listen_implicit_accept_timeout():
+    # accept and read share one budget
+    l = Listen(0, "127.0.0.1")
+    r = None
+
+    def connect():
+        nonlocal r
+        time.sleep(0.3)
+        r = Remote("127.0.0.1", l.lport, timeout=5)
+
+    thread = threading.Thread(target=connect)
+    thread.start()
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        l.recvline(timeout=0.6)
+    assert time.monotonic() - start < 0.9
+
+    thread.join()
+    r.sendline(b"late")
+    assert l.recvline(timeout=5) == b"late\n"
+    r.close()
+    l.close()